@@ -0,0 +1,294 @@
+#  Copyright (C) 2014 Devin Kelly
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import json
+import time
+import zlib
+import hashlib
+import threading
+
+from Util import mkdir_p
+from Util import atomic_write
+
+__author__ = "Devin Kelly"
+
+archive_dirname = 'archive'
+index_filename = 'index.json'
+compress_level = 9
+
+archives = {}
+archives_lock = threading.Lock()
+
+
+class Archive(object):
+
+    def __init__(self, raw_dir):
+        """
+           A compressed, content-addressed store of raw pages.  Every page
+           body is stored once, under its sha1, no matter how many times or
+           under how many names it was fetched, and the index keeps every
+           version of each page.
+
+           :param raw_dir: The raw data directory
+        """
+
+        self.raw_dir = os.path.abspath(raw_dir)
+        self.archive_dir = os.path.join(self.raw_dir, archive_dirname)
+        self.objects_dir = os.path.join(self.archive_dir, 'objects')
+        self.index_file = os.path.join(self.archive_dir, index_filename)
+        self.lock = threading.Lock()
+        self.dirty = False
+
+        self.index = {}
+        if os.path.isfile(self.index_file):
+            with open(self.index_file, 'r') as fd:
+                self.index = json.load(fd)
+
+    def key(self, filename):
+        """
+           The index key of a raw file, its path relative to the raw dir
+        """
+
+        relpath = os.path.relpath(os.path.abspath(filename), self.raw_dir)
+        return relpath.replace(os.sep, '/')
+
+    def object_path(self, sha1):
+        return os.path.join(self.objects_dir, sha1[:2], sha1[2:] + '.z')
+
+    def save_index(self):
+        """
+           Write the index if anything was added since it was last written,
+           put() only changes it in memory so a batch is written once
+        """
+
+        with self.lock:
+            if not self.dirty:
+                return
+            text = json.dumps(self.index, indent=1, sort_keys=True)
+            atomic_write([text], self.index_file)
+            self.dirty = False
+
+    def put(self, filename, url=None, meta=None):
+        """
+           Add the current contents of a raw file to the archive, the
+           index is not written until save_index()
+
+           :param filename: The raw file
+           :param url: The url the file was fetched from
+           :param meta: The page's cache validators from read_meta, kept so
+                        a pruned page can still be fetched conditionally
+           :returns: The sha1 of the contents
+        """
+
+        with open(filename, 'rb') as fd:
+            data = fd.read()
+
+        sha1 = hashlib.sha1(data).hexdigest()
+        obj = self.object_path(sha1)
+        if not os.path.isfile(obj):
+            mkdir_p(os.path.dirname(obj))
+            atomic_write([zlib.compress(data, compress_level)], obj)
+
+        meta = meta or {}
+        key = self.key(filename)
+        with self.lock:
+            versions = self.index.setdefault(key, [])
+            if not versions or versions[-1]['sha1'] != sha1:
+                versions.append({'sha1': sha1,
+                                 'url': url,
+                                 'size': len(data),
+                                 'fetched': time.strftime(
+                                     '%Y-%m-%dT%H:%M:%S')})
+                self.dirty = True
+            latest = versions[-1]
+            for name in ['etag', 'last_modified']:
+                if meta.get(name) and latest.get(name) != meta[name]:
+                    latest[name] = meta[name]
+                    self.dirty = True
+
+        return sha1
+
+    def has(self, filename):
+        return self.key(filename) in self.index
+
+    def meta(self, filename):
+        """
+           The url and cache validators of the latest version of a raw
+           file, {} if it is not archived
+        """
+
+        versions = self.index.get(self.key(filename))
+        if not versions:
+            return {}
+
+        latest = versions[-1]
+        return {'url': latest.get('url'),
+                'etag': latest.get('etag'),
+                'last_modified': latest.get('last_modified')}
+
+    def history(self, filename):
+        """
+           Every archived version of a raw file, oldest first
+        """
+
+        return list(self.index.get(self.key(filename), []))
+
+    def get(self, filename, sha1=None):
+        """
+           The contents of a raw file
+
+           :param filename: The raw file
+           :param sha1: The version to read, the latest if None
+           :raises KeyError: if the file or version is not archived
+        """
+
+        if sha1 is None:
+            versions = self.index.get(self.key(filename))
+            if not versions:
+                raise KeyError(filename)
+            sha1 = versions[-1]['sha1']
+
+        obj = self.object_path(sha1)
+        if not os.path.isfile(obj):
+            raise KeyError(sha1)
+
+        with open(obj, 'rb') as fd:
+            return zlib.decompress(fd.read())
+
+
+def raw_dir_of(filename):
+    """
+       The raw data directory a raw file lives in, None if it is not in one
+    """
+
+    parts = os.path.abspath(filename).split(os.sep)
+    if 'raw_data' not in parts:
+        return None
+
+    ii = len(parts) - 1 - parts[::-1].index('raw_data')
+    return os.sep.join(parts[:ii + 1])
+
+
+def get_archive(raw_dir):
+    """
+       The shared Archive of a raw data directory
+    """
+
+    raw_dir = os.path.abspath(raw_dir)
+    with archives_lock:
+        if raw_dir not in archives:
+            archives[raw_dir] = Archive(raw_dir)
+        return archives[raw_dir]
+
+
+def archive_of(filename):
+    """
+       The Archive a raw file belongs to, None if there is none on disk
+    """
+
+    raw_dir = raw_dir_of(filename)
+    if raw_dir is None:
+        return None
+    if not os.path.isdir(os.path.join(raw_dir, archive_dirname)):
+        return None
+
+    return get_archive(raw_dir)
+
+
+def save_archives():
+    """
+       Write the index of every archive that was added to
+    """
+
+    with archives_lock:
+        loaded = list(archives.values())
+
+    for archive in loaded:
+        archive.save_index()
+
+
+def raw_exists(filename):
+    """
+       True if a raw file is on disk or in the archive
+    """
+
+    if os.path.isfile(filename):
+        return True
+
+    archive = archive_of(filename)
+    return archive is not None and archive.has(filename)
+
+
+def read_raw(filename):
+    """
+       Read a raw file, from disk if it is there and from the archive if
+       it is not
+
+       :raises IOError: if the file is in neither place
+    """
+
+    if os.path.isfile(filename):
+        with open(filename, 'rb') as fd:
+            return fd.read()
+
+    archive = archive_of(filename)
+    if archive is not None:
+        try:
+            return archive.get(filename)
+        except KeyError:
+            pass
+
+    raise IOError("{0} not found on disk or in the archive".format(filename))
+
+
+def archive_raw_files(raw_dir, prune=False):
+    """
+       Add every raw html file to the archive
+
+       :param raw_dir: The raw data directory
+       :param prune: Remove the loose files once they are archived
+       :returns: The number of files archived
+    """
+
+    archive = get_archive(raw_dir)
+    count = 0
+    archived = []
+    for root, dirs, filenames in os.walk(raw_dir):
+        if archive_dirname in dirs:
+            dirs.remove(archive_dirname)
+        for filename in filenames:
+            if not filename.endswith('.html'):
+                continue
+            filename = os.path.join(root, filename)
+            meta = {}
+            if os.path.isfile(filename + '.meta'):
+                try:
+                    with open(filename + '.meta', 'r') as fd:
+                        meta = json.load(fd)
+                except ValueError:
+                    pass
+            archive.put(filename, meta.get('url'), meta)
+            archived.append(filename)
+            count += 1
+
+    # the index must be on disk before any loose file goes, the .meta
+    # files are kept for the next conditional request
+    archive.save_index()
+    if prune:
+        for filename in archived:
+            os.remove(filename)
+
+    return count
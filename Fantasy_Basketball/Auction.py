@@ -0,0 +1,199 @@
+#  Copyright (C) 2014 Devin Kelly
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from multiprocessing import Pool
+
+import numpy as np
+import pandas as pd
+
+__author__ = "Devin Kelly"
+
+# how far a team's bid strays from a player's price, as a lognormal sigma
+default_sigma = 0.25
+
+# players nominated per roster spot, the ones past the end go unsold
+pool_factor = 1.5
+
+percentiles = [10, 25, 50, 75, 90]
+
+
+def simulate_auctions(values, prices, trials, nplayers=6, money_per_player=200,
+                      players_per_team=13, sigma=default_sigma, seed=0):
+    """
+       Run auctions side by side, every array is trials x something and a
+       step of the loop is one nomination in every trial at once.
+
+       Players are nominated in a random order weighted by price, so the
+       best players tend to go early but not always.  Each team bids the
+       player's price times lognormal noise, scaled by its money left per
+       open roster spot against the league's, and never more than it can
+       spend while still filling its roster at $1.  The highest bid wins
+       and pays $1 over the second highest, a tie goes to one of the tied
+       teams at random.
+
+       :param values: array of player values
+       :param prices: array of player prices from augment_price
+       :param trials: The number of auctions
+       :returns: (float array of the price each player went for, NaN when
+                 unsold, trials x players; float array of each team's
+                 total value, trials x teams)
+    """
+
+    rs = np.random.RandomState(seed)
+    values = np.asarray(values, dtype=float)
+    nteams = nplayers
+    picks = nplayers * players_per_team
+
+    # augment_price doubles its prices, scale them to the money there is
+    base = np.nan_to_num(np.asarray(prices, dtype=float))
+    drafted = np.sort(base)[::-1][0:picks].sum()
+    if drafted > 0:
+        base = base * nplayers * money_per_player / drafted
+    base = np.maximum(base, 1.0)
+    spot_money = float(money_per_player) / players_per_team
+    t = np.arange(trials)
+
+    # weighted sampling without replacement, the key u ** (1 / w) puts
+    # the expensive players early in most nominating orders
+    keys = rs.rand(trials, len(values)) ** (1.0 / base)
+    order = np.argsort(-keys, axis=1)
+    budget = np.zeros((trials, nteams)) + money_per_player
+    spots = np.zeros((trials, nteams), dtype=int) + players_per_team
+    strength = np.zeros((trials, nteams))
+    paid = np.zeros((trials, len(values))) + np.nan
+
+    for step in range(min(picks, len(values))):
+        player = order[:, step]
+
+        open_spots = spots > 0
+        max_bid = budget - (spots - 1)
+        pressure = budget / np.maximum(spots, 1) / spot_money
+        noise = rs.lognormal(0.0, sigma, (trials, nteams))
+        bids = base[player][:, np.newaxis] * noise * pressure
+        bids = np.clip(bids, 1.0, np.maximum(max_bid, 1.0))
+        bids = np.where(open_spots, bids, -np.inf)
+
+        # tied bids, most often at the $1 floor, go to one of the tied
+        # teams at random, argmax alone would always pick the first
+        top = bids == bids.max(axis=1)[:, np.newaxis]
+        winner = np.argmax(np.where(top, rs.rand(trials, nteams), -1.0),
+                           axis=1)
+        if nteams > 1:
+            second = np.partition(bids, nteams - 2, axis=1)[:, nteams - 2]
+        else:
+            second = np.zeros(trials)
+        second = np.where(np.isinf(second), 0.0, second)
+
+        price = np.minimum(np.floor(second) + 1.0, max_bid[t, winner])
+        price = np.maximum(price, 1.0)
+
+        budget[t, winner] -= price
+        spots[t, winner] -= 1
+        strength[t, winner] += np.nan_to_num(values[player])
+        paid[t, player] = price
+
+    return paid, strength
+
+
+def run_trials(work):
+    """
+       Run a batch of auctions, run in a worker process
+
+       :param work: (values, prices, trials, settings dict, seed)
+    """
+
+    values, prices, trials, settings, seed = work
+    return simulate_auctions(values, prices, trials, seed=seed, **settings)
+
+
+def auction_distribution(df, trials=1000, jobs=1, nplayers=6,
+                         money_per_player=200, players_per_team=13,
+                         sigma=default_sigma, seed=0):
+    """
+       The distribution of what each player goes for and of the teams'
+       strength over many simulated auctions
+
+       :param df: The players, with Player, value and price columns
+       :param trials: The number of auctions
+       :param jobs: The number of processes to run them in
+       :returns: (DataFrame of players with the chance they are drafted and
+                 percentiles of the price they go for, DataFrame of team
+                 strength percentiles by the order teams finish in)
+    """
+
+    picks = nplayers * players_per_team
+    pool = df.sort('value', ascending=False)[0:int(pool_factor * picks)]
+    values = pool['value'].values
+    prices = pool['price'].values
+    settings = {'nplayers': nplayers, 'money_per_player': money_per_player,
+                'players_per_team': players_per_team, 'sigma': sigma}
+
+    jobs = max(1, min(jobs, trials))
+    sizes = [trials // jobs + (1 if ii < trials % jobs else 0)
+             for ii in range(jobs)]
+    work = [(values, prices, n, settings, seed + ii)
+            for ii, n in enumerate(sizes)]
+
+    if jobs > 1:
+        workers = Pool(jobs)
+        try:
+            results = workers.map(run_trials, work)
+        finally:
+            workers.close()
+            workers.join()
+    else:
+        results = [run_trials(w) for w in work]
+
+    paid = np.vstack([r[0] for r in results])
+    strength = np.vstack([r[1] for r in results])
+
+    players = pd.DataFrame({'Player': pool['Player'].values,
+                            'value': values,
+                            'price': prices})
+    sold = ~np.isnan(paid)
+    players['drafted'] = np.round(sold.mean(axis=0), 3)
+    players['mean'] = np.round(np.nansum(paid, axis=0) /
+                               np.maximum(sold.sum(axis=0), 1), 2)
+    for p in percentiles:
+        players['p{0}'.format(p)] = price_percentile(paid, sold, p)
+
+    # the teams are alike, so compare them by where they finish
+    ranked = -np.sort(-strength, axis=1)
+    teams = pd.DataFrame({'finish': np.arange(1, nplayers + 1),
+                          'mean': np.round(ranked.mean(axis=0), 3)})
+    for p in percentiles:
+        teams['p{0}'.format(p)] = np.round(np.percentile(ranked, p, axis=0),
+                                           3)
+
+    return players, teams
+
+
+def price_percentile(paid, sold, p):
+    """
+       A percentile of each column over its sold rows, interpolated as
+       np.percentile does, NaN if never sold
+    """
+
+    ordered = np.sort(paid, axis=0)  # NaN sorts last
+    count = sold.sum(axis=0)
+    cols = np.arange(paid.shape[1])
+
+    pos = np.maximum(count - 1, 0) * p / 100.0
+    lo = np.floor(pos).astype(int)
+    hi = np.ceil(pos).astype(int)
+    low = ordered[lo, cols]
+    out = low + (ordered[hi, cols] - low) * (pos - lo)
+
+    return np.where(count > 0, out, np.nan)
@@ -0,0 +1,177 @@
+#  Copyright (C) 2014 Devin Kelly
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import sqlite3
+import pandas as pd
+
+from Util import mkdir_p
+
+__author__ = "Devin Kelly"
+
+database_filename = 'fantasy_basketball.db'
+
+# created on every table that has all of the columns
+indexes = [('Player', 'year'),
+           ('player_id', 'year'),
+           ('year', 'Pos'),
+           ('year', 'Fantasy Team')]
+
+
+def quote(name):
+    return '"{0}"'.format(unicode(name).replace('"', '""'))
+
+
+class Database(object):
+
+    def __init__(self, data_dir):
+        """
+           Every season of the processed frames in one SQLite file, a table
+           per frame with a year column, indexed for player and season
+           lookups
+
+           :param data_dir: The fantasy basketball data directory
+        """
+
+        processed_dir = os.path.join(data_dir, 'processed_data')
+        mkdir_p(processed_dir)
+        self.filename = os.path.join(processed_dir, database_filename)
+        self.conn = sqlite3.connect(self.filename)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def tables(self):
+        cur = self.conn.execute("SELECT name FROM sqlite_master "
+                                "WHERE type = 'table'")
+        return [r[0] for r in cur.fetchall()]
+
+    def table_columns(self, table):
+        cur = self.conn.execute('PRAGMA table_info({0})'.format(quote(table)))
+        return [r[1] for r in cur.fetchall()]
+
+    def has_season(self, table, year):
+        if table not in self.tables():
+            return False
+
+        cur = self.conn.execute('SELECT 1 FROM {0} WHERE year = ? LIMIT 1'
+                                .format(quote(table)), (int(year),))
+        return cur.fetchone() is not None
+
+    def write(self, table, df, year):
+        """
+           Replace one season of a table, adding any columns the table
+           does not have yet.  The old rows are deleted and the new ones
+           inserted in one transaction, so a failure keeps the old season.
+
+           :param table: The table, e.g. team_data
+           :param df: The season's DataFrame
+           :param year: The season
+        """
+
+        df = df.reset_index(drop=True)
+        df.columns = [unicode(c) for c in df.columns]
+        df['year'] = int(year)
+
+        # sqlite3 commits before a schema change, so the schema is changed
+        # before the transaction starts
+        if table in self.tables():
+            existing = self.table_columns(table)
+            for column in df.columns:
+                if column not in existing:
+                    self.conn.execute('ALTER TABLE {0} ADD COLUMN {1}'
+                                      .format(quote(table), quote(column)))
+        else:
+            self.conn.execute(pd.io.sql.get_schema(df, table))
+        self.conn.commit()
+
+        rows = df.astype(object).where(df.notnull(), None).values.tolist()
+        insert = 'INSERT INTO {0} ({1}) VALUES ({2})'.format(
+            quote(table), ', '.join(quote(c) for c in df.columns),
+            ', '.join('?' * len(df.columns)))
+
+        with self.conn:
+            self.conn.execute('DELETE FROM {0} WHERE year = ?'
+                              .format(quote(table)), (int(year),))
+            self.conn.executemany(insert, rows)
+
+        self.create_indexes(table)
+
+    def create_indexes(self, table):
+        columns = self.table_columns(table)
+        with self.conn:
+            for index in indexes:
+                if not all(c in columns for c in index):
+                    continue
+                name = '_'.join([table] + list(index)).replace(' ', '_')
+                self.conn.execute('CREATE INDEX IF NOT EXISTS {0} ON {1} ({2})'
+                                  .format(quote(name), quote(table),
+                                          ', '.join(quote(c) for c in index)))
+
+    def query(self, sql, params=()):
+        """
+           Run a SELECT and return the result as a DataFrame
+        """
+
+        return pd.read_sql_query(sql, self.conn, params=params)
+
+    def select(self, table, columns=None, **where):
+        """
+           Rows of a table, e.g.
+           select('team_data', ['Player', 'value'], year=2014, Pos='C')
+
+           :param columns: The columns to return, all of them if None
+           :param where: column=value to match, a list matches any of its
+                         values.  Fantasy_Team matches 'Fantasy Team'.
+        """
+
+        cols = '*'
+        if columns is not None:
+            cols = ', '.join(quote(c) for c in columns)
+        sql = 'SELECT {0} FROM {1}'.format(cols, quote(table))
+
+        existing = self.table_columns(table)
+        clauses = []
+        params = []
+        for column, value in sorted(where.items()):
+            if column not in existing:
+                column = column.replace('_', ' ')
+            if isinstance(value, (list, tuple, set)):
+                value = list(value)
+                clauses.append('{0} IN ({1})'.format(
+                    quote(column), ', '.join('?' * len(value))))
+                params.extend(value)
+            else:
+                clauses.append('{0} = ?'.format(quote(column)))
+                params.append(value)
+
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+
+        return self.query(sql, params)
+
+    def player(self, player, table='team_data'):
+        """
+           Every season of one player
+        """
+
+        return self.query('SELECT * FROM {0} WHERE Player = ? ORDER BY year'
+                          .format(quote(table)), (player,))
@@ -17,6 +17,14 @@ import os
 import pandas as pd
 import numpy as np
 
+from Store import read_frame
+from Store import frame_exists
+from Players import PlayerRegistry
+from Matcher import NameMatcher
+from Valuation import category_zscores
+from Valuation import default_categories
+from Valuation import value_column
+
 __author__ = "Devin Kelly"
 
 
@@ -45,74 +53,129 @@ def cleanup(df):
     return df
 
 
-def augment_value(df):
+def augment_value(df, categories=default_categories, volume=False):
     """
+       A player's value is the sum of his z-scores in each category,
+       computed within his year.  Each category's z-score is kept in a
+       value_<category> column next to the total.
 
+       :param categories: The scoring categories, e.g. ['FG%', 'TO']
+       :param volume: Weight FG% and FT% by attempts
     """
 
-    df['value'] = (df['FG%'] - df['FG%'].mean()) / df['FG%'].std() + \
-                  (df['FT%'] - df['FT%'].mean()) / df['FT%'].std() + \
-                  (df['3P'] - df['3P'].mean()) / df['3P'].std() + \
-                  (df['TRB'] - df['TRB'].mean()) / df['TRB'].std() + \
-                  (df['AST'] - df['AST'].mean()) / df['AST'].std() + \
-                  (df['STL'] - df['STL'].mean()) / df['STL'].std() + \
-                  (df['BLK'] - df['BLK'].mean()) / df['BLK'].std() + \
-                  (df['PTS'] - df['PTS'].mean()) / df['PTS'].std()
+    z = category_zscores(df, categories, volume)
+    for jj, name in enumerate(categories):
+        df[value_column(name)] = np.round(z[:, jj], 3)
 
-    df['value'] = np.round(df['value'], 3)
+    df['value'] = np.round(z.sum(axis=1), 3)
 
     return df
 
 
 def augment_price(df, nplayers=6, money_per_player=200, players_per_team=13):
     """
+       Price the players who would be drafted each year, the top
+       nplayers * players_per_team by value, in proportion to their share
+       of the drafted value.  Everyone else is priced at 0.
 
+       :param nplayers: The number of teams in the league
+       :param money_per_player: Each team's auction budget
+       :param players_per_team: The size of a roster
     """
 
     total_picks = nplayers * players_per_team
     money_supply = float(nplayers * money_per_player)
 
-    df['price'] = 0.0
-    years = list(set(df['year']))
-    for y in years:
-        top_players = df[df.year == y]
-        top_players = top_players.sort('value', ascending=False)[0:total_picks]
-        total_value = top_players['value'].sum()
-
-        for ii in top_players.Player:
-            player_value = top_players[top_players.Player == ii].value
-            player_value = 2.0 * player_value  # double the std. dev
-            player_price = money_supply * (player_value / total_value)
-            df.price[(df.year == y) & (df.Player == ii)] = player_price
-
+    df['price'] = auction_prices(df['value'].values, df['year'].values,
+                                 total_picks, money_supply)
     df['price'] = np.round(df['price'], 3)
+
     return df
 
 
+def auction_prices(values, years, total_picks, money_supply):
+    """
+       The price of every player, grouped by year with a partial sort
+       picking each year's top players
+
+       :param values: array of player values
+       :param years: array of the year of each value
+       :returns: array of prices
+    """
+
+    values = np.asarray(values, dtype=float)
+    codes, uniques = pd.factorize(years)
+
+    # rows of each year next to each other, in their original order
+    order = np.argsort(codes, kind='mergesort')
+    starts = np.searchsorted(codes[order], np.arange(len(uniques)))
+    ends = np.append(starts[1:], len(order))
+
+    # players without a value are never drafted
+    ranked = np.where(np.isnan(values), -np.inf, values)
+
+    drafted = np.zeros(len(values), dtype=bool)
+    for start, end in zip(starts, ends):
+        rows = order[start:end]
+        k = min(total_picks, len(rows))
+        if k == 0:
+            continue
+        top = np.argpartition(-ranked[rows], k - 1)[:k]
+        drafted[rows[top]] = True
+
+    drafted = drafted & ~np.isnan(values)
+    drafted_value = np.where(drafted, values, 0.0)
+    total_value = np.bincount(codes, weights=drafted_value,
+                              minlength=len(uniques))
+
+    # double the std. dev
+    with np.errstate(invalid='ignore', divide='ignore'):
+        prices = 2.0 * money_supply * drafted_value / total_value[codes]
+
+    return np.where(drafted, prices, 0.0)
+
+
 def augment_draft_data(df, draft_df):
     """
 
     """
 
-    df = df.merge(draft_df, left_on='Player', right_on='Player', how='inner')
+    draft_df = draft_df.drop('Player', axis=1)
+    df = df.merge(draft_df, on='player_id', how='inner')
 
     return df
 
 
-def augment_fantasy_teams(df, data_dir):
+def augment_fantasy_teams(df, data_dir, registry=None):
     """
+       Join the ESPN league's rosters on player_id.  ESPN names are
+       matched to the season's players, fuzzily when the spelling differs,
+       the match_score column has the confidence of each match.
 
+       :param registry: The PlayerRegistry the frame's ids came from
     """
 
+    if registry is None:
+        registry = PlayerRegistry(data_dir)
+
     year = int(max(set(df['year'])))
     processed_dir = os.path.join(data_dir, 'processed_data', str(year))
-    league_data_file = os.path.join(processed_dir, 'league_player_data.pkl')
+    league_data_file = os.path.join(processed_dir, 'league_player_data')
+
+    if frame_exists(league_data_file):
 
-    if os.path.isfile(league_data_file):
+        matcher = NameMatcher(registry)
+        league_df = matcher.assign(read_frame(league_data_file),
+                                   pool=df['player_id'])
+        matcher.save()
 
-        league_df = pd.read_pickle(league_data_file)
+        # names that matched nobody have no stats to join
+        league_df = league_df[league_df['player_id'].notnull()].copy()
+        league_df['player_id'] = league_df['player_id'].astype(int)
+        league_df = league_df.drop('Player', axis=1)
 
-        df = pd.merge(df, league_df, on='Player', how='outer')
+        df = pd.merge(df, league_df, on='player_id', how='outer')
+        df['Player'] = df['player_id'].map(registry.name)
         df['Fantasy Team'] = df['Fantasy Team'].fillna('FA')
 
     return df
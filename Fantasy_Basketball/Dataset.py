@@ -0,0 +1,200 @@
+#  Copyright (C) 2014 Devin Kelly
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import re
+import pandas as pd
+
+from Store import read_frame
+from Store import frame_exists
+from Store import frame_columns
+
+__author__ = "Devin Kelly"
+
+
+class Dataset(object):
+
+    def __init__(self, data_dir, name='team_data'):
+        """
+           One processed frame across every season, partitioned by year,
+           i.e. processed_data/<year>/<name>
+
+           :param data_dir: The fantasy basketball data directory
+           :param name: The frame, e.g. team_data or fantasy_team_data
+        """
+
+        self.data_dir = data_dir
+        self.processed_dir = os.path.join(data_dir, 'processed_data')
+        self.name = name
+
+    def path(self, year):
+        return os.path.join(self.processed_dir, str(year), self.name)
+
+    def years(self):
+        """
+           The seasons that have this frame, oldest first
+        """
+
+        if not os.path.isdir(self.processed_dir):
+            return []
+
+        years = []
+        for d in os.listdir(self.processed_dir):
+            if re.match(r'^[0-9]{4}$', d) and frame_exists(self.path(d)):
+                years.append(int(d))
+
+        return sorted(years)
+
+    def columns(self, year):
+        return frame_columns(self.path(year))
+
+    def read(self, year, columns=None):
+        """
+           Load one season, reading only the given columns
+        """
+
+        return read_frame(self.path(year), columns)
+
+    def query(self):
+        return Query(self)
+
+
+class Query(object):
+
+    def __init__(self, dataset):
+        """
+           A lazy query over a Dataset, nothing is read until load() or
+           partitions() is called.  Every method returns a new Query so
+           queries can be built up and reused.
+        """
+
+        self.dataset = dataset
+        self.first = None
+        self.last = None
+        self.wanted = None
+        self.filters = []
+
+    def copy(self):
+        q = Query(self.dataset)
+        q.first = self.first
+        q.last = self.last
+        q.wanted = self.wanted
+        q.filters = list(self.filters)
+        return q
+
+    def years(self, first=None, last=None):
+        """
+           Only read the seasons from first to last, inclusive
+        """
+
+        q = self.copy()
+        q.first = first
+        q.last = last if last is not None else first
+        return q
+
+    def columns(self, *columns):
+        """
+           Only read these columns
+        """
+
+        q = self.copy()
+        q.wanted = list(columns)
+        return q
+
+    def where(self, column, values, exclude=False):
+        """
+           Keep rows whose column is one of values, or is none of them if
+           exclude is True
+        """
+
+        if isinstance(values, basestring):
+            values = [values]
+
+        q = self.copy()
+        q.filters.append((column, list(values), exclude))
+        return q
+
+    def players(self, *players):
+        return self.where('Player', players)
+
+    def positions(self, *positions):
+        return self.where('Pos', positions)
+
+    def fantasy_teams(self, *teams):
+        return self.where('Fantasy Team', teams)
+
+    def selected_years(self):
+        years = self.dataset.years()
+        if self.first is not None:
+            years = [y for y in years if y >= int(self.first)]
+        if self.last is not None:
+            years = [y for y in years if y <= int(self.last)]
+
+        return years
+
+    def read_columns(self):
+        """
+           The columns to read for a season, the requested ones plus the
+           ones the filters need, or None for all of them
+        """
+
+        if self.wanted is None:
+            return None
+
+        columns = list(self.wanted)
+        for column, _, _ in self.filters:
+            if column not in columns:
+                columns.append(column)
+
+        return columns
+
+    def partitions(self):
+        """
+           Yield (year, DataFrame) for each matching season, one at a time
+        """
+
+        for year in self.selected_years():
+            available = self.dataset.columns(year)
+            if any(c not in available for c, _, exclude in self.filters
+                   if not exclude):
+                continue
+
+            df = self.dataset.read(year, self.read_columns())
+            for column, values, exclude in self.filters:
+                if column not in df:
+                    continue
+                mask = df[column].isin(values)
+                df = df[~mask] if exclude else df[mask]
+
+            if self.wanted is not None:
+                df = df[[c for c in self.wanted if c in df]]
+
+            if 'year' not in df and (self.wanted is None or
+                                     'year' in self.wanted):
+                df = df.copy()
+                df['year'] = year
+
+            yield year, df
+
+    def load(self):
+        """
+           Every matching row of every matching season in one DataFrame
+        """
+
+        frames = [df for _, df in self.partitions()]
+        if not frames:
+            return pd.DataFrame()
+
+        return pd.concat(frames, ignore_index=True)
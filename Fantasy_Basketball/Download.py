@@ -14,14 +14,25 @@
 #  along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 
-import requests
 import time
-import sys
 import os
+from functools import partial
 
 from TeamData import teams
 
+from Fetcher import RateLimiter
+from Fetcher import fetch_pages
+from Fetcher import default_workers
+from Transport import Transport
+from HTTPCache import conditional_headers
+from HTTPCache import write_meta
+from HTTPCache import frozen_years
+from HTTPCache import is_frozen
+from Manifest import Manifest
+from Archive import archive_of
+from Archive import save_archives
 from Util import mkdir_p
+from Util import atomic_write
 
 __author__ = "Devin Kelly"
 
@@ -29,73 +40,186 @@ base_draft_url = "http://www.basketball-reference.com/draft/NBA_{year}.html"
 base_team_url = "http://www.basketball-reference.com/teams/{team}/{year}.html"
 default_dir = os.path.expanduser("~/.fantasy_basketball")
 
+chunk_size = 64 * 1024
+min_page_size = 1024
+team_markers = ['id="roster"', 'id="per_game"']
+draft_markers = ['id="stats"']
 
-def download_data(data_dir, teams, drafts, league, year, league_id):
+
+def download_data(data_dir, teams, drafts, league, year, league_id,
+                  workers=default_workers, rate_limits=None):
     data_dir = os.path.join(data_dir, 'raw_data')
+    limiter = RateLimiter(rate_limits)
+    transport = Transport(pool_size=workers, limiter=limiter)
+
+    pages = []
     if teams:
-        download_teams(data_dir, year)
+        pages.extend(team_pages(data_dir, year))
 
     if drafts:
-        download_draft(data_dir, year)
+        pages.extend(draft_pages(data_dir, year))
 
     if league and league_id and (league_id is not None):
-        download_league(data_dir, league_id, year)
+        pages.extend(league_pages(data_dir, league_id, year))
 
+    fetch(data_dir, pages, workers, limiter, transport)
+    transport.report()
 
-def download_teams(data_dir, year):
 
-    download_teams = teams[int(year)]
+def backfill(data_dir, from_year, to_year, teams=True, drafts=True,
+             workers=default_workers, rate_limits=None):
+    """
+       Download every season in a range, resuming from the manifest in the
+       raw data directory so pages fetched by an earlier run are skipped
 
-    for t in download_teams:
-        print "downloading {0}, {1}".format(t, year)
-        download_team(data_dir, t, year)
-        time.sleep(10.0)
+       :param data_dir: The fantasy basketball data directory
+       :param from_year: The first season
+       :param to_year: The last season, inclusive
+    """
 
+    data_dir = os.path.join(data_dir, 'raw_data')
+    mkdir_p(data_dir)
+    limiter = RateLimiter(rate_limits)
+    transport = Transport(pool_size=workers, limiter=limiter)
+    manifest = Manifest(data_dir)
 
-def download_draft(data_dir, year):
+    pages = []
+    for year in range(int(from_year), int(to_year) + 1):
+        if teams:
+            if has_teams(year):
+                pages.extend(team_pages(data_dir, year))
+            else:
+                print 'No teams known for {0}, skipping'.format(year)
+        if drafts:
+            pages.extend(draft_pages(data_dir, year))
 
-    data_dir = os.path.join(data_dir, "draft", str(year))
-    mkdir_p(data_dir)
+    remaining = manifest.pending(pages)
+    print '{0} of {1} pages left to fetch'.format(len(remaining), len(pages))
 
-    filename = "draft.html"
-    filename = os.path.join(data_dir, filename)
-    url = base_draft_url.format(year=year)
+    fetch(data_dir, remaining, workers, limiter, transport, manifest)
+    transport.report()
+
+    return manifest.summary()
+
+
+def fetch(data_dir, pages, workers=default_workers, limiter=None,
+          transport=None, manifest=None):
+    """
+       Fetch pages concurrently, skipping pages of frozen seasons that are
+       already on disk
+
+       :param manifest: A Manifest to record the outcome of every page in
+    """
+
+    if limiter is None:
+        limiter = RateLimiter()
+    if transport is None:
+        transport = Transport(pool_size=workers, limiter=limiter)
 
-    with open(filename, "wb") as fd:
+    frozen = frozen_years(data_dir)
+    pages = [p for p in pages if not is_frozen(p, frozen)]
 
-        r = requests.get(url)
-        if r.status_code == 200:
-            fd.write(r.text)
+    fetch_func = partial(fetch_page, transport=transport)
+    if manifest is not None:
+        fetch_func = partial(fetch_and_record, fetch_func=fetch_func,
+                             manifest=manifest)
+
+    try:
+        return fetch_pages(pages, fetch_func, workers=workers,
+                           limiter=limiter)
+    finally:
+        # pages are added to the archive in memory, write it once
+        save_archives()
+
+
+def has_teams(year):
+    return int(year) in teams
+
+
+def fetch_and_record(page, fetch_func, manifest):
+    status = None
+    try:
+        status = fetch_func(page)
+    finally:
+        manifest.record(page, status)
+
+    return status
+
+
+def fetch_page(page, transport=None):
+    """
+       Download a single page to disk, the page is left alone if the server
+       says it has not changed since the last download.  The body is
+       streamed to a temporary file and only renamed into place once it is
+       complete and contains the page's markers.  If the raw data directory
+       has an archive the new page is added to it.
+
+       :param page: dict with 'url' and 'filename' keys, and optionally a
+                    list of 'markers' that a complete page contains
+       :param transport: The Transport to send the request over
+       :raises IOError: if the downloaded page is incomplete
+    """
+
+    if transport is None:
+        transport = Transport(pool_size=1)
+
+    r = transport.get(page['url'], headers=conditional_headers(page),
+                      stream=True)
+    nbytes = 0
+    try:
+        if r.status_code == 304:
+            print 'Not modified {0}'.format(page['url'])
+        elif r.status_code == 200:
+            chunks = r.iter_content(chunk_size=chunk_size)
+            nbytes = atomic_write(chunks, page['filename'],
+                                  min_size=min_page_size,
+                                  markers=page.get('markers', ()))
+            meta = write_meta(page['filename'], page['url'], r.headers)
+            archive = archive_of(page['filename'])
+            if archive is not None:
+                archive.put(page['filename'], page['url'], meta)
         else:
-            print 'Download {0} failed'.format(url)
+            print 'Downloading {0} failed'.format(page['url'])
+    finally:
+        r.close()
+        transport.record(page['url'], r.status_code, nbytes,
+                         time.time() - r.start)
 
-    return
+    return r.status_code
 
 
-def download_team(data_dir, team, year=time.strftime('%Y', time.localtime())):
+def team_pages(data_dir, year):
 
     data_dir = os.path.join(data_dir, "teams", str(year))
     mkdir_p(data_dir)
 
-    filename = "{team}.html".format(team=team)
-    filename = os.path.join(data_dir, filename)
-    url = base_team_url.format(team=team, year=year)
+    pages = []
+    for t in teams[int(year)]:
+        filename = "{team}.html".format(team=t)
+        filename = os.path.join(data_dir, filename)
+        url = base_team_url.format(team=t, year=year)
+        pages.append({'url': url, 'filename': filename, 'year': year,
+                      'kind': 'team', 'team': t, 'markers': team_markers})
 
-    with open(filename, 'wb') as fd:
-        r = requests.get(url)
-        if r.status_code == 200:
-            fd.write(r.text)
-        else:
-            print 'Downloading {0} failed'.format(url)
+    return pages
 
-    return
 
-    return
+def draft_pages(data_dir, year):
+
+    data_dir = os.path.join(data_dir, "draft", str(year))
+    mkdir_p(data_dir)
+
+    filename = "draft.html"
+    filename = os.path.join(data_dir, filename)
+    url = base_draft_url.format(year=year)
 
+    return [{'url': url, 'filename': filename, 'year': year,
+             'kind': 'draft', 'markers': draft_markers}]
 
-def download_league(data_dir, leagueID, year):
+
+def league_pages(data_dir, leagueID, year):
     """
-       fetch standings and team data from espn.com
+       The standings and team data pages on espn.com
     """
     espn_pages = []
 
@@ -106,13 +230,17 @@ def download_league(data_dir, leagueID, year):
                 "leagueId={0}&seasonId={1}".format(leagueID, year)
     league_filename = "league.html"
     league_filename = os.path.join(league_dir, league_filename)
-    espn_pages.append({'url': leagueURL, 'filename': league_filename})
+    espn_pages.append({'url': leagueURL, 'filename': league_filename,
+                       'year': year, 'kind': 'league',
+                       'markers': ['playerTableTable']})
 
     standingsURL = "http://games.espn.go.com/fba/standings?" +\
                    "leagueId={0}&seasonId={1}".format(leagueID, year)
     standings_filename = "standings.html"
     standings_filename = os.path.join(league_dir, standings_filename)
-    espn_pages.append({'url': standingsURL, 'filename': standings_filename})
+    espn_pages.append({'url': standingsURL, 'filename': standings_filename,
+                       'year': year, 'kind': 'standings',
+                       'markers': ['statsTable']})
 
     draft_recap_url = 'http://games.espn.go.com/fba/tools/draftrecap?' +\
                       'leagueId={leagueID}&seasonId={year}'
@@ -120,28 +248,54 @@ def download_league(data_dir, leagueID, year):
     draft_recap_filename = "draft_recap.html"
     draft_recap_filename = os.path.join(league_dir, draft_recap_filename)
     espn_pages.append({'url': draft_recap_url,
-                       'filename': draft_recap_filename})
+                       'filename': draft_recap_filename,
+                       'year': year, 'kind': 'draft_recap'})
 
     schedule_url = 'http://games.espn.go.com/fba/schedule?' +\
                    'leagueId={leagueID}&seasonId={year}'
     schedule_url = schedule_url.format(year=year, leagueID=leagueID)
     schedule_filename = "schedule.html"
     schedule_filename = os.path.join(league_dir, schedule_filename)
-    espn_pages.append({'url': schedule_url, 'filename': schedule_filename})
+    espn_pages.append({'url': schedule_url, 'filename': schedule_filename,
+                       'year': year, 'kind': 'schedule'})
+
+    return espn_pages
+
+
+def download_teams(data_dir, year, workers=default_workers, limiter=None):
+
+    pages = team_pages(data_dir, year)
+    fetch(data_dir, pages, workers, limiter)
+
+
+def download_draft(data_dir, year, workers=default_workers, limiter=None):
 
-    for page in espn_pages:
-        fd = open(page['filename'], "w")
+    pages = draft_pages(data_dir, year)
+    fetch(data_dir, pages, workers, limiter)
+
+    return
 
-        c = pycurl.Curl()
-        c.setopt(c.URL, page['url'])
-        c.setopt(c.WRITEDATA, fd)
 
-        try:
-            c.perform()
-        except pycurl.error:
-            import traceback
-            traceback.print_exc(file=sys.stderr)
+def download_team(data_dir, team, year=time.strftime('%Y', time.localtime())):
 
-        fd.close()
+    data_dir = os.path.join(data_dir, "teams", str(year))
+    mkdir_p(data_dir)
+
+    filename = "{team}.html".format(team=team)
+    filename = os.path.join(data_dir, filename)
+    url = base_team_url.format(team=team, year=year)
+
+    fetch_page({'url': url, 'filename': filename, 'year': year,
+                'kind': 'team', 'team': team, 'markers': team_markers})
+
+    return
+
+
+def download_league(data_dir, leagueID, year, workers=default_workers,
+                    limiter=None):
+    """
+       fetch standings and team data from espn.com
+    """
 
-    c.close()
+    pages = league_pages(data_dir, leagueID, year)
+    fetch(data_dir, pages, workers, limiter)
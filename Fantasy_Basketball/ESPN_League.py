@@ -15,9 +15,23 @@
 
 import re
 import os
-from bs4 import BeautifulSoup
 import pandas as pd
 from Util import mkdir_p
+from Archive import read_raw
+from Archive import raw_exists
+from Extract import parse
+from Extract import find_tables
+from Extract import table_rows
+from Extract import cell_text
+from Extract import rows_to_columns
+from Extract import columns_to_dataframe
+import Schema
+from Store import write_frame
+from Store import read_frame
+from Store import frame_exists
+from Database import Database
+from Players import PlayerRegistry
+from Matcher import NameMatcher
 
 
 class ESPN_League(object):
@@ -50,10 +64,17 @@ class ESPN_League(object):
                                'processed_data',
                                str(self.year))
         mkdir_p(dst_dir)
-        dst_file = os.path.join(dst_dir, 'league_data.pkl')
-        self.df.to_pickle(dst_file)
-        dst_file = os.path.join(dst_dir, 'league_player_data.pkl')
-        self.team_df.to_pickle(dst_file)
+        dst_file = os.path.join(dst_dir, 'league_data')
+        write_frame(self.df, dst_file)
+        dst_file = os.path.join(dst_dir, 'league_player_data')
+        write_frame(self.team_df, dst_file)
+        dst_file = os.path.join(dst_dir, 'league_schedule')
+        write_frame(self.schedule_df, dst_file)
+
+        with Database(self.data_dir) as db:
+            db.write('league_data', self.df, self.year)
+            db.write('league_player_data', self.team_df, self.year)
+            db.write('league_schedule', self.schedule_df, self.year)
 
     def process_league(self):
         """
@@ -62,6 +83,7 @@ class ESPN_League(object):
 
         self.process_standings()
         self.process_player_data()
+        self.process_schedule()
 
     def process_standings(self):
         """
@@ -69,59 +91,53 @@ class ESPN_League(object):
         """
 
         filename = os.path.join(self.league_dir, 'standings.html')
-        with open(filename, 'r') as fd:
-            soup = BeautifulSoup(fd)
+        doc = parse(read_raw(filename))
 
-        df1 = self.process_standings_table_1(soup)
-        df2 = self.process_standings_table_2(soup)
+        df1 = self.process_standings_table_1(doc)
+        df2 = self.process_standings_table_2(doc)
 
         self.df = pd.merge(df1, df2, on='name')
 
-    def process_standings_table_1(self, soup):
+    def process_standings_table_1(self, doc):
         """
 
         """
 
-        tables = soup.findAll("table")
         data = []
 
-        for table in tables:
-            if table.findAll(text='EAST'):
-                east = table
-            if table.findAll(text='WEST'):
-                west = table
-
-        teams = east.findAll('tr')[2:]
-        for t in teams:
-            cols = t.findAll('td')
+        # the innermost table holding the conference name
+        east = find_tables(doc, text='EAST')[-1]
+        west = find_tables(doc, text='WEST')[-1]
+
+        teams = table_rows(east, tags=('td',))[2:]
+        for cols in teams:
             d = {}
-            d['wins'] = int(cols[1].text)
-            d['losses'] = int(cols[2].text)
-            d['ties'] = int(cols[3].text)
-            d['pct'] = float(cols[4].text)
-            if cols[5].text == '--':
+            d['wins'] = int(cols[1])
+            d['losses'] = int(cols[2])
+            d['ties'] = int(cols[3])
+            d['pct'] = float(cols[4])
+            if cols[5] == '--':
                 d['gb'] = 0
             else:
-                d['gb'] = float(cols[5].text)
+                d['gb'] = float(cols[5])
             d['conf'] = 'east'
-            teamName = (cols[0].text)
+            teamName = (cols[0])
             d['name'] = teamName
             data.append(d)
 
-        teams = west.findAll('tr')[2:]
-        for t in teams:
-            cols = t.findAll('td')
+        teams = table_rows(west, tags=('td',))[2:]
+        for cols in teams:
             d = {}
-            d['wins'] = int(cols[1].text)
-            d['losses'] = int(cols[2].text)
-            d['ties'] = int(cols[3].text)
-            d['pct'] = float(cols[4].text)
-            if cols[5].text == '--':
+            d['wins'] = int(cols[1])
+            d['losses'] = int(cols[2])
+            d['ties'] = int(cols[3])
+            d['pct'] = float(cols[4])
+            if cols[5] == '--':
                 d['gb'] = 0
             else:
-                d['gb'] = float(cols[5].text)
+                d['gb'] = float(cols[5])
             d['conf'] = 'west'
-            teamName = (cols[0].text)
+            teamName = (cols[0])
             d['name'] = teamName
             data.append(d)
 
@@ -129,57 +145,33 @@ class ESPN_League(object):
 
         return df
 
-    def process_standings_table_2(self, soup):
+    def process_standings_table_2(self, doc):
 
-        all_teams = soup.findAll('table', {'id': 'statsTable'})
+        all_teams = find_tables(doc, table_id='statsTable')
         all_teams = all_teams[0]
 
-        rows = all_teams.findAll('tr')
+        rows = table_rows(all_teams, tags=('td',))
         rows = rows[3:]  # the first three rows are fluff
 
-        teams = []
-        for row in rows:
-            d = {}
-            cols = row.findAll('td')
-
-            d['rank'] = int(cols[0].text)
-            d['name'] = cols[1].text
-            d['FG%'] = float(cols[3].text)
-            d['FT%'] = float(cols[4].text)
-            d['3PM'] = int(cols[5].text)
-            d['REB'] = int(cols[6].text)
-            d['AST'] = int(cols[7].text)
-            d['STL'] = int(cols[8].text)
-            d['BLK'] = int(cols[9].text)
-            d['PTS'] = int(cols[10].text)
-            d['TW'] = int(cols[11].text)
-
-            # ESPN changed their table format... thanks!
-            try:
-                d['moves'] = int(cols[14].text)
-            except IndexError:
-                d['moves'] = int(cols[13].text)
-
-            teams.append(d)
-
-        df = pd.DataFrame(teams)
+        # ESPN changed their table format... thanks!  Schema knows both
+        table = columns_to_dataframe(rows_to_columns(rows))
+        df = Schema.espn_standings.collect([table])
         return df
 
     def process_player_data(self):
 
         filename = os.path.join(self.league_dir, 'league.html')
-        with open(filename, 'r') as fd:
-            soup = BeautifulSoup(fd)
+        doc = parse(read_raw(filename))
 
         data = []
-        tables = soup.findAll("table", attrs={"class": "playerTableTable"})
+        tables = find_tables(doc, class_name='playerTableTable')
         for table in tables:
-            teamName = table.findAll('tr')[0].findAll('a')[0].text
+            teamName = table.xpath('.//tr')[0].xpath('.//a')[0].text_content()
             teamName = teamName
-            rows = table.findAll('tr')[2:]
+            rows = table.xpath('.//tr')[2:]
             for row in rows:
                 try:
-                    player = row.findAll('a')[0].text
+                    player = row.xpath('.//a')[0].text_content()
                     player = re.sub('^\s', '', player)
                     player = re.sub('\s$', '', player)
                     player = re.sub('\s\s+', ' ', player)
@@ -187,4 +179,61 @@ class ESPN_League(object):
                 except IndexError:
                     pass
 
-        self.team_df = pd.DataFrame(data)
+        # ESPN spells some names differently, match them to the season's
+        # players.  Before the season is processed only exact names match,
+        # augment_fantasy_teams matches the rest once it is.
+        stints_file = os.path.join(self.data_dir, 'processed_data',
+                                   str(self.year), 'stints')
+        pool = ()
+        if frame_exists(stints_file):
+            pool = read_frame(stints_file, columns=['player_id'])['player_id']
+
+        matcher = NameMatcher(PlayerRegistry(self.data_dir))
+        self.team_df = matcher.assign(pd.DataFrame(data), pool=pool)
+        matcher.save()
+
+    def process_schedule(self):
+        """
+           The league's matchups, a row per week and pairing, with the
+           category score, away-home-ties, of the ones that were played
+        """
+
+        filename = os.path.join(self.league_dir, 'schedule.html')
+        columns = ['week', 'away', 'home', 'away_cats', 'home_cats',
+                   'tied_cats', 'played']
+        if not raw_exists(filename):
+            print "No schedule in {0}".format(self.league_dir)
+            self.schedule_df = pd.DataFrame(columns=columns)
+            return
+
+        doc = parse(read_raw(filename))
+
+        data = []
+        week = None
+        for row in doc.xpath('//tr'):
+            # only the innermost rows, the page is laid out with tables
+            if row.xpath('.//tr'):
+                continue
+
+            links = [a for a in row.xpath('.//a')
+                     if 'clubhouse' in a.get('href', '')]
+            if len(links) < 2:
+                m = re.search(r'(?:WEEK|MATCHUP)\s+(\d+)',
+                              row.text_content(), re.IGNORECASE)
+                if m is not None:
+                    week = int(m.group(1))
+                continue
+
+            # team links may carry the record, e.g. 'Team Name (5-3)'
+            away, home = [re.sub(r'\s*\([0-9-]+\)$', '', cell_text(a))
+                          for a in links[0:2]]
+
+            cells = [cell_text(td) for td in row.xpath('./td')]
+            score = re.match(r'^(\d+)-(\d+)-(\d+)$', cells[-1])
+            if score is None:
+                data.append([week, away, home, 0, 0, 0, False])
+            else:
+                cats = [int(x) for x in score.groups()]
+                data.append([week, away, home] + cats + [True])
+
+        self.schedule_df = pd.DataFrame(data, columns=columns)
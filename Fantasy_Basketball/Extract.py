@@ -0,0 +1,173 @@
+#  Copyright (C) 2014 Devin Kelly
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import numpy as np
+import pandas as pd
+import lxml.html
+
+__author__ = "Devin Kelly"
+
+parser = lxml.html.HTMLParser(encoding='utf-8')
+
+
+def parse(data):
+    """
+       Parse a raw page into an lxml document
+
+       :param data: The page as a byte string
+    """
+
+    return lxml.html.document_fromstring(data, parser=parser)
+
+
+def find_tables(doc, table_id=None, class_name=None, text=None):
+    """
+       The tables in a document with a given id, class or text
+
+       :param doc: An lxml document
+       :param table_id: The table's id attribute
+       :param class_name: One of the table's classes
+       :param text: Text that appears somewhere in the table
+    """
+
+    xpath = '//table'
+    if table_id is not None:
+        xpath += '[@id="{0}"]'.format(table_id)
+    if class_name is not None:
+        xpath += '[contains(concat(" ", normalize-space(@class), " "), ' +\
+                 '" {0} ")]'.format(class_name)
+    if text is not None:
+        xpath += '[.//text()[normalize-space(.)="{0}"]]'.format(text)
+
+    return doc.xpath(xpath)
+
+
+def cell_text(cell):
+    return cell.text_content().strip()
+
+
+def table_rows(table, tags=('td', 'th'), body_only=False,
+               skip_classed=False):
+    """
+       The text of the cells of each row of a table
+
+       :param table: An lxml table element
+       :param tags: The cell tags to read
+       :param body_only: Only read the rows in the table's tbody
+       :param skip_classed: Skip rows with a class, basketball-reference
+                            marks its repeated header rows with one
+       :returns: list of lists of strings
+    """
+
+    rows = []
+    if body_only:
+        rows = table.xpath('./tbody/tr')
+    if not rows:
+        rows = table.xpath('.//tr')
+
+    cell_xpath = '|'.join('./' + t for t in tags)
+
+    data = []
+    for row in rows:
+        if skip_classed and row.get('class', '').strip():
+            continue
+        data.append([cell_text(c) for c in row.xpath(cell_xpath)])
+
+    return data
+
+
+def table_header(table):
+    """
+       The column names from the last header row of a table
+    """
+
+    rows = table.xpath('./thead/tr')
+    if not rows:
+        return []
+
+    return [cell_text(c) for c in rows[-1].xpath('./th|./td')]
+
+
+def convert_column(values):
+    """
+       Turn a list of cell strings into a typed numpy array, int if every
+       cell is a whole number, float if every cell is a number or empty,
+       and object otherwise with empty cells as NaN
+    """
+
+    if not values:
+        return np.array([], dtype=object)
+
+    empty = [v == '' for v in values]
+    try:
+        arr = np.array([v if v != '' else 'nan' for v in values],
+                       dtype=float)
+    except ValueError:
+        arr = np.array(values, dtype=object)
+        arr[np.array(empty)] = np.nan
+        return arr
+
+    if not any(empty) and not any('.' in v or 'e' in v.lower()
+                                  for v in values):
+        return arr.astype(np.int64)
+
+    return arr
+
+
+def rows_to_columns(rows):
+    """
+       Transpose rows of cell strings into typed column arrays, short rows
+       are padded with empty cells
+    """
+
+    ncols = max([len(r) for r in rows] + [0])
+    columns = [[] for _ in range(ncols)]
+    for row in rows:
+        for ii in range(ncols):
+            columns[ii].append(row[ii] if ii < len(row) else '')
+
+    return [convert_column(c) for c in columns]
+
+
+def extract_table(doc, table_id):
+    """
+       Pull one basketball-reference table out of a parsed page
+
+       :param doc: An lxml document
+       :param table_id: The table's id attribute
+       :returns: (header, columns), the header names and a typed array per
+                 column, or (None, None) if the table is not in the page
+    """
+
+    tables = find_tables(doc, table_id=table_id)
+    if not tables:
+        return None, None
+
+    rows = table_rows(tables[0], body_only=True, skip_classed=True)
+
+    return table_header(tables[0]), rows_to_columns(rows)
+
+
+def columns_to_dataframe(columns, header=None):
+    """
+       A DataFrame with one column per array, labelled with the header when
+       there is one name per column and with integers otherwise
+    """
+
+    df = pd.DataFrame(dict(enumerate(columns)), columns=range(len(columns)))
+    if header is not None and len(header) == len(columns):
+        df.columns = header
+
+    return df
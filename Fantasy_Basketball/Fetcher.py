@@ -0,0 +1,152 @@
+#  Copyright (C) 2014 Devin Kelly
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import sys
+import time
+import threading
+import traceback
+import urlparse
+from multiprocessing.pool import ThreadPool
+
+__author__ = "Devin Kelly"
+
+# requests per minute allowed to each host
+default_rate_limits = {'www.basketball-reference.com': 20,
+                       'games.espn.go.com': 30}
+default_rate = 20
+default_workers = 4
+
+
+class TokenBucket(object):
+
+    def __init__(self, rate, burst=1):
+        """
+           A token bucket that refills at a constant rate
+
+           :param rate: The number of tokens added per minute
+           :param burst: The most tokens the bucket can hold
+        """
+
+        self.rate = float(rate) / 60.0
+        self.burst = float(burst)
+        self.tokens = float(burst)
+        self.last = time.time()
+        self.lock = threading.Lock()
+
+    def refill(self):
+        now = time.time()
+        self.tokens = min(self.burst,
+                          self.tokens + (now - self.last) * self.rate)
+        self.last = now
+
+    def acquire(self):
+        """
+           Block until a token is available, then take it
+        """
+
+        while True:
+            with self.lock:
+                self.refill()
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                wait = (1.0 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class RateLimiter(object):
+
+    def __init__(self, rate_limits=None, default=default_rate):
+        """
+           Keeps one token bucket per host
+
+           :param rate_limits: dict of host to requests per minute
+           :param default: requests per minute for hosts not in rate_limits
+        """
+
+        self.rate_limits = dict(default_rate_limits)
+        if rate_limits is not None:
+            self.rate_limits.update(rate_limits)
+        self.default = default
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def bucket(self, host):
+        with self.lock:
+            if host not in self.buckets:
+                rate = self.rate_limits.get(host, self.default)
+                self.buckets[host] = TokenBucket(rate)
+            return self.buckets[host]
+
+    def acquire(self, url):
+        host = urlparse.urlparse(url).netloc
+        self.bucket(host).acquire()
+
+
+def parse_rate_limits(specs):
+    """
+       Turn a list of 'host=N' strings into a rate_limits dict
+
+       :param specs: list of strings, e.g. ['www.basketball-reference.com=30']
+       :raises ValueError:
+    """
+
+    rate_limits = {}
+    for spec in specs:
+        try:
+            host, rate = spec.split('=')
+            rate_limits[host.strip()] = float(rate)
+        except ValueError:
+            raise ValueError("Invalid rate limit '{0}', ".format(spec) +
+                             "expected HOST=REQUESTS_PER_MINUTE")
+
+    return rate_limits
+
+
+def fetch_pages(pages, fetch_func, workers=default_workers, limiter=None):
+    """
+       Run fetch_func over every page with a bounded number of requests in
+       flight, each request waiting on the rate limit of its host
+
+       :param pages: list of dicts, each with at least a 'url' key
+       :param fetch_func: called as fetch_func(page) for each page
+       :param workers: the most requests that may be in flight at once
+       :param limiter: a RateLimiter, one is made if not given
+       :returns: list of fetch_func's return values, None where it raised
+    """
+
+    if limiter is None:
+        limiter = RateLimiter()
+
+    def run(page):
+        limiter.acquire(page['url'])
+        try:
+            return fetch_func(page)
+        except Exception:
+            print 'Downloading {0} failed'.format(page['url'])
+            traceback.print_exc(file=sys.stderr)
+            return None
+
+    if not pages:
+        return []
+
+    pool = ThreadPool(max(1, min(workers, len(pages))))
+    try:
+        results = pool.map(run, pages)
+    finally:
+        pool.close()
+        pool.join()
+
+    return results
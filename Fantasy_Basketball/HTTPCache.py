@@ -0,0 +1,142 @@
+#  Copyright (C) 2014 Devin Kelly
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import json
+import threading
+
+from Archive import raw_exists
+from Archive import archive_of
+
+__author__ = "Devin Kelly"
+
+frozen_filename = 'frozen.json'
+frozen_lock = threading.Lock()
+
+
+def meta_filename(filename):
+    return filename + '.meta'
+
+
+def read_meta(filename):
+    """
+       Read the cache validators stored next to a downloaded page, or the
+       archive's if the page was pruned after it was archived
+
+       :param filename: The downloaded page
+       :returns: dict with 'url', 'etag' and 'last_modified', or {}
+    """
+
+    if not raw_exists(filename):
+        return {}
+
+    meta_file = meta_filename(filename)
+    if os.path.isfile(meta_file):
+        try:
+            with open(meta_file, 'r') as fd:
+                return json.load(fd)
+        except ValueError:
+            pass
+
+    archive = archive_of(filename)
+    if archive is None or os.path.isfile(filename):
+        return {}
+
+    return archive.meta(filename)
+
+
+def write_meta(filename, url, headers):
+    """
+       Store the ETag and Last-Modified response headers next to a page
+
+       :param filename: The downloaded page
+       :param url: The url the page was fetched from
+       :param headers: The response headers
+       :returns: The validators written
+    """
+
+    meta = {'url': url,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified')}
+
+    with open(meta_filename(filename), 'w') as fd:
+        json.dump(meta, fd)
+
+    return meta
+
+
+def conditional_headers(page):
+    """
+       Request headers that let the server answer 304 Not Modified
+
+       :param page: dict with 'url' and 'filename' keys
+    """
+
+    meta = read_meta(page['filename'])
+    if meta.get('url') != page['url']:
+        return {}
+
+    headers = {}
+    if meta.get('etag'):
+        headers['If-None-Match'] = meta['etag']
+    if meta.get('last_modified'):
+        headers['If-Modified-Since'] = meta['last_modified']
+
+    return headers
+
+
+def frozen_years(data_dir):
+    """
+       The seasons that are never fetched again once downloaded
+
+       :param data_dir: The raw data directory
+    """
+
+    filename = os.path.join(data_dir, frozen_filename)
+    if not os.path.isfile(filename):
+        return set()
+
+    with open(filename, 'r') as fd:
+        return set(int(y) for y in json.load(fd))
+
+
+def set_frozen(data_dir, year, frozen=True):
+    """
+       Pin or unpin a season
+
+       :param data_dir: The raw data directory
+       :param year: The season to pin
+       :param frozen: False to unpin the season
+    """
+
+    with frozen_lock:
+        years = frozen_years(data_dir)
+        if frozen:
+            years.add(int(year))
+        else:
+            years.discard(int(year))
+
+        filename = os.path.join(data_dir, frozen_filename)
+        with open(filename, 'w') as fd:
+            json.dump(sorted(years), fd)
+
+
+def is_frozen(page, years):
+    """
+       A page is skipped when its season is pinned and it is already on disk
+       or in the archive
+    """
+
+    return int(page['year']) in years and raw_exists(page['filename'])
@@ -0,0 +1,469 @@
+#  Copyright (C) 2014 Devin Kelly
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import cPickle as pickle
+import numpy as np
+import pandas as pd
+
+from Util import mkdir_p
+from Util import atomic_write
+from Valuation import categories as all_categories
+from Valuation import default_categories
+from Valuation import value_column
+
+__author__ = "Devin Kelly"
+
+valuation_filename = 'valuation.pkl'
+
+
+def moments(x, y, valid):
+    """
+       The count, means and centered second moments of two columns of
+       stats, per category and over the valid rows only
+
+       :param x: float array, rows x categories
+       :param y: float array, rows x categories
+       :param valid: bool array, rows x categories
+       :returns: tuple of float arrays, one entry per category, of
+                 (count, mean x, mean y, xx, xy, yy)
+    """
+
+    n = valid.sum(axis=0).astype(float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mx = np.where(n > 0, (x * valid).sum(axis=0) / n, 0.0)
+        my = np.where(n > 0, (y * valid).sum(axis=0) / n, 0.0)
+    dx = np.where(valid, x - mx, 0.0)
+    dy = np.where(valid, y - my, 0.0)
+
+    return (n, mx, my, (dx * dx).sum(axis=0), (dx * dy).sum(axis=0),
+            (dy * dy).sum(axis=0))
+
+
+class Season(object):
+
+    def __init__(self, player_ids, made, attempts, valid, volume,
+                 total_picks):
+        """
+           Running category moments of one season's players.  Every
+           category is kept as made and attempts, its stat is
+           made - pct * attempts where pct is the season's made over
+           attempts for a volume weighted percentage and 0 otherwise.  The
+           means and centered second moments of made and attempts are
+           merged and split a batch of players at a time, Welford's update
+           in the pairwise form of Chan et al., so the mean and std of every
+           category follow without a pass over the season or the
+           cancellation of a sum of squares.
+
+           As in Valuation a player missing a percentage still counts his
+           attempts towards the season's percentage, he only has no stat.
+
+           :param player_ids: array of player ids, one per row
+           :param made: float array, players x categories, 0 where missing
+           :param attempts: float array, players x categories
+           :param valid: bool array, players x categories, False where the
+                         stat is missing
+           :param volume: bool array, the categories weighted by volume
+           :param total_picks: The number of players drafted
+        """
+
+        self.player_ids = np.asarray(player_ids)
+        self.rows = dict((p, ii) for ii, p in enumerate(self.player_ids))
+        self.volume = volume
+        self.total_picks = total_picks
+
+        k = len(volume)
+        self.count = np.zeros(k)
+        self.mean_m = np.zeros(k)
+        self.mean_a = np.zeros(k)
+        self.c_mm = np.zeros(k)
+        self.c_ma = np.zeros(k)
+        self.c_aa = np.zeros(k)
+
+        # every player's makes and attempts go into the percentage
+        self.s_m = np.zeros(k)
+        self.s_a = np.zeros(k)
+
+        self.made = made
+        self.attempts = attempts
+        self.valid = valid
+        self.active = np.ones(len(self.player_ids), dtype=bool)
+        self.add(np.arange(len(self.player_ids)), 1.0)
+
+        self.drafted = np.zeros(len(self.player_ids), dtype=bool)
+        self.revalue()
+
+    def add(self, rows, sign):
+        """
+           Merge rows into the running moments, or split them back out with
+           sign -1
+        """
+
+        m = self.made[rows]
+        a = self.attempts[rows]
+        self.s_m += sign * m.sum(axis=0)
+        self.s_a += sign * a.sum(axis=0)
+
+        n_b, m_b, a_b, mm_b, ma_b, aa_b = moments(m, a, self.valid[rows])
+        n = self.count + sign * n_b
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if sign > 0:
+                rest = self.count
+                mean_m = self.mean_m + (m_b - self.mean_m) * n_b / n
+                mean_a = self.mean_a + (a_b - self.mean_a) * n_b / n
+                d_m = m_b - self.mean_m
+                d_a = a_b - self.mean_a
+                weight = rest * n_b / n
+                c_mm = self.c_mm + mm_b + d_m * d_m * weight
+                c_ma = self.c_ma + ma_b + d_m * d_a * weight
+                c_aa = self.c_aa + aa_b + d_a * d_a * weight
+            else:
+                rest = n
+                mean_m = (self.count * self.mean_m - n_b * m_b) / n
+                mean_a = (self.count * self.mean_a - n_b * a_b) / n
+                d_m = m_b - mean_m
+                d_a = a_b - mean_a
+                weight = rest * n_b / self.count
+                c_mm = self.c_mm - mm_b - d_m * d_m * weight
+                c_ma = self.c_ma - ma_b - d_m * d_a * weight
+                c_aa = self.c_aa - aa_b - d_a * d_a * weight
+
+        # a batch without a stat in a category leaves it alone, a season
+        # left without one starts again from nothing
+        same = n_b == 0
+        empty = n <= 0
+        for name, value in [('mean_m', mean_m), ('mean_a', mean_a),
+                            ('c_mm', c_mm), ('c_ma', c_ma), ('c_aa', c_aa)]:
+            value = np.where(same, getattr(self, name), value)
+            setattr(self, name, np.where(empty, 0.0, value))
+        self.count = np.maximum(n, 0.0)
+
+    def append(self, player_ids):
+        """
+           Rows for players not seen yet, without stats
+        """
+
+        for p in player_ids:
+            self.rows[p] = len(self.player_ids)
+            self.player_ids = np.append(self.player_ids, p)
+
+        shape = (len(player_ids), self.made.shape[1])
+        self.made = np.vstack([self.made, np.zeros(shape)])
+        self.attempts = np.vstack([self.attempts, np.zeros(shape)])
+        self.valid = np.vstack([self.valid, np.zeros(shape, dtype=bool)])
+        self.active = np.append(self.active,
+                                np.zeros(len(player_ids), dtype=bool))
+        self.drafted = np.append(self.drafted,
+                                 np.zeros(len(player_ids), dtype=bool))
+
+    def update(self, player_ids, made, attempts, valid):
+        """
+           Replace the stats of some players, adding the ones not seen yet
+        """
+
+        new = [p for p in player_ids if p not in self.rows]
+        if new:
+            self.append(new)
+
+        rows = np.array([self.rows[p] for p in player_ids], dtype=int)
+        self.add(rows, -1.0)
+        self.made[rows] = made
+        self.attempts[rows] = attempts
+        self.valid[rows] = valid
+        self.active[rows] = True
+        self.add(rows, 1.0)
+
+        self.revalue()
+
+    def remove(self, player_ids):
+        """
+           Take players out of the season, e.g. ones that fell under the
+           minutes cutoff
+        """
+
+        rows = np.array([self.rows[p] for p in player_ids], dtype=int)
+        self.add(rows, -1.0)
+        self.made[rows] = 0.0
+        self.attempts[rows] = 0.0
+        self.valid[rows] = False
+        self.active[rows] = False
+        self.drafted[rows] = False
+
+        self.revalue()
+
+    def changed(self, player_ids, made, attempts, valid):
+        """
+           Which of the given players' stats differ from the ones kept
+
+           :returns: bool array, one per player
+        """
+
+        changed = np.ones(len(player_ids), dtype=bool)
+        known = [ii for ii, p in enumerate(player_ids) if p in self.rows]
+        if not known:
+            return changed
+
+        rows = np.array([self.rows[player_ids[ii]] for ii in known],
+                        dtype=int)
+        same = self.active[rows] & \
+            (self.made[rows] == made[known]).all(axis=1) & \
+            (self.attempts[rows] == attempts[known]).all(axis=1) & \
+            (self.valid[rows] == valid[known]).all(axis=1)
+        changed[known] = ~same
+
+        return changed
+
+    def parameters(self):
+        """
+           The season's percentage, mean and std of every category
+        """
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            pct = np.where(self.volume, self.s_m / self.s_a, 0.0)
+            mean = self.mean_m - pct * self.mean_a
+            squares = self.c_mm - 2 * pct * self.c_ma + \
+                pct * pct * self.c_aa
+            var = squares / (self.count - 1)
+
+        return pct, mean, np.sqrt(np.maximum(var, 0.0))
+
+    def revalue(self):
+        pct, mean, std = self.parameters()
+        stat = np.where(self.valid, self.made - pct * self.attempts, np.nan)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.z = (stat - mean) / std
+        self.values = self.z.sum(axis=1)
+        self.redraft()
+
+    def redraft(self):
+        """
+           Fix the drafted players after values changed.  Only the players
+           between the lowest drafted value and the highest undrafted value
+           can change sides, the rest keep theirs.
+        """
+
+        ranked = np.where(np.isnan(self.values) | ~self.active, -np.inf,
+                          self.values)
+        k = min(self.total_picks, self.active.sum())
+
+        if self.drafted.sum() != k:
+            self.drafted[:] = False
+            if k > 0:
+                self.drafted[np.argpartition(-ranked, k - 1)[:k]] = True
+            return
+
+        if k == 0 or k == len(ranked):
+            return
+
+        lo = ranked[self.drafted].min()
+        hi = ranked[~self.drafted].max()
+        if lo >= hi:
+            return
+
+        sure = self.drafted & (ranked > hi)
+        unsure = np.flatnonzero((self.drafted & (ranked <= hi)) |
+                                (~self.drafted & (ranked >= lo)))
+        need = k - sure.sum()
+
+        self.drafted[unsure] = False
+        if need > 0:
+            top = np.argpartition(-ranked[unsure], need - 1)[:need]
+            self.drafted[unsure[top]] = True
+
+    def prices(self, money_supply):
+        drafted = self.drafted & self.active & ~np.isnan(self.values)
+        drafted_value = np.where(drafted, self.values, 0.0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            prices = 2.0 * money_supply * drafted_value / drafted_value.sum()
+
+        return np.where(drafted, prices, 0.0)
+
+
+class IncrementalValuation(object):
+
+    def __init__(self, df, categories=default_categories, volume=False,
+                 nplayers=6, money_per_player=200, players_per_team=13):
+        """
+           Values and prices that are kept up to date as players' stats
+           change, with running moments per category and year instead of a
+           recompute over the whole frame.  The results are the ones
+           augment_value and augment_price give before rounding.
+
+           :param df: The players, with player_id, year and stat columns
+           :param categories: The scoring categories
+           :param volume: Weight FG% and FT% by attempts
+        """
+
+        self.categories = categories
+        self.cats = [all_categories[c] for c in categories]
+        self.volume = np.array([volume and c.attempts is not None
+                                for c in self.cats])
+        self.total_picks = nplayers * players_per_team
+        self.money_supply = float(nplayers * money_per_player)
+
+        self.seasons = {}
+        for year, group in df.groupby('year'):
+            self.seasons[year] = self.season(group)
+
+    def season(self, df):
+        made, attempts, valid = self.stats(df)
+        return Season(df['player_id'].values, made, attempts, valid,
+                      self.volume, self.total_picks)
+
+    def stats(self, df):
+        """
+           The made, attempts and valid matrices of a frame of players.  A
+           plain stat is its made, with no attempts.
+        """
+
+        made = np.zeros((len(df), len(self.cats)))
+        attempts = np.zeros((len(df), len(self.cats)))
+        valid = np.zeros((len(df), len(self.cats)), dtype=bool)
+        for jj, c in enumerate(self.cats):
+            col = c.sign * df[c.column].values.astype(float)
+            valid[:, jj] = ~np.isnan(col)
+            if self.volume[jj]:
+                a = np.nan_to_num(df[c.attempts].values.astype(float))
+                made[:, jj] = np.nan_to_num(col) * a
+                attempts[:, jj] = c.sign * a
+            else:
+                made[:, jj] = np.nan_to_num(col)
+
+        return made, attempts, valid
+
+    def update(self, df):
+        """
+           New stats for some players
+
+           :param df: The changed players, with player_id, year and stat
+                      columns
+           :returns: The years that changed
+        """
+
+        years = []
+        for year, group in df.groupby('year'):
+            if year in self.seasons:
+                made, attempts, valid = self.stats(group)
+                self.seasons[year].update(list(group['player_id'].values),
+                                          made, attempts, valid)
+            else:
+                self.seasons[year] = self.season(group)
+            years.append(year)
+
+        return years
+
+    def sync(self, df):
+        """
+           Bring the valuation in line with a new frame of the same
+           seasons, only the players whose stats changed are updated and
+           the players no longer in it are removed
+
+           :param df: Every player of the seasons, with player_id, year and
+                      stat columns
+           :returns: The number of players updated or removed
+        """
+
+        n = 0
+        for year, group in df.groupby('year'):
+            if year not in self.seasons:
+                self.seasons[year] = self.season(group)
+                n += len(group)
+                continue
+
+            s = self.seasons[year]
+            player_ids = list(group['player_id'].values)
+            made, attempts, valid = self.stats(group)
+            changed = s.changed(player_ids, made, attempts, valid)
+            if changed.any():
+                s.update([p for p, c in zip(player_ids, changed) if c],
+                         made[changed], attempts[changed], valid[changed])
+
+            gone = set(s.player_ids[s.active]) - set(player_ids)
+            if gone:
+                s.remove(list(gone))
+
+            n += changed.sum() + len(gone)
+
+        return n
+
+    def frame(self):
+        """
+           Every player's per category z-scores, value and price
+        """
+
+        frames = []
+        for year in sorted(self.seasons):
+            s = self.seasons[year]
+            df = pd.DataFrame({'player_id': s.player_ids})
+            df['year'] = year
+            for jj, name in enumerate(self.categories):
+                df[value_column(name)] = s.z[:, jj]
+            df['value'] = s.values
+            df['price'] = s.prices(self.money_supply)
+            frames.append(df[s.active])
+
+        if not frames:
+            return pd.DataFrame()
+
+        return pd.concat(frames, ignore_index=True)
+
+    def augment(self, df):
+        """
+           Add the value_<category>, value and price columns to a frame of
+           the players valued, rounded like augment_value and augment_price
+           round them
+        """
+
+        values = self.frame()
+        columns = [value_column(c) for c in self.categories] + \
+            ['value', 'price']
+        df = df.drop([c for c in columns if c in df], axis=1)
+        df = pd.merge(df, values, on=['year', 'player_id'], how='left')
+        for c in columns:
+            df[c] = np.round(df[c], 3)
+
+        return df
+
+
+def valuation_path(data_dir, year):
+    return os.path.join(data_dir, 'processed_data', str(year),
+                        valuation_filename)
+
+
+def load_valuation(path, key):
+    """
+       The valuation saved at path, None if there is none or it was made
+       with other settings
+
+       :param key: The settings the valuation has to have been made with
+    """
+
+    if not os.path.isfile(path):
+        return None
+
+    with open(path, 'rb') as fd:
+        saved_key, valuation = pickle.load(fd)
+
+    if saved_key != key:
+        return None
+
+    return valuation
+
+
+def save_valuation(path, valuation, key):
+    mkdir_p(os.path.dirname(path))
+    data = pickle.dumps((key, valuation), pickle.HIGHEST_PROTOCOL)
+    atomic_write([data], path)
@@ -0,0 +1,129 @@
+#  Copyright (C) 2014 Devin Kelly
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import json
+import time
+import hashlib
+import threading
+
+from Util import atomic_write
+from Archive import raw_exists
+from Archive import read_raw
+
+__author__ = "Devin Kelly"
+
+manifest_filename = 'manifest.json'
+
+
+def raw_digest(filename):
+    """
+       The size and sha1 of a raw file, read from the archive once the
+       loose file has been pruned
+
+       :returns: (size, hexdigest)
+    """
+
+    data = read_raw(filename)
+    return len(data), hashlib.sha1(data).hexdigest()
+
+
+def page_key(page):
+    """
+       The manifest key of a page, 'kind/team/year'
+    """
+
+    return '{0}/{1}/{2}'.format(page['kind'], page.get('team') or '-',
+                                page['year'])
+
+
+class Manifest(object):
+
+    def __init__(self, data_dir):
+        """
+           A record of every page fetched into a raw data directory
+
+           :param data_dir: The raw data directory
+        """
+
+        self.filename = os.path.join(data_dir, manifest_filename)
+        self.lock = threading.Lock()
+        self.entries = {}
+
+        if os.path.isfile(self.filename):
+            with open(self.filename, 'r') as fd:
+                self.entries = json.load(fd)
+
+    def save(self):
+        """
+           Write the manifest, a crash part way through leaves the old one
+        """
+
+        text = json.dumps(self.entries, indent=1, sort_keys=True)
+        atomic_write([text], self.filename)
+
+    def is_done(self, page):
+        entry = self.entries.get(page_key(page))
+        if entry is None or entry['status'] != 'done':
+            return False
+
+        return raw_exists(page['filename'])
+
+    def pending(self, pages):
+        """
+           The pages that have not been fetched successfully yet
+        """
+
+        return [p for p in pages if not self.is_done(p)]
+
+    def record(self, page, status):
+        """
+           Record the outcome of fetching a page and save the manifest
+
+           :param page: The page dict
+           :param status: The HTTP status code, None if the fetch raised
+        """
+
+        entry = {'kind': page['kind'],
+                 'team': page.get('team'),
+                 'year': int(page['year']),
+                 'url': page['url'],
+                 'filename': page['filename'],
+                 'http_status': status,
+                 'updated': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                 'size': None,
+                 'sha1': None}
+
+        # a 304 writes nothing, the page may only be in the archive
+        if status in (200, 304) and raw_exists(page['filename']):
+            entry['status'] = 'done'
+            entry['size'], entry['sha1'] = raw_digest(page['filename'])
+        else:
+            entry['status'] = 'failed'
+
+        with self.lock:
+            self.entries[page_key(page)] = entry
+            self.save()
+
+    def summary(self):
+        """
+           The number of entries with each status
+        """
+
+        counts = {}
+        for entry in self.entries.values():
+            counts[entry['status']] = counts.get(entry['status'], 0) + 1
+
+        return counts
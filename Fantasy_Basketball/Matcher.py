@@ -0,0 +1,270 @@
+#  Copyright (C) 2014 Devin Kelly
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import json
+import pandas as pd
+from collections import defaultdict
+
+from Util import mkdir_p
+from Util import atomic_write
+from Players import normalize_name
+
+__author__ = "Devin Kelly"
+
+matches_filename = 'name_matches.json'
+
+# the lowest score a fuzzy match is accepted at, first name spellings,
+# Lou for Louis, score about 0.78
+default_min_score = 0.75
+
+
+def last_name(key):
+    """
+       The last word of a normalized name, numerals count, the last name of
+       u'gary payton ii' is u'ii' so he is never matched to Gary Payton
+    """
+
+    words = key.split()
+    return words[-1] if words else u''
+
+
+def trigrams(key):
+    """
+       The set of three letter substrings of a normalized name, padded so
+       the start and end of the name count for more
+    """
+
+    padded = u'  ' + key + u' '
+    return set(padded[ii:ii + 3] for ii in range(len(padded) - 2))
+
+
+class TrigramIndex(object):
+
+    def __init__(self):
+        """
+           An inverted index from trigram to the names that contain it, a
+           search only scores the names that share a trigram with the query
+        """
+
+        self.postings = defaultdict(set)
+        self.sizes = {}
+        self.values = {}
+
+    def add(self, key, value):
+        grams = trigrams(key)
+        self.sizes[key] = len(grams)
+        self.values[key] = value
+        for g in grams:
+            self.postings[g].add(key)
+
+    def search(self, key, min_score=default_min_score):
+        """
+           The closest name to key by the Dice coefficient of their
+           trigrams
+
+           :returns: (score, indexed key, value), or None if nothing scores
+                     min_score or more
+        """
+
+        grams = trigrams(key)
+        n = len(grams)
+
+        shared = defaultdict(int)
+        for g in grams:
+            for k in self.postings.get(g, ()):
+                shared[k] += 1
+
+        best = None
+        for k, count in shared.items():
+            score = 2.0 * count / (n + self.sizes[k])
+            if score >= min_score and (best is None or score > best[0]):
+                best = (score, k, self.values[k])
+
+        return best
+
+
+class NameMatcher(object):
+
+    def __init__(self, registry, min_score=default_min_score):
+        """
+           Match names from another site to the players in a registry,
+           exactly when the normalized names agree and by trigram
+           similarity otherwise.  A fuzzy match must have the same last
+           name and is never made to a player another name matched
+           exactly.  Accepted fuzzy matches are saved next to the registry
+           with their score and made aliases, so each spelling is only
+           matched once.  A name that matches nobody is reported and left
+           without an id, it is never added to the registry.
+
+           :param registry: The PlayerRegistry
+           :param min_score: The lowest score a fuzzy match is accepted at
+        """
+
+        self.registry = registry
+        self.min_score = min_score
+        self.filename = os.path.join(os.path.dirname(registry.filename),
+                                     matches_filename)
+        self.matches = {}
+        self.unmatched = []
+        self.changed = False
+
+        if os.path.isfile(self.filename):
+            with open(self.filename, 'r') as fd:
+                self.matches = json.load(fd)
+
+    def index(self, pool):
+        """
+           A TrigramIndex of every spelling of the players in pool
+        """
+
+        index = TrigramIndex()
+        for key, player_id in self.registry.ids.items():
+            if player_id in pool:
+                index.add(key, player_id)
+
+        return index
+
+    def accepts(self, key, matched, score):
+        """
+           Whether a fuzzy match of key to the indexed name matched is good
+           enough to make an alias
+        """
+
+        return score >= self.min_score and last_name(key) == last_name(matched)
+
+    def forget(self, name):
+        """
+           Drop a saved match that the rules no longer accept, the name is
+           matched again
+        """
+
+        key = normalize_name(name)
+        match = self.matches.pop(key)
+        if self.registry.ids.get(key) == match['player_id']:
+            self.registry.forget(name)
+        self.changed = True
+        print u"Unmatched {0} from {1}".format(
+            name, self.registry.name(match['player_id'])).encode('utf-8')
+
+    def match(self, name, pool, index=None, exact=()):
+        """
+           The player in pool a name belongs to
+
+           :param name: The name as the other site spells it
+           :param pool: set of player ids to match against
+           :param index: A TrigramIndex of pool, built if None
+           :param exact: Player ids other names matched exactly, never
+                         matched fuzzily
+           :returns: (player_id, score), score is 1.0 for an exact match
+                     and None otherwise.  player_id is the registry's id
+                     for a known name outside pool and None for a name
+                     nobody has.
+        """
+
+        key = normalize_name(name)
+        if key in self.matches:
+            match = self.matches[key]
+            if not self.accepts(key, match['matched'], match['score']) or \
+               match['player_id'] in exact:
+                self.forget(name)
+
+        player_id = self.registry.lookup(name)
+        if player_id in pool:
+            if key in self.matches:
+                return player_id, self.matches[key]['score']
+            return player_id, 1.0
+
+        if index is None:
+            index = self.index(set(pool) - set(exact))
+
+        best = index.search(key, self.min_score)
+        if best is None or not self.accepts(key, best[1], best[0]):
+            if player_id is None:
+                self.unmatched.append(name)
+                print u"No player matches {0}".format(name).encode('utf-8')
+            return player_id, None
+
+        score, matched, player_id = best
+        self.registry.alias(name, player_id)
+        self.matches[key] = {'player_id': player_id,
+                             'matched': matched,
+                             'score': round(score, 3)}
+        self.changed = True
+        print u"Matched {0} to {1} ({2:.2f})".format(
+            name, self.registry.name(player_id), score).encode('utf-8')
+
+        return player_id, self.matches[key]['score']
+
+    def match_ids(self, names, pool=None):
+        """
+           The player id of each name.  Names that match exactly are
+           matched first, the players they claim are left out of the fuzzy
+           matches.
+
+           :param names: Names as the other site spells them
+           :param pool: Player ids to match against, every player in the
+                        registry if None
+           :returns: (list of ids, list of scores)
+        """
+
+        if pool is None:
+            pool = set(self.registry.ids.values())
+        pool = set(pool)
+
+        exact = set()
+        for name in names:
+            key = normalize_name(name)
+            player_id = self.registry.lookup(name)
+            if player_id in pool and key not in self.matches:
+                exact.add(player_id)
+
+        index = None
+        ids = []
+        scores = []
+        for name in names:
+            if index is None and self.registry.lookup(name) not in pool:
+                index = self.index(pool - exact)
+            player_id, score = self.match(name, pool, index, exact)
+            ids.append(player_id)
+            scores.append(score)
+
+        return ids, scores
+
+    def assign(self, df, pool=None, column='Player'):
+        """
+           Add player_id and match_score columns to a frame of players from
+           another site, player_id is NaN for a name that matched nobody
+
+           :param pool: Player ids to match against, the season's players,
+                        every player in the registry if None
+        """
+
+        df = df[df[column].notnull()].copy()
+        ids, scores = self.match_ids(df[column], pool)
+        df['player_id'] = pd.Series(ids, index=df.index, dtype=float)
+        df['match_score'] = scores
+
+        return df
+
+    def save(self):
+        self.registry.save()
+        if not self.changed:
+            return
+
+        mkdir_p(os.path.dirname(self.filename))
+        text = json.dumps(self.matches, indent=1, sort_keys=True)
+        atomic_write([text], self.filename)
+        self.changed = False
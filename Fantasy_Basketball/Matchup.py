@@ -0,0 +1,218 @@
+#  Copyright (C) 2014 Devin Kelly
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import numpy as np
+import pandas as pd
+
+from Valuation import categories as all_categories
+from Valuation import default_categories
+
+__author__ = "Devin Kelly"
+
+# an NBA team plays 3 or 4 games a week
+games_per_week = 3.5
+
+# seasons simulated at once, bounds the size of the arrays
+batch_size = 1000
+
+
+def stat_columns(categories=default_categories):
+    """
+       The team_data columns the categories are computed from
+    """
+
+    columns = []
+    for name in categories:
+        c = all_categories[name]
+        columns.append(c.column)
+        if c.attempts is not None:
+            columns.append(c.attempts)
+
+    return columns
+
+
+class TeamRates(object):
+
+    def __init__(self, df, categories=default_categories):
+        """
+           Each fantasy team's expected weekly stats, the sum over its
+           players of per game stats times the games they play in a week.
+           A player's games are scaled by his share of the games played so
+           far, so the injured and the benched count for less.
+
+           :param df: team_data, with Fantasy Team, G and the category
+                      columns
+           :param categories: The scoring categories
+        """
+
+        df = df[df['Fantasy Team'].notnull() & (df['Fantasy Team'] != 'FA')]
+        self.categories = categories
+        self.cats = [all_categories[c] for c in categories]
+        self.signs = np.array([c.sign for c in self.cats])
+        self.pct = np.array([c.attempts is not None for c in self.cats])
+
+        games = np.nan_to_num(df['G'].values.astype(float))
+        weekly = games_per_week * games / max(games.max(), 1.0)
+
+        codes, teams = pd.factorize(df['Fantasy Team'])
+        self.teams = list(teams)
+
+        # counts per week, attempts for a percentage
+        self.rates = np.zeros((len(teams), len(self.cats)))
+        # the chance an attempt is made, for a percentage
+        self.makes = np.zeros((len(teams), len(self.cats)))
+        for jj, c in enumerate(self.cats):
+            col = np.nan_to_num(df[c.column].values.astype(float))
+            if c.attempts is None:
+                self.rates[:, jj] = np.bincount(codes, weights=weekly * col,
+                                                minlength=len(teams))
+                continue
+            attempts = np.nan_to_num(df[c.attempts].values.astype(float))
+            a = np.bincount(codes, weights=weekly * attempts,
+                            minlength=len(teams))
+            m = np.bincount(codes, weights=weekly * attempts * col,
+                            minlength=len(teams))
+            self.rates[:, jj] = a
+            self.makes[:, jj] = np.where(a > 0, m / np.maximum(a, 1e-12), 0)
+
+    def index(self, names):
+        """
+           The row of each team
+
+           :raises ValueError: for a team with no rostered players
+        """
+
+        missing = sorted(set(n for n in names if n not in self.teams))
+        if missing:
+            raise ValueError("No players for {0}".format(', '.join(missing)))
+
+        return np.array([self.teams.index(n) for n in names], dtype=int)
+
+    def sample(self, rs, teams, trials):
+        """
+           One week of stats for each team in each trial
+
+           :param teams: array of team rows, one per matchup
+           :returns: float array, trials x matchups x categories
+        """
+
+        counts = rs.poisson(self.rates[teams], (trials,) + (len(teams),
+                                                            len(self.cats)))
+        made = rs.binomial(counts, self.makes[teams])
+
+        return np.where(self.pct, made / np.maximum(counts, 1.0), counts)
+
+
+def simulate_season(schedule, rates, trials=10000, seed=0):
+    """
+       Play the rest of the season many times over.  Every matchup is won
+       by the team that takes more categories, the standings count
+       categories won, lost and tied as ESPN does.  Teams that finish with
+       the same record are ranked in a random order.
+
+       :param schedule: The league_schedule frame from ESPN_League
+       :param rates: TeamRates of the league's teams
+       :param trials: The number of seasons to play
+       :returns: (DataFrame of the remaining matchups with each side's
+                 chance of winning, DataFrame of the standings with the
+                 expected final record, chance of finishing first and
+                 expected finish)
+    """
+
+    rs = np.random.RandomState(seed)
+    teams = sorted(set(schedule['away']) | set(schedule['home']))
+    rows = rates.index(teams)
+    nteams = len(teams)
+    ncats = len(rates.cats)
+
+    played = schedule[schedule['played'].astype(bool)]
+    left = schedule[~schedule['played'].astype(bool)]
+
+    def one_hot(names):
+        m = np.zeros((len(names), nteams))
+        m[np.arange(len(names)), [teams.index(n) for n in names]] = 1
+        return m
+
+    # the record so far
+    away, home = one_hot(played['away']), one_hot(played['home'])
+    won = np.dot(played['away_cats'].values, away) + \
+        np.dot(played['home_cats'].values, home)
+    lost = np.dot(played['home_cats'].values, away) + \
+        np.dot(played['away_cats'].values, home)
+    tied = np.dot(played['tied_cats'].values, away + home)
+
+    away, home = one_hot(left['away']), one_hot(left['home'])
+    away_rows = rows[[teams.index(n) for n in left['away']]]
+    home_rows = rows[[teams.index(n) for n in left['home']]]
+
+    nleft = len(left)
+    away_wins = np.zeros(nleft)
+    home_wins = np.zeros(nleft)
+    away_cats = np.zeros(nleft)
+    home_cats = np.zeros(nleft)
+    final = np.zeros((3, nteams))
+    first = np.zeros(nteams)
+    finish = np.zeros(nteams)
+
+    done = 0
+    while done < trials:
+        n = min(batch_size, trials - done)
+        done += n
+
+        diff = rates.signs * (rates.sample(rs, away_rows, n) -
+                              rates.sample(rs, home_rows, n))
+        a = (diff > 0).sum(axis=2)
+        h = (diff < 0).sum(axis=2)
+        t = ncats - a - h
+
+        away_wins += (a > h).sum(axis=0)
+        home_wins += (h > a).sum(axis=0)
+        away_cats += a.sum(axis=0)
+        home_cats += h.sum(axis=0)
+
+        w = won + np.dot(a, away) + np.dot(h, home)
+        lo = lost + np.dot(h, away) + np.dot(a, home)
+        ti = tied + np.dot(t, away + home)
+        final += [w.sum(axis=0), lo.sum(axis=0), ti.sum(axis=0)]
+
+        games = np.maximum(w + lo + ti, 1)
+        pct = (w + 0.5 * ti) / games
+        # teams with the same record are put in a random order, argsort
+        # alone would rank them alphabetically
+        order = np.lexsort((rs.rand(n, nteams), -pct))
+        rank = np.argsort(order, axis=1) + 1
+        first += (rank == 1).sum(axis=0)
+        finish += rank.sum(axis=0)
+
+    matchups = pd.DataFrame({'week': left['week'].values,
+                             'away': left['away'].values,
+                             'home': left['home'].values})
+    matchups['p_away'] = np.round(away_wins / trials, 3)
+    matchups['p_home'] = np.round(home_wins / trials, 3)
+    matchups['p_tie'] = np.round(1 - matchups['p_away'] -
+                                 matchups['p_home'], 3)
+    matchups['away_cats'] = np.round(away_cats / trials, 2)
+    matchups['home_cats'] = np.round(home_cats / trials, 2)
+
+    standings = pd.DataFrame({'team': teams, 'W': won, 'L': lost,
+                              'T': tied})
+    standings['final_W'] = np.round(final[0] / trials, 1)
+    standings['final_L'] = np.round(final[1] / trials, 1)
+    standings['final_T'] = np.round(final[2] / trials, 1)
+    standings['p_first'] = np.round(first / trials, 3)
+    standings['finish'] = np.round(finish / trials, 2)
+    standings = standings.sort('finish')
+
+    return matchups, standings
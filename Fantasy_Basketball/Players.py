@@ -0,0 +1,152 @@
+#  Copyright (C) 2014 Devin Kelly
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import re
+import json
+import unicodedata
+
+from Util import mkdir_p
+from Util import atomic_write
+
+__author__ = "Devin Kelly"
+
+registry_filename = 'players.json'
+
+# dropped from the end of a name since the sites do not agree on them,
+# numerals are kept, they tell a Gary Payton II from a Gary Payton
+name_suffixes = ['jr', 'sr']
+
+
+def normalize_name(name):
+    """
+       The form of a player's name both sites agree on, accents, case,
+       punctuation and suffixes removed, i.e.
+       u'Nen\\xea Hilario' -> u'nene hilario'
+       'Otto Porter Jr.' -> u'otto porter'
+       'J.J. Redick*' -> u'jj redick'
+    """
+
+    if not isinstance(name, unicode):
+        name = str(name).decode('utf-8')
+
+    name = unicodedata.normalize('NFKD', name)
+    name = u''.join(c for c in name if not unicodedata.combining(c))
+    name = name.lower()
+    name = re.sub(r"[.'`*]", u'', name)
+    name = re.sub(r'[^a-z0-9]+', u' ', name)
+
+    words = name.split()
+    while len(words) > 2 and words[-1] in name_suffixes:
+        words.pop()
+
+    return u' '.join(words)
+
+
+class PlayerRegistry(object):
+
+    def __init__(self, data_dir):
+        """
+           Stable integer ids for players, shared by every site and season,
+           kept in processed_data/players.json
+
+           :param data_dir: The fantasy basketball data directory
+        """
+
+        self.filename = os.path.join(data_dir, 'processed_data',
+                                     registry_filename)
+        self.ids = {}
+        self.names = {}
+        self.changed = False
+
+        if os.path.isfile(self.filename):
+            with open(self.filename, 'r') as fd:
+                data = json.load(fd)
+            self.ids = data['ids']
+            self.names = dict((int(k), v) for k, v in data['names'].items())
+
+        self.next_id = max(self.names.keys() or [0]) + 1
+
+    def lookup(self, name):
+        """
+           The id of a player, None if the player has not been seen
+        """
+
+        return self.ids.get(normalize_name(name))
+
+    def id_for(self, name):
+        """
+           The id of a player, assigning the next free id to a new player.
+           The first spelling seen is kept as the player's name.
+        """
+
+        key = normalize_name(name)
+        if key not in self.ids:
+            self.ids[key] = self.next_id
+            self.names[self.next_id] = name
+            self.next_id += 1
+            self.changed = True
+
+        return self.ids[key]
+
+    def alias(self, name, player_id):
+        """
+           Make name another spelling of an existing player
+        """
+
+        key = normalize_name(name)
+        if self.ids.get(key) != player_id:
+            self.ids[key] = player_id
+            self.changed = True
+
+    def forget(self, name):
+        """
+           Drop a spelling that was an alias, the player keeps his other
+           spellings
+        """
+
+        key = normalize_name(name)
+        if self.ids.pop(key, None) is not None:
+            self.changed = True
+
+    def name(self, player_id):
+        return self.names.get(player_id)
+
+    def assign(self, df, column='Player'):
+        """
+           Add an integer player_id column to a frame of players, rows
+           without a name are dropped
+
+           :param df: The DataFrame
+           :param column: The column holding the players' names
+           :returns: DataFrame
+        """
+
+        df = df[df[column].notnull()].copy()
+        ids = dict((n, self.id_for(n)) for n in df[column].unique())
+        df['player_id'] = df[column].map(ids).astype(int)
+
+        return df
+
+    def save(self):
+        if not self.changed:
+            return
+
+        mkdir_p(os.path.dirname(self.filename))
+        names = dict((str(k), v) for k, v in self.names.items())
+        text = json.dumps({'ids': self.ids, 'names': names}, indent=1,
+                          sort_keys=True)
+        atomic_write([text], self.filename)
+        self.changed = False
@@ -15,24 +15,27 @@
 
 import os
 import json
-import pandas as pd
 import numpy as np
 
 from Util import mkdir_p
+from Dataset import Dataset
 
 import matplotlib.pyplot as plt
 import re
 
+# the only columns the plots use
+plot_columns = ['Player', 'Pos', 'value', 'FG%', 'FT%', 'TRB', 'AST', 'BLK',
+                'PTS']
+
 
 class Plotter(object):
 
     def __init__(self, data_dir, year):
-        default_processed_data_dir = os.path.join(data_dir, 'processed_data')
         default_plot_dir = os.path.join(data_dir, 'plots')
         self.save_dir = os.path.join(default_plot_dir, year)
-        fname = os.path.join(default_processed_data_dir, year, 'team_data.pkl')
 
-        self.df = pd.read_pickle(fname)
+        query = Dataset(data_dir).query().years(year)
+        self.df = query.columns(*plot_columns).load()
         self.year = year
 
         self.make_positional_df()
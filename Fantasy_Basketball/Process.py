@@ -16,8 +16,9 @@
 import os
 import re
 import sys
+import time
+from multiprocessing import Pool
 import numpy as np
-from bs4 import BeautifulSoup
 import pandas as pd
 
 from Dataframe_Augmenter import augment_minutes
@@ -26,226 +27,358 @@ from Dataframe_Augmenter import augment_value
 from Dataframe_Augmenter import augment_draft_data
 from Dataframe_Augmenter import augment_fantasy_teams
 from Util import mkdir_p
+from Archive import raw_exists
+from Archive import read_raw
+from Extract import parse
+from Extract import extract_table
+from Extract import columns_to_dataframe
+from ProcessCache import ProcessCache
+import Schema
+from Store import write_frame
+from Store import frame_file
+from Store import frame_exists
+from Store import frame_columns
+from Dataset import Dataset
+from Database import Database
+from Players import PlayerRegistry
+from Players import registry_filename
+from Matcher import matches_filename
+from Valuation import default_categories
+from Incremental import IncrementalValuation
+from Incremental import valuation_path
+from Incremental import load_valuation
+from Incremental import save_valuation
+from Punt import write_punt_values
+from Punt import punt_path
+from Stints import combine_stints
+from Stints import per_game_weights
+from Stints import per_game_sums
+from Stints import advanced_weights
+from Stints import advanced_sums
 from TeamData import teams
 
+team_table_ids = ['roster', 'per_game', 'salaries', 'advanced']
+
+
+def get_player_stats(data_dir, year, jobs=1, use_cache=True, nplayers=6,
+                     money_per_player=200, players_per_team=13,
+                     categories=default_categories, volume=False,
+                     incremental=False):
+    """
+       Process a season's team pages into team_data
+
+       :param incremental: Keep the season's valuation between runs and
+                           only revalue the players whose stats changed
+    """
 
-def get_player_stats(data_dir, year):
     d = os.path.join(data_dir, 'raw_data', 'teams', str(year))
     pkl = os.path.join(data_dir, 'processed_data', str(year))
     draft_dir = os.path.join(data_dir, 'raw_data', 'draft')
 
-    df = get_players(d, year)
+    # values and prices depend on the league settings as well as the inputs
+    output = 'team_data:{0}:{1}:{2}:{3}:{4}'.format(
+        nplayers, money_per_player, players_per_team, ','.join(categories),
+        volume)
+
+    cache = None
+    inputs = input_files(data_dir, year)
+    if use_cache:
+        cache = ProcessCache(os.path.join(pkl, 'cache'))
+        team_data_file = os.path.join(pkl, 'team_data')
+        if cache.unchanged(output, inputs) and \
+           frame_exists(team_data_file):
+            with Database(data_dir) as db:
+                stored = db.has_season('team_data', year)
+            if stored:
+                print "No inputs changed since the last run, nothing to do"
+                return
+
+    registry = PlayerRegistry(data_dir)
+    df, stints = get_players(d, year, registry, jobs, cache)
     if os.path.isdir(draft_dir):
-        draft_df = get_draft(draft_dir)
+        draft_df = registry.assign(get_draft(draft_dir, cache))
         df = augment_draft_data(df, draft_df)
 
-    df = augment_fantasy_teams(df, data_dir)
+    df = augment_fantasy_teams(df, data_dir, registry)
+    registry.save()
     df = augment_minutes(df)
-    df = augment_value(df)
-    df = augment_price(df)
+    if incremental:
+        valuation_file = valuation_path(data_dir, year)
+        valuation = load_valuation(valuation_file, output)
+        if valuation is None:
+            valuation = IncrementalValuation(df, categories, volume,
+                                             nplayers, money_per_player,
+                                             players_per_team)
+        else:
+            print "Revalued {0} players".format(valuation.sync(df))
+        df = valuation.augment(df)
+        save_valuation(valuation_file, valuation, output)
+    else:
+        df = augment_value(df, categories, volume)
+        df = augment_price(df, nplayers, money_per_player, players_per_team)
 
     mkdir_p(pkl)
-    pkl = os.path.join(pkl, 'team_data.pkl')
-    df.to_pickle(pkl)
+    write_frame(stints, os.path.join(pkl, 'stints'))
+    write_punt_values(punt_path(data_dir, year), df, categories)
+    pkl = os.path.join(pkl, 'team_data')
+    write_frame(df, pkl)
+
+    with Database(data_dir) as db:
+        db.write('stints', stints, year)
+        db.write('team_data', df, year)
+
+    if cache is not None:
+        # this run saved the registry and the name matches, the output is
+        # done for them as they are now
+        cache.forget(player_id_files(data_dir))
+        cache.mark_done(output, inputs)
+        cache.save()
+        print "Parsed {0} inputs, reused {1} from the cache".format(
+            cache.misses, cache.hits)
+
+
+def input_files(data_dir, year):
+    """
+       Every raw input get_player_stats reads for a season
+    """
+
+    d = os.path.join(data_dir, 'raw_data', 'teams', str(year))
+    draft_dir = os.path.join(data_dir, 'raw_data', 'draft')
+    processed_dir = os.path.join(data_dir, 'processed_data', str(year))
+
+    inputs = [os.path.join(d, "{0}.html".format(t)) for t in teams[int(year)]]
+    inputs.extend(f for _, f in draft_files(draft_dir))
+    league_player_data = os.path.join(processed_dir, 'league_player_data')
+    inputs.append(frame_file(league_player_data) or league_player_data)
+
+    inputs.extend(player_id_files(data_dir))
+
+    return inputs
+
+
+def player_id_files(data_dir):
+    """
+       The player registry and the name matches, the player ids come from
+       them so editing either changes the output
+    """
+
+    processed_dir = os.path.join(data_dir, 'processed_data')
+    return [os.path.join(processed_dir, registry_filename),
+            os.path.join(processed_dir, matches_filename)]
 
 
 def get_dataframe(filename, table_id):
-    if not os.path.isfile(filename):
+    return get_tables(filename, [table_id])[table_id]
+
+
+def get_tables(filename, table_ids):
+    """
+       Parse a page once and pull every requested table out of it
+
+       :param filename: The raw html file
+       :param table_ids: The ids of the tables to extract
+       :returns: dict of table id to DataFrame, labelled with the table's
+                 header names when it has one
+    """
+
+    if not raw_exists(filename):
         print "Cannot open file, try downloading data\n{0}".format(filename)
         sys.exit(1)
 
-    with open(filename, 'r') as fd:
-        soup = BeautifulSoup(fd.read())
+    doc = parse(read_raw(filename))
 
-    try:
-        table = soup.find('table', {'id': table_id})
-        body = table.find('tbody')
-        rows = body.find_all('tr', {'class': ''})
-    except AttributeError:
-        print "Parsing {0} failed".format(filename)
-        return pd.DataFrame()
+    tables = {}
+    for table_id in table_ids:
+        header, columns = extract_table(doc, table_id)
+        if columns is None:
+            print "Parsing {0} failed".format(filename)
+            tables[table_id] = pd.DataFrame()
+        else:
+            tables[table_id] = columns_to_dataframe(columns, header)
 
-    rows = [str(r.encode('utf-8')) for r in rows if r['class'] == ['']]
+    return tables
 
-    html = '<table>' + ''.join(rows) + '</table>'
 
-    df = pd.io.html.read_html(html, infer_types=False)[0]
+def get_team_tables(data_dir, year, table_ids=team_table_ids, jobs=1,
+                    cache=None):
+    """
+       Parse each team page of a season once and extract all of the tables
 
-    return df
+       :param data_dir: The directory holding the season's team pages
+       :param year: The season
+       :param table_ids: The ids of the tables to extract
+       :param jobs: The number of processes to parse the pages with
+       :param cache: A ProcessCache, pages that have not changed since they
+                     were cached are not parsed again
+       :returns: dict of table id to a list of DataFrames, one per team, in
+                 the order of season_teams whatever the number of jobs
+    """
+
+    tables = dict((table_id, []) for table_id in table_ids)
+
+    filenames = [os.path.join(data_dir, "{0}.html".format(t))
+                 for t in season_teams(data_dir, year)]
+
+    parsed = {}
+    if cache is not None:
+        for f in filenames:
+            cached = cache.load(cache_key(f, table_ids), f)
+            if cached is not None:
+                parsed[f] = cached
+
+    work = [(f, table_ids) for f in filenames if f not in parsed]
+
+    if jobs > 1 and len(work) > 1:
+        pool = Pool(min(jobs, len(work)))
+        try:
+            results = pool.map(parse_team_page, work)
+        finally:
+            pool.close()
+            pool.join()
+        print_worker_report(results)
+    else:
+        results = [parse_team_page(w) for w in work]
+
+    for (f, _), (team_tables, _, _) in zip(work, results):
+        parsed[f] = team_tables
+        if cache is not None:
+            cache.store(cache_key(f, table_ids), f, team_tables)
+
+    for f in filenames:
+        for table_id in table_ids:
+            tables[table_id].append(parsed[f][table_id])
+
+    return tables
+
+
+def season_teams(data_dir, year):
+    """
+       The teams of a season whose page has been downloaded
+    """
 
+    return [t for t in teams[int(year)]
+            if raw_exists(os.path.join(data_dir, "{0}.html".format(t)))]
 
-def get_draft(data_dir):
 
-    df = pd.DataFrame()
-    cols = ['Rk', 'Pk', 'Tm', 'Player', 'College', 'G', 'MP', 'PTS', 'TRB',
-            'AST', 'FG%', '3P%', 'FT%', 'MP_PG', 'PTS_PG', 'TRB_PG',
-            'AST_PG', 'WS', 'WS/48']
-    delete_cols = ['Rk', 'Tm', 'College', 'G', 'MP', 'PTS', 'TRB', 'AST',
-                   'FG%', '3P%', 'FT%', 'MP_PG', 'PTS_PG', 'TRB_PG', 'AST_PG',
-                   'WS', 'WS/48']
+def cache_key(filename, table_ids):
+    return '{0}:{1}'.format(filename, ','.join(table_ids))
 
+
+def parse_team_page(work):
+    """
+       Parse one team page, run in a worker process when parsing in parallel
+
+       :param work: (filename, table_ids)
+       :returns: (tables, pid, seconds)
+    """
+
+    filename, table_ids = work
+    start = time.time()
+    tables = get_tables(filename, table_ids)
+
+    return tables, os.getpid(), time.time() - start
+
+
+def print_worker_report(results):
+    """
+       Print the number of pages and time spent parsing in each worker
+    """
+
+    workers = {}
+    for _, pid, seconds in results:
+        pages, total = workers.get(pid, (0, 0.0))
+        workers[pid] = (pages + 1, total + seconds)
+
+    for pid in sorted(workers):
+        pages, total = workers[pid]
+        print 'worker {0}: {1} pages in {2:.2f}s'.format(pid, pages, total)
+
+
+def draft_files(data_dir):
+    """
+       (year, filename) for every downloaded draft page
+    """
+
+    files = []
     for root, _, _ in os.walk(data_dir, topdown=False):
         try:
             year = re.search(r'[0-9]{4}', root).group(0)
         except AttributeError:
             continue
-        d = os.path.join(data_dir, root, 'draft.html')
-        tmp = get_dataframe(d, 'stats')
-        tmp.columns = cols
-        tmp['draft_team'] = tmp['Tm']
-        for dc in delete_cols:
-            del tmp[dc]
-        tmp['draft_year'] = int(year)
-        tmp['Pk'] = tmp['Pk'].astype(int)
-        df = df.append(tmp)
+        files.append((year, os.path.join(data_dir, root, 'draft.html')))
 
-    return df
+    return files
 
 
-def get_advanced(data_dir, year):
-
-    df = pd.DataFrame()
-
-    cols_24 = ['Rk', 'Player', 'Age', 'G', 'MP', 'PER', 'TS%', 'eFG%', 'FTr',
-               '3PAr', 'ORB%', 'DRB%', 'TRB%', 'AST%', 'STL%', 'BLK%', 'TOV%',
-               'USG%', 'ORtg', 'DRtg', 'OWS', 'DWS', 'WS', 'WS/48']
-    types = [int, unicode, int, int, int, float, float, float, float, float,
-             float, float, float, float, float, float, float, float, float,
-             float, float, float, float, float]
-    cols_24_types = dict(zip(cols_24, types))
-
-    cols_25 = ['Rk', 'Player', 'Age', 'G', 'MP', 'PER', 'TS%', '3PAr', 'FTr',
-               'ORB%', 'DRB%', 'TRB%', 'AST%', 'STL%', 'BLK%', 'TOV%', 'USG%',
-               'OWS', 'DWS', 'WS', 'WS/48', 'OBPM', 'DBPM', 'BPM', 'VORP']
-    types = [int, unicode, int, int, int, float, float, float, float, float,
-             float, float, float, float, float, float, float, float, float,
-             float, float, float, float, float, float]
-    cols_25_types = dict(zip(cols_25, types))
-
-    for t in teams[int(year)]:
-        filename = os.path.join(data_dir, "{0}.html".format(t))
-        if os.path.isfile(filename):
-            tmp = get_dataframe(filename, 'advanced')
-            tmp.dropna(axis=1, inplace=True, how='all')
-            tmp.fillna(0)
-            if tmp.shape[1] == 24:
-                tmp.columns = cols_24
-                for k in cols_24_types:
-                    tmp[k] = tmp[k].astype(cols_24_types[k])
-            else:
-                tmp.columns = cols_25
-                for k in cols_25_types:
-                    tmp[k] = tmp[k].astype(cols_25_types[k])
-            tmp['year'] = int(year)
-            df = df.append(tmp)
-
-    del df['Rk']
-    del df['Age']
-    del df['G']
+def get_draft(data_dir, cache=None):
+
+    frames = []
+    for year, d in draft_files(data_dir):
+        tmp = None
+        if cache is not None:
+            tmp = cache.load(cache_key(d, ['stats']), d)
+        if tmp is None:
+            tmp = Schema.draft.collect([get_dataframe(d, 'stats')])
+            tmp['draft_year'] = int(year)
+            if cache is not None:
+                cache.store(cache_key(d, ['stats']), d, tmp)
+        frames.append(tmp)
+
+    if not frames:
+        return pd.DataFrame()
+
+    return pd.concat(frames, ignore_index=True)
+
+
+def get_advanced(data_dir, year, frames=None):
+
+    if frames is None:
+        frames = get_team_tables(data_dir, year, ['advanced'])['advanced']
+
+    df = Schema.advanced.collect(frames, season_teams(data_dir, year))
+    df['year'] = int(year)
 
     return df
 
 
-def get_pergame(data_dir, year):
-
-    df = pd.DataFrame()
-
-    cols = ['ind', 'Player', 'Age', 'G', 'GS', 'MP', 'FG', 'FGA', 'FG%', '3P',
-            '3PA', '3P%', '2P', '2PA', '2P%', 'FT', 'FTA', 'FT%', 'ORB', 'DRB',
-            'TRB', 'AST', 'STL', 'BLK', 'TOV', 'PF', 'PTS']
-
-    for t in teams[int(year)]:
-        filename = os.path.join(data_dir, "{0}.html".format(t))
-        if os.path.isfile(filename):
-            tmp = get_dataframe(filename, 'per_game')
-            tmp.columns = cols
-            tmp['year'] = int(year)
-            df = df.append(tmp)
-
-    del df['MP']
-    df['Age'] = df['Age'].astype(int)
-    df['G'] = df['G'].astype(int)
-    df['GS'] = df['GS'].astype(int)
-    df['FG'] = df['FG'].astype(float)
-    df['FGA'] = df['FGA'].astype(float)
-    df['FG%'] = df['FG%'].astype(float)
-    df['3P'] = df['3P'].astype(float)
-    df['3PA'] = df['3PA'].astype(float)
-    df['3P%'] = df['3P%'].astype(float)
-    df['2P'] = df['2P'].astype(float)
-    df['2PA'] = df['2PA'].astype(float)
-    df['2P%'] = df['2P%'].astype(float)
-    df['FT'] = df['FT'].astype(float)
-    df['FTA'] = df['FTA'].astype(float)
-    df['FT%'] = df['FT%'].astype(float)
-    df['ORB'] = df['ORB'].astype(float)
-    df['DRB'] = df['DRB'].astype(float)
-    df['TRB'] = df['TRB'].astype(float)
-    df['AST'] = df['AST'].astype(float)
-    df['STL'] = df['STL'].astype(float)
-    df['BLK'] = df['BLK'].astype(float)
-    df['TOV'] = df['TOV'].astype(float)
-    df['PF'] = df['PF'].astype(float)
-    df['PTS'] = df['PTS'].astype(float)
-
-    del df['ind']
-
-    set_types = {'Age': int, 'G': int, 'GS': int, 'FG': float, 'FGA': float,
-                 'FG%': float, '3P': float, '3PA': float, '3P%': float,
-                 '2P': float, '2PA': float, '2P%': float, 'FT': float,
-                 'FTA': float, 'FT%': float, 'ORB': float, 'DRB': float,
-                 'TRB': float, 'AST': float, 'STL': float, 'BLK': float,
-                 'TOV': float, 'PF': float, 'PTS': float}
-
-    for ii in set_types:
-        df[ii] = df[ii].astype(set_types[ii])
-        df[ii].fillna(0, inplace=True)
+def get_pergame(data_dir, year, frames=None):
+
+    if frames is None:
+        frames = get_team_tables(data_dir, year, ['per_game'])['per_game']
+
+    df = Schema.per_game.collect(frames, season_teams(data_dir, year))
+    df['year'] = int(year)
 
     return df
 
 
-def get_salaries(data_dir, year):
-    df = pd.DataFrame()
+def get_salaries(data_dir, year, frames=None):
 
-    cols = ['ind', 'Player', 'Salary']
+    if frames is None:
+        frames = get_team_tables(data_dir, year, ['salaries'])['salaries']
 
-    for t in teams[int(year)]:
-        filename = os.path.join(data_dir, "{0}.html".format(t))
-        if os.path.isfile(filename):
-            tmp = get_dataframe(filename, 'salaries')
-            tmp.columns = cols
-            tmp['year'] = int(year)
-            df = df.append(tmp, ignore_index=True)
+    df = Schema.salaries.collect(frames, season_teams(data_dir, year))
+    df['year'] = int(year)
 
-    df['Salary'] = df['Salary'].str.replace(r'[$,]', '').astype('float')
+    salary = df['Salary'].astype(unicode).str.replace(r'[$,]', '')
+    df['Salary'] = salary.astype('float')
     df['Salary'] = df['Salary'] / 1e6
     df['Salary'] = np.round(df['Salary'], 3)
-    del df['ind']
 
     return df
 
 
-def get_roster(data_dir, year):
-    df = pd.DataFrame()
+def get_roster(data_dir, year, frames=None):
 
-    cols = ['No.', 'Player', 'Pos', 'Ht', 'Wt',
-            'Birth Date', 'Experience', 'College']
+    if frames is None:
+        frames = get_team_tables(data_dir, year, ['roster'])['roster']
 
-    none_opened = True
-    for t in teams[int(year)]:
-        filename = os.path.join(data_dir, "{0}.html".format(t))
-        if os.path.isfile(filename):
-            tmp = get_dataframe(filename, 'roster')
-            tmp.columns = cols
-            tmp['year'] = year
-            df = df.append(tmp)
-            none_opened = False
-
-    if none_opened:
+    if not frames:
         print "Could not find raw data in {0}".format(data_dir)
         sys.exit(1)
 
-    del df['No.']
+    df = Schema.roster.collect(frames, season_teams(data_dir, year))
+    df['year'] = int(year)
 
     # replace positions so that only C-PF-SF-SG-PG exist
     replacement = {"Pos": {'PF-SF': 'PF', 'PG-SG': 'PG',
@@ -261,35 +394,60 @@ def get_roster(data_dir, year):
         return int(t[0]) * 12 + int(t[1])
 
     df['Experience'].replace('R', 0, inplace=True)
+    df['Experience'] = df['Experience'].astype(float).fillna(0).astype(int)
     df['Ht'] = df['Ht'].apply(heigh_to_inches)
 
-    df['Wt'].fillna(0, inplace=True)
-    df['Wt'] = df['Wt'].astype(int)
-
     return df
 
 
-def get_players(data_dir, year):
-    df1 = get_roster(data_dir, year)
-    df2 = get_pergame(data_dir, year)
-    df3 = get_salaries(data_dir, year)
-    df4 = get_advanced(data_dir, year)
+def get_players(data_dir, year, registry, jobs=1, cache=None):
+    """
+       Every player of a season, the team tables joined on player_id
+
+       :param registry: The PlayerRegistry giving each player an id
+       :returns: (DataFrame of seasons, DataFrame of stints, a row per
+                 player and team)
+    """
+
+    tables = get_team_tables(data_dir, year, jobs=jobs, cache=cache)
+    df1 = get_roster(data_dir, year, tables['roster'])
+    df2 = get_pergame(data_dir, year, tables['per_game'])
+    df3 = get_salaries(data_dir, year, tables['salaries'])
+    df4 = get_advanced(data_dir, year, tables['advanced'])
     del df2['year']
     del df3['year']
     del df4['year']
 
-    # FIXME -- players who get traded wind up as dupes.  here I just drop
-    # drop their first team, which isn't optimal, their stats should be
-    # averaged or something.
-    df1.drop_duplicates('Player', inplace=True, take_last=True)
-    df2.drop_duplicates('Player', inplace=True, take_last=True)
-    df3.drop_duplicates('Player', inplace=True, take_last=True)
-    df4.drop_duplicates('Player', inplace=True, take_last=True)
-    df5 = pd.merge(df1, df2, left_on="Player", right_on="Player", how="outer")
-    df6 = pd.merge(df5, df3, left_on="Player", right_on="Player", how="outer")
-    df7 = pd.merge(df6, df4, left_on="Player", right_on="Player", how="outer")
-
-    return df7
+    df1 = registry.assign(df1)
+    df2 = registry.assign(df2)
+    df3 = registry.assign(df3)
+    df4 = registry.assign(df4)
+
+    # a traded player has a row on each of his teams, keep those as stints
+    # and combine them into his season
+    stints = pd.merge(df2, df4.drop('Player', axis=1),
+                      on=['player_id', 'Tm'], how='outer')
+    df2 = combine_stints(df2, per_game_weights, per_game_sums)
+    df4 = combine_stints(df4, advanced_weights, advanced_sums)
+
+    # bio and contract are the same on every team
+    df1.drop_duplicates('player_id', inplace=True, take_last=True)
+    df3.drop_duplicates('player_id', inplace=True, take_last=True)
+    del df1['Tm']
+    del df3['Tm']
+    del df4['Tm']
+
+    # the name is taken from the registry so it is the same in every table
+    del df1['Player']
+    del df2['Player']
+    del df3['Player']
+    del df4['Player']
+    df5 = pd.merge(df1, df2, on='player_id', how='outer')
+    df6 = pd.merge(df5, df3, on='player_id', how='outer')
+    df7 = pd.merge(df6, df4, on='player_id', how='outer')
+    df7['Player'] = df7['player_id'].map(registry.name)
+
+    return df7, stints
 
 
 def htmlToPandas(filename, name):
@@ -332,27 +490,31 @@ def htmlToPandas(filename, name):
 
 def get_fantasy_teams(data_dir, year):
     processed_dir = os.path.join(data_dir, 'processed_data', str(year))
-    team_data_file = os.path.join(processed_dir, 'team_data.pkl')
-    fantasy_team_file = os.path.join(processed_dir, 'fantasy_team_data.pkl')
+    team_data_file = os.path.join(processed_dir, 'team_data')
+    fantasy_team_file = os.path.join(processed_dir, 'fantasy_team_data')
+
+    cols_to_round = {'Age': 2, 'G': 2, 'GS': 2, 'MP': 2, 'FG%': 3,
+                     'FT%': 3, '3P': 2, 'TRB': 2, 'AST': 2, 'STL': 2,
+                     'BLK': 2, 'PTS': 2, 'Salary': 3, 'value': 2,
+                     'price': 2, 'PER': 3, 'WS': 3}
 
-    if os.path.isfile(fantasy_team_file):
+    if frame_exists(team_data_file) and \
+       'Fantasy Team' in frame_columns(team_data_file):
 
-        df = pd.read_pickle(team_data_file)
-        df = df[df['Fantasy Team'] != 'FA']
+        query = Dataset(data_dir).query().years(year)
+        query = query.columns('Fantasy Team', *sorted(cols_to_round))
+        df = query.where('Fantasy Team', 'FA', exclude=True).load()
 
         grouped = df.groupby('Fantasy Team')
         grouped = grouped.mean()
         grouped['Fantasy Team'] = grouped.index
         grouped.index = range(grouped.shape[0])
 
-        cols_to_round = {'Age': 2, 'G': 2, 'GS': 2, 'MP': 2, 'FG%': 3,
-                         'FT%': 3, '3P': 2, 'TRB': 2, 'AST': 2, 'STL': 2,
-                         'BLK': 2, 'PTS': 2, 'Salary': 3, 'value': 2,
-                         'price': 2, 'PER': 3, 'WS': 3}
-
         for ii in cols_to_round:
             grouped[ii] = np.round(grouped[ii], cols_to_round[ii])
 
-        grouped.to_pickle(fantasy_team_file)
+        write_frame(grouped, fantasy_team_file)
+        with Database(data_dir) as db:
+            db.write('fantasy_team_data', grouped, year)
 
     return
@@ -0,0 +1,143 @@
+#  Copyright (C) 2014 Devin Kelly
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import json
+import hashlib
+import cPickle as pickle
+
+from Util import mkdir_p
+from Util import atomic_write
+from Archive import raw_exists
+from Archive import read_raw
+
+__author__ = "Devin Kelly"
+
+index_filename = 'index.json'
+
+# bump when the format of the cached frames changes
+cache_version = 2
+
+
+class ProcessCache(object):
+
+    def __init__(self, cache_dir):
+        """
+           Parsed intermediate results keyed by the fingerprint of the raw
+           input they came from, so only changed inputs are parsed again
+
+           :param cache_dir: The directory to keep the cache in
+        """
+
+        self.cache_dir = cache_dir
+        self.index_file = os.path.join(cache_dir, index_filename)
+        self.fingerprints = {}
+        self.hits = 0
+        self.misses = 0
+
+        self.index = {}
+        if os.path.isfile(self.index_file):
+            with open(self.index_file, 'r') as fd:
+                self.index = json.load(fd)
+
+    def fingerprint(self, filename):
+        """
+           The sha1 of a raw input, None if the input does not exist
+        """
+
+        if filename not in self.fingerprints:
+            if raw_exists(filename):
+                data = read_raw(filename)
+                self.fingerprints[filename] = hashlib.sha1(data).hexdigest()
+            else:
+                self.fingerprints[filename] = None
+
+        return self.fingerprints[filename]
+
+    def entry_file(self, key):
+        return os.path.join(self.cache_dir,
+                            hashlib.sha1(key).hexdigest() + '.pkl')
+
+    def load(self, key, filename):
+        """
+           The cached result for key if filename has not changed since it
+           was stored, otherwise None
+        """
+
+        entry = self.index.get(key)
+        fp = self.fingerprint(filename)
+        if entry is None or fp is None or entry['fingerprint'] != fp or \
+           entry.get('version') != cache_version:
+            self.misses += 1
+            return None
+
+        try:
+            with open(self.entry_file(key), 'rb') as fd:
+                obj = pickle.load(fd)
+        except (IOError, EOFError, pickle.UnpicklingError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return obj
+
+    def store(self, key, filename, obj):
+        """
+           Cache the result parsed from filename under key
+        """
+
+        mkdir_p(self.cache_dir)
+        data = pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
+        atomic_write([data], self.entry_file(key))
+        self.index[key] = {'fingerprint': self.fingerprint(filename),
+                           'filename': filename,
+                           'version': cache_version}
+
+    def inputs_fingerprint(self, filenames):
+        """
+           One fingerprint covering a set of inputs
+        """
+
+        h = hashlib.sha1()
+        for filename in sorted(filenames):
+            h.update(filename)
+            h.update(self.fingerprint(filename) or '-')
+
+        return h.hexdigest()
+
+    def unchanged(self, name, filenames):
+        """
+           True if the inputs of name are the same as when it was marked done
+        """
+
+        fp = self.inputs_fingerprint(filenames)
+        return self.index.get('output:' + name, {}).get('fingerprint') == fp
+
+    def forget(self, filenames):
+        """
+           Drop the remembered fingerprints of files that were rewritten
+        """
+
+        for filename in filenames:
+            self.fingerprints.pop(filename, None)
+
+    def mark_done(self, name, filenames):
+        fp = self.inputs_fingerprint(filenames)
+        self.index['output:' + name] = {'fingerprint': fp}
+
+    def save(self):
+        mkdir_p(self.cache_dir)
+        text = json.dumps(self.index, indent=1, sort_keys=True)
+        atomic_write([text], self.index_file)
@@ -0,0 +1,159 @@
+#  Copyright (C) 2014 Devin Kelly
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import io
+import json
+import numpy as np
+import pandas as pd
+
+from Util import atomic_write
+from Valuation import value_column
+
+__author__ = "Devin Kelly"
+
+
+def kept_matrix(ncategories):
+    """
+       Which categories count in each punt, bit j of a mask set means
+       category j is punted
+
+       :returns: float array, categories x 2 ** categories, 1 where the
+                 category is kept
+    """
+
+    masks = np.arange(2 ** ncategories)
+    bits = (masks[np.newaxis, :] >> np.arange(ncategories)[:, np.newaxis]) & 1
+
+    return (1 - bits).astype(float)
+
+
+def punt_values(z):
+    """
+       Every player's value under every punt in one matrix product.  A
+       player missing a category's z-score has no value under the punts
+       that keep it, as in Valuation, and is valued under the ones that
+       punt it.
+
+       :param z: float array of z-scores, players x categories
+       :returns: float array, players x 2 ** categories, column m is the
+                 value with the categories in mask m punted
+    """
+
+    kept = kept_matrix(z.shape[1])
+    missing = np.isnan(z)
+    values = np.dot(np.where(missing, 0.0, z), kept)
+    values[np.dot(missing.astype(float), kept) > 0] = np.nan
+
+    return values
+
+
+def punt_mask(categories, punted):
+    """
+       The mask of a punt
+
+       :param categories: The league's categories, in value order
+       :param punted: The categories given up, e.g. ['FT%', 'TO']
+       :raises ValueError: for a category the league does not score
+    """
+
+    mask = 0
+    for name in punted:
+        mask |= 1 << categories.index(name)
+
+    return mask
+
+
+def write_punt_values(path, df, categories):
+    """
+       Store the punt values of a season's players, a float32 array with a
+       row per mask and a column per player, so the values under one punt
+       are contiguous on disk, and the player ids and categories it is in
+       the order of
+
+       :param path: The path without an extension, .npy and .json are
+                    written
+       :param df: The players, with player_id and value_<category> columns
+       :param categories: The categories the players were valued on
+    """
+
+    z = df[[value_column(c) for c in categories]].values.astype(float)
+    values = np.ascontiguousarray(punt_values(z).T, dtype=np.float32)
+
+    buf = io.BytesIO()
+    np.save(buf, values)
+    atomic_write([buf.getvalue()], path + '.npy')
+
+    meta = {'categories': list(categories),
+            'player_id': [int(p) for p in df['player_id']],
+            'layout': 'masks'}
+    atomic_write([json.dumps(meta)], path + '.json')
+
+
+class PuntTable(object):
+
+    def __init__(self, path):
+        """
+           The stored punt values of a season, the array is memory mapped
+           so the values under one punt are read from a single row.  A
+           player's values under every punt are spread over every row.
+
+           :param path: The path write_punt_values was given
+           :raises IOError: if the punt values have not been written
+        """
+
+        if not os.path.isfile(path + '.npy'):
+            raise IOError("No punt values at {0}".format(path))
+
+        with open(path + '.json', 'r') as fd:
+            meta = json.load(fd)
+
+        self.categories = meta['categories']
+        self.player_ids = np.array(meta['player_id'], dtype=int)
+        self.array = np.load(path + '.npy', mmap_mode='r')
+
+        # written before the array was stored a row per mask
+        if meta.get('layout') != 'masks':
+            self.array = self.array.T
+
+    def mask(self, punted):
+        return punt_mask(self.categories, punted)
+
+    def values(self, punted=()):
+        """
+           Every player's value with the given categories punted
+
+           :returns: Series indexed by player_id
+        """
+
+        row = np.array(self.array[self.mask(punted)])
+        return pd.Series(row, index=self.player_ids)
+
+    def player(self, player_id):
+        """
+           One player's value under every punt
+
+           :returns: Series indexed by mask
+        """
+
+        column = np.flatnonzero(self.player_ids == player_id)
+        if len(column) == 0:
+            raise KeyError(player_id)
+
+        return pd.Series(np.array(self.array[:, column[0]]))
+
+
+def punt_path(data_dir, year):
+    return os.path.join(data_dir, 'processed_data', str(year), 'punt_values')
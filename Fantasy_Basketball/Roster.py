@@ -0,0 +1,290 @@
+#  Copyright (C) 2014 Devin Kelly
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import numpy as np
+import pandas as pd
+
+from Players import normalize_name
+
+__author__ = "Devin Kelly"
+
+positions = ['PG', 'SG', 'SF', 'PF', 'C']
+
+# one of each position, the rest of the roster is utility
+default_requirements = 'PG:1,SG:1,SF:1,PF:1,C:1'
+
+
+def parse_requirements(text):
+    """
+       Parse the positions a roster must have
+
+       :param text: Comma separated position:count, e.g. 'PG:1,C:2'
+       :raises ValueError: for an unknown position or a bad count
+       :returns: list of (position, count)
+    """
+
+    requirements = []
+    for item in text.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        pos, _, count = item.partition(':')
+        pos = pos.strip().upper()
+        if pos not in positions:
+            raise ValueError("Unknown position {0}, expected one of "
+                             "{1}".format(pos, ', '.join(positions)))
+        try:
+            count = int(count) if count.strip() else 1
+        except ValueError:
+            raise ValueError("Bad count for {0}: {1}".format(pos, count))
+        if count < 0:
+            raise ValueError("Bad count for {0}: {1}".format(pos, count))
+        requirements.append((pos, count))
+
+    return requirements
+
+
+def player_positions(pos):
+    """
+       The positions a player can play, e.g. PG-SG is both
+    """
+
+    if not isinstance(pos, basestring):
+        return []
+
+    return [p.strip() for p in pos.split('-')]
+
+
+class RosterSolver(object):
+
+    def __init__(self, df, budget=200, roster_size=13,
+                 requirements=parse_requirements(default_requirements)):
+        """
+           The highest value roster under an auction budget.  A knapsack
+           over dollars and roster spots, with a state per count of each
+           required position filled so far, counts past a requirement go
+           to the utility spots.  Every player costs his price rounded to
+           the dollar and at least $1.
+
+           :param df: The players, with Player, player_id, Pos, value and
+                      price columns
+           :param budget: The money to spend on a roster
+           :param roster_size: The number of players on a roster
+           :param requirements: list of (position, count) from
+                                parse_requirements
+        """
+
+        df = df[df['value'].notnull()]
+        self.ids = df['player_id'].values.astype(int)
+        self.names = df['Player'].values
+        self.pos = df['Pos'].values
+        self.values = df['value'].values.astype(float)
+        price = np.nan_to_num(df['price'].values.astype(float))
+        self.costs = np.maximum(np.round(price), 1).astype(int)
+        self.rows = dict((p, ii) for ii, p in enumerate(self.ids))
+
+        self.budget = int(budget)
+        self.roster_size = int(roster_size)
+        self.requirements = requirements
+        if sum(n for _, n in requirements) > self.roster_size:
+            raise ValueError("{0} players cannot fill {1}".format(
+                self.roster_size, requirements))
+
+        # the table has an axis per required position, counting the
+        # players that fill it up to the count required
+        self.counts = tuple(n for _, n in requirements)
+
+        # the requirements each player can fill, flex players fill none
+        self.options = []
+        for pos in self.pos:
+            can = player_positions(pos)
+            self.options.append(tuple(jj for jj, (p, _) in
+                                      enumerate(requirements) if p in can))
+
+        # filling a requirement moves one step along its axis, or stays at
+        # the end once it is met.  Each move is (axis, from, to) and the
+        # axis is what is recorded to undo it, 0 for a move that stays.
+        self.moves = []
+        for jj, n in enumerate(self.counts):
+            axis = 2 + jj
+            parts = [(axis, slice(n, n + 1), slice(n, n + 1), 0)]
+            if n > 0:
+                parts.append((axis, slice(0, n), slice(1, n + 1), axis))
+            self.moves.append(parts)
+        self.stay = [[(None, None, None, 0)]]
+
+    def player_ids(self, names):
+        """
+           The ids of players given by name
+
+           :raises ValueError: for a name that is not in the frame
+        """
+
+        keys = dict((normalize_name(n), p)
+                    for n, p in zip(self.names, self.ids))
+        missing = [n for n in names if normalize_name(n) not in keys]
+        if missing:
+            raise ValueError("Unknown players {0}".format(
+                ', '.join(missing)))
+
+        return [keys[normalize_name(n)] for n in names]
+
+    def candidates(self, keep, taken, budget, spots):
+        """
+           The players worth considering.  A player is left out when at
+           least as many players as there are open spots fill the same
+           positions for no more money and no less value, one of them
+           would always do.
+        """
+
+        out = set(taken) | set(keep)
+        rows = np.array([ii for ii, p in enumerate(self.ids)
+                         if p not in out], dtype=int)
+        if len(rows) == 0:
+            return rows
+        rows = rows[self.costs[rows] <= budget - (spots - 1)]
+
+        keys = {}
+        for ii in rows:
+            keys.setdefault(self.options[ii], []).append(ii)
+
+        kept = []
+        for group in keys.values():
+            group = np.array(group, dtype=int)
+            c = self.costs[group]
+            v = self.values[group]
+            order = np.arange(len(group))
+            better = (c[np.newaxis, :] <= c[:, np.newaxis]) & \
+                (v[np.newaxis, :] >= v[:, np.newaxis]) & \
+                ((c[np.newaxis, :] < c[:, np.newaxis]) |
+                 (v[np.newaxis, :] > v[:, np.newaxis]) |
+                 (order[np.newaxis, :] < order[:, np.newaxis]))
+            kept.extend(group[better.sum(axis=1) < spots])
+
+        return np.array(sorted(kept), dtype=int)
+
+    def step(self, best, cost, value, moves, forced):
+        """
+           Add one player to every partial roster
+
+           :returns: (the new table, int8 array of how each entry was
+                     reached when the player was taken, -1 when he was not)
+        """
+
+        shape = best.shape
+        if forced:
+            new = np.zeros(shape) - np.inf
+        else:
+            new = best.copy()
+        came = np.zeros(shape, dtype=np.int8) - 1
+        if cost >= shape[0]:
+            return new, came
+
+        rest = [slice(None)] * (len(shape) - 2)
+        for parts in moves:
+            for axis, src, dst, code in parts:
+                s = [slice(0, shape[0] - cost), slice(0, shape[1] - 1)] + rest
+                d = [slice(cost, None), slice(1, None)] + rest
+                if axis is not None:
+                    s[axis] = src
+                    d[axis] = dst
+                s, d = tuple(s), tuple(d)
+
+                cand = best[s] + value
+                better = cand > new[d]
+                np.copyto(new[d], cand, where=better)
+                np.copyto(came[d], code, where=better)
+
+        return new, came
+
+    def solve(self, keep=None, taken=(), budget=None, roster_size=None):
+        """
+           The best roster with some players fixed, e.g. during a draft the
+           players already bought and the ones other teams bought
+
+           :param keep: dict of player_id to the price paid, for keepers
+                        and players already on the roster, None for a
+                        player's own price
+           :param taken: player_ids no longer available
+           :param budget: The budget, the solver's by default
+           :param roster_size: The roster size, the solver's by default
+           :raises ValueError: if no roster fits the budget
+           :returns: DataFrame of the roster with Player, player_id, Pos,
+                     cost, value and kept columns, best first
+        """
+
+        keep = dict(keep or {})
+        budget = self.budget if budget is None else int(budget)
+        roster_size = self.roster_size if roster_size is None else \
+            int(roster_size)
+
+        missing = [p for p in keep if p not in self.rows]
+        if missing:
+            raise ValueError("Unknown players {0}".format(missing))
+
+        fixed = [self.rows[p] for p in keep]
+        fixed_costs = [int(round(keep[p])) if keep[p] is not None
+                       else self.costs[self.rows[p]] for p in keep]
+        spent = sum(fixed_costs)
+        spots = roster_size - len(fixed)
+        if spent > budget or spots < 0:
+            raise ValueError("The kept players already cost ${0} for {1} "
+                             "spots".format(spent, len(fixed)))
+
+        pool = self.candidates(keep, taken, budget - spent, spots)
+
+        shape = (budget + 1, roster_size + 1) + tuple(n + 1 for n in
+                                                      self.counts)
+        best = np.zeros(shape) - np.inf
+        best[(0, 0) + (0,) * len(self.counts)] = 0.0
+
+        players = list(zip(fixed, fixed_costs, [True] * len(fixed))) + \
+            [(ii, self.costs[ii], False) for ii in pool]
+        steps = []
+        for ii, cost, forced in players:
+            moves = [self.moves[jj] for jj in self.options[ii]] or self.stay
+            best, came = self.step(best, cost, self.values[ii], moves,
+                                   forced)
+            steps.append(came)
+
+        end = best[(slice(None), roster_size) + self.counts]
+        if not np.isfinite(end).any():
+            raise ValueError("No roster of {0} fits ${1} with {2}".format(
+                roster_size, budget, self.requirements))
+
+        # walk back from the best full roster
+        at = [int(np.argmax(end)), roster_size] + list(self.counts)
+        chosen = []
+        for (ii, cost, forced), came in reversed(list(zip(players, steps))):
+            code = came[tuple(at)]
+            if code < 0:
+                continue
+            chosen.append((ii, cost, forced))
+            at[0] -= cost
+            at[1] -= 1
+            if code > 0:
+                at[code] -= 1
+
+        rows = [ii for ii, _, _ in chosen]
+        df = pd.DataFrame({'Player': self.names[rows],
+                           'player_id': self.ids[rows],
+                           'Pos': self.pos[rows],
+                           'cost': [cost for _, cost, _ in chosen],
+                           'value': np.round(self.values[rows], 3),
+                           'kept': [forced for _, _, forced in chosen]})
+        df = df.sort(['kept', 'value'], ascending=False)
+        df.index = range(len(df))
+
+        return df[['Player', 'player_id', 'Pos', 'cost', 'value', 'kept']]
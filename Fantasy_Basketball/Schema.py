@@ -0,0 +1,291 @@
+#  Copyright (C) 2014 Devin Kelly
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import pandas as pd
+
+__author__ = "Devin Kelly"
+
+
+class Layout(object):
+
+    def __init__(self, version, columns):
+        """
+           One version of a table's layout on the site
+
+           :param version: A label for the layout, e.g. the first season
+                           it was seen
+           :param columns: list of (header, name, type) for every column
+                           in page order.  header is the text of the
+                           site's header cell, name is the column name in
+                           our frames, None to discard the column, and
+                           type is int, float, unicode or None to leave
+                           the column as parsed.
+        """
+
+        self.version = version
+        self.headers = [c[0] for c in columns]
+        self.names = [c[1] for c in columns]
+        self.types = dict((c[1], c[2]) for c in columns
+                          if c[1] is not None and c[2] is not None)
+
+    def standardize(self, frame):
+        """
+           Keep and rename the columns of a frame in this layout
+        """
+
+        keep = [ii for ii, name in enumerate(self.names) if name is not None]
+        frame = frame.iloc[:, keep]
+        frame.columns = [self.names[ii] for ii in keep]
+
+        return frame
+
+
+class TableSchema(object):
+
+    def __init__(self, table_id, layouts, drop=(), fill=None):
+        """
+           Every known layout of one table
+
+           :param table_id: The table's id on the site
+           :param layouts: list of Layout, newest last
+           :param drop: Names of columns to remove after typing
+           :param fill: Value to fill missing typed cells with, or None
+        """
+
+        self.table_id = table_id
+        self.layouts = layouts
+        self.drop = drop
+        self.fill = fill
+
+    def layout_for(self, frame):
+        """
+           The layout a parsed table is in, matched on its header names,
+           or on its number of columns when it has no header.  A table
+           with a header that matches no layout is an error, a reordered
+           table may have the same number of columns as a known layout.
+
+           :returns: (layout, frame without its empty spacer columns)
+           :raises ValueError: if no layout matches
+        """
+
+        header = list(frame.columns)
+        has_header = all(isinstance(h, basestring) for h in header)
+
+        # spacer columns have no header and no values
+        empty = frame.isnull().all().values
+        if has_header:
+            spacer = [h == '' and e for h, e in zip(header, empty)]
+        else:
+            spacer = list(empty)
+        keep = [ii for ii, s in enumerate(spacer) if not s]
+        stripped = frame.iloc[:, keep]
+
+        if has_header:
+            # some layouts list their spacer columns, some do not
+            full = header
+            header = [full[ii] for ii in keep]
+            for candidate, names in ((stripped, header), (frame, full)):
+                for layout in self.layouts:
+                    if layout.headers == names:
+                        return layout, candidate
+
+            raise ValueError("No {0} layout has the headers {1}".format(
+                self.table_id, full))
+
+        for candidate in (stripped, frame):
+            for layout in self.layouts:
+                if len(layout.names) == candidate.shape[1]:
+                    return layout, candidate
+
+        raise ValueError("No {0} layout matches {1}".format(self.table_id,
+                                                            header))
+
+    def collect(self, frames, teams=None):
+        """
+           Put every frame in its layout, concatenate them once and type
+           the result in a single pass
+
+           :param frames: list of parsed DataFrames of this table
+           :param teams: The team each frame is from, kept in a Tm column
+           :returns: DataFrame
+        """
+
+        types = {}
+        standard = []
+        for ii, frame in enumerate(frames):
+            if frame.shape[1] == 0:
+                continue
+            layout, frame = self.layout_for(frame)
+            frame = layout.standardize(frame)
+            if teams is not None:
+                frame = frame.copy()
+                frame['Tm'] = teams[ii]
+            standard.append(frame)
+            types.update(layout.types)
+
+        if not standard:
+            return pd.DataFrame()
+
+        df = pd.concat(standard, ignore_index=True)
+
+        return self.convert(df, types)
+
+    def convert(self, df, types):
+        for name, t in types.items():
+            if name not in df:
+                continue
+            col = df[name]
+            if t is int:
+                col = col.astype(float).fillna(0).astype(int)
+            elif t is float:
+                col = col.astype(float)
+                if self.fill is not None:
+                    col = col.fillna(self.fill)
+            elif t is unicode:
+                col = col.apply(lambda x: x if pd.isnull(x) else unicode(x))
+            df[name] = col
+
+        for name in self.drop:
+            if name in df:
+                del df[name]
+
+        return df
+
+
+def basic_stats(*names):
+    return [(n, n, float) for n in names]
+
+
+roster = TableSchema('roster', [
+    Layout('2007', [('No.', None, None),
+                    ('Player', 'Player', unicode),
+                    ('Pos', 'Pos', None),
+                    ('Ht', 'Ht', None),
+                    ('Wt', 'Wt', int),
+                    ('Birth Date', 'Birth Date', None),
+                    ('Exp', 'Experience', None),
+                    ('College', 'College', None)]),
+    Layout('2015', [('No.', None, None),
+                    ('Player', 'Player', unicode),
+                    ('Pos', 'Pos', None),
+                    ('Ht', 'Ht', None),
+                    ('Wt', 'Wt', int),
+                    ('Birth Date', 'Birth Date', None),
+                    ('', None, None),
+                    ('Exp', 'Experience', None),
+                    ('College', 'College', None)])])
+
+per_game = TableSchema('per_game', [
+    Layout('2007', [('Rk', None, None),
+                    ('Player', 'Player', unicode),
+                    ('Age', 'Age', int),
+                    ('G', 'G', int),
+                    ('GS', 'GS', int),
+                    ('MP', None, None)] +
+           basic_stats('FG', 'FGA', 'FG%', '3P', '3PA', '3P%', '2P', '2PA',
+                       '2P%', 'FT', 'FTA', 'FT%', 'ORB', 'DRB', 'TRB', 'AST',
+                       'STL', 'BLK', 'TOV', 'PF', 'PTS')),
+    Layout('2015', [('Rk', None, None),
+                    ('Player', 'Player', unicode),
+                    ('Age', 'Age', int),
+                    ('G', 'G', int),
+                    ('GS', 'GS', int),
+                    ('MP', None, None)] +
+           basic_stats('FG', 'FGA', 'FG%', '3P', '3PA', '3P%', '2P', '2PA',
+                       '2P%', 'eFG%', 'FT', 'FTA', 'FT%', 'ORB', 'DRB',
+                       'TRB', 'AST', 'STL', 'BLK', 'TOV', 'PF', 'PTS'))],
+    fill=0)
+
+salaries = TableSchema('salaries', [
+    Layout('2007', [('Rk', None, None),
+                    ('Player', 'Player', unicode),
+                    ('Salary', 'Salary', None)])])
+
+advanced = TableSchema('advanced', [
+    Layout('2007', [('Rk', 'Rk', int),
+                    ('Player', 'Player', unicode),
+                    ('Age', 'Age', int),
+                    ('G', 'G', int),
+                    ('MP', 'MP', int)] +
+           basic_stats('PER', 'TS%', 'eFG%', 'FTr', '3PAr', 'ORB%', 'DRB%',
+                       'TRB%', 'AST%', 'STL%', 'BLK%', 'TOV%', 'USG%', 'ORtg',
+                       'DRtg', 'OWS', 'DWS', 'WS', 'WS/48')),
+    Layout('2014', [('Rk', 'Rk', int),
+                    ('Player', 'Player', unicode),
+                    ('Age', 'Age', int),
+                    ('G', 'G', int),
+                    ('MP', 'MP', int)] +
+           basic_stats('PER', 'TS%', '3PAr', 'FTr', 'ORB%', 'DRB%', 'TRB%',
+                       'AST%', 'STL%', 'BLK%', 'TOV%', 'USG%', 'OWS', 'DWS',
+                       'WS', 'WS/48', 'OBPM', 'DBPM', 'BPM', 'VORP'))],
+    drop=('Rk', 'Age', 'G'))
+
+draft = TableSchema('stats', [
+    Layout('2007', [('Rk', None, None),
+                    ('Pk', 'Pk', int),
+                    ('Tm', 'draft_team', None),
+                    ('Player', 'Player', unicode),
+                    ('College', None, None),
+                    ('G', None, None),
+                    ('MP', None, None),
+                    ('PTS', None, None),
+                    ('TRB', None, None),
+                    ('AST', None, None),
+                    ('FG%', None, None),
+                    ('3P%', None, None),
+                    ('FT%', None, None),
+                    ('MP', None, None),
+                    ('PTS', None, None),
+                    ('TRB', None, None),
+                    ('AST', None, None),
+                    ('WS', None, None),
+                    ('WS/48', None, None)])])
+
+# the standings 'statsTable' on espn.com, the header spans several rows so
+# these are matched on their number of columns
+espn_standings = TableSchema('statsTable', [
+    Layout('2013', [('RK', 'rank', int),
+                    ('TEAM', 'name', unicode),
+                    ('', None, None),
+                    ('FG%', 'FG%', float),
+                    ('FT%', 'FT%', float),
+                    ('3PM', '3PM', int),
+                    ('REB', 'REB', int),
+                    ('AST', 'AST', int),
+                    ('STL', 'STL', int),
+                    ('BLK', 'BLK', int),
+                    ('PTS', 'PTS', int),
+                    ('TW', 'TW', int),
+                    ('', None, None),
+                    ('MOVES', 'moves', int)]),
+    Layout('2014', [('RK', 'rank', int),
+                    ('TEAM', 'name', unicode),
+                    ('', None, None),
+                    ('FG%', 'FG%', float),
+                    ('FT%', 'FT%', float),
+                    ('3PM', '3PM', int),
+                    ('REB', 'REB', int),
+                    ('AST', 'AST', int),
+                    ('STL', 'STL', int),
+                    ('BLK', 'BLK', int),
+                    ('PTS', 'PTS', int),
+                    ('TW', 'TW', int),
+                    ('', None, None),
+                    ('', None, None),
+                    ('MOVES', 'moves', int)])])
+
+schemas = dict((s.table_id, s)
+               for s in [roster, per_game, salaries, advanced, draft,
+                         espn_standings])
@@ -0,0 +1,111 @@
+#  Copyright (C) 2014 Devin Kelly
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import numpy as np
+import pandas as pd
+
+__author__ = "Devin Kelly"
+
+# basketball-reference's team for a season spent on more than one team
+total_team = 'TOT'
+
+per_game_stats = ['FG', 'FGA', '3P', '3PA', '2P', '2PA', 'FT', 'FTA', 'ORB',
+                  'DRB', 'TRB', 'AST', 'STL', 'BLK', 'TOV', 'PF', 'PTS']
+
+# per game stats are averaged over games, percentages over attempts, so the
+# season's FG% is its total makes over its total attempts
+per_game_weights = dict([(c, 'G') for c in per_game_stats] +
+                        [('FG%', ('G', 'FGA')),
+                         ('3P%', ('G', '3PA')),
+                         ('2P%', ('G', '2PA')),
+                         ('eFG%', ('G', 'FGA')),
+                         ('FT%', ('G', 'FTA'))])
+per_game_sums = ['G', 'GS']
+
+# rates are averaged over minutes, win shares add up
+advanced_stats = ['PER', 'TS%', 'eFG%', 'FTr', '3PAr', 'ORB%', 'DRB%',
+                  'TRB%', 'AST%', 'STL%', 'BLK%', 'TOV%', 'USG%', 'ORtg',
+                  'DRtg', 'WS/48', 'OBPM', 'DBPM', 'BPM']
+advanced_weights = dict((c, 'MP') for c in advanced_stats)
+advanced_sums = ['MP', 'OWS', 'DWS', 'WS', 'VORP']
+
+
+def combine_stints(df, weights, sums=(), key='player_id'):
+    """
+       One row per player from a table with a row per player and team.
+       The groups are summed with np.bincount so there is no loop over
+       players.
+
+       :param df: DataFrame of stints with a Tm column
+       :param weights: dict of column to the column, or tuple of columns
+                       multiplied together, it is averaged over
+       :param sums: Columns that are added up
+       :param key: The column identifying a player
+       :returns: DataFrame, columns that are neither averaged nor summed
+                 are taken from the player's first stint and Tm is TOT
+                 for a player with more than one stint
+    """
+
+    if df.empty:
+        return df
+
+    codes, uniques = pd.factorize(df[key])
+    n = len(uniques)
+    counts = np.bincount(codes, minlength=n)
+
+    # the first row of each player, the codes run from 0 to n - 1
+    _, first = np.unique(codes, return_index=True)
+    out = df.iloc[first].reset_index(drop=True)
+
+    def column(c):
+        return df[c].values.astype(float)
+
+    def group_sum(values):
+        return np.bincount(codes, weights=np.nan_to_num(values), minlength=n)
+
+    for c in sums:
+        if c in df:
+            total = group_sum(column(c))
+            if df[c].dtype.kind == 'i':
+                total = total.astype(df[c].dtype)
+            out[c] = total
+
+    for c, w in weights.items():
+        if c not in df:
+            continue
+        w = (w,) if isinstance(w, basestring) else w
+        if not all(x in df for x in w):
+            continue
+
+        weight = np.ones(len(df))
+        for x in w:
+            weight = weight * np.nan_to_num(column(x))
+
+        values = column(c)
+        known = ~np.isnan(values)
+        total_weight = group_sum(weight * known)
+        weighted = group_sum(values * weight)
+
+        # a player without minutes or attempts gets the plain mean of the
+        # stints that have a value
+        with np.errstate(invalid='ignore', divide='ignore'):
+            plain = group_sum(values) / group_sum(known)
+            out[c] = np.where(total_weight > 0, weighted / total_weight,
+                              plain)
+
+    if 'Tm' in out:
+        out['Tm'] = np.where(counts > 1, total_team, out['Tm'].values)
+
+    return out
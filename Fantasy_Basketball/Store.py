@@ -0,0 +1,155 @@
+#  Copyright (C) 2014 Devin Kelly
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import pandas as pd
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.feather as feather
+except ImportError:
+    pyarrow = None
+
+__author__ = "Devin Kelly"
+
+# extensions in the order they are looked for when reading
+extensions = ['.feather', '.pkl']
+
+
+def pyarrow_version():
+    """
+       The installed pyarrow's (major, minor), the last release for python
+       2 is 0.16 and its feather API differs from later ones
+    """
+
+    parts = pyarrow.__version__.split('.')
+    return tuple(int(p) for p in parts[0:2] if p.isdigit())
+
+
+def frame_file(path):
+    """
+       The file a frame is stored in, whichever format it was written in
+
+       :param path: The frame's path without an extension,
+                    e.g. processed_data/2013/team_data
+       :returns: The filename, or None if the frame does not exist
+    """
+
+    for ext in extensions:
+        if os.path.isfile(path + ext):
+            if ext == '.feather' and pyarrow is None:
+                continue
+            return path + ext
+
+    return None
+
+
+def frame_exists(path):
+    return frame_file(path) is not None
+
+
+def write_frame(df, path):
+    """
+       Store a frame column by column in a Feather file, or as a pickle if
+       pyarrow is not installed or cannot store one of the columns.  The
+       other format's file is removed so a stale copy is never read.
+
+       :param df: The DataFrame
+       :param path: The frame's path without an extension
+       :returns: The filename written
+    """
+
+    filename = None
+    if pyarrow is not None:
+        filename = path + '.feather'
+        columnar = df.reset_index(drop=True)
+        columnar.columns = [unicode(c) for c in columnar.columns]
+        try:
+            feather.write_feather(columnar, filename)
+        except pyarrow.ArrowException as e:
+            print "Storing {0} as a pickle: {1}".format(path, e)
+            if os.path.isfile(filename):
+                os.remove(filename)
+            filename = None
+
+    if filename is None:
+        filename = path + '.pkl'
+        df.to_pickle(filename)
+
+    for ext in extensions:
+        if path + ext != filename and os.path.isfile(path + ext):
+            os.remove(path + ext)
+
+    return filename
+
+
+def read_frame(path, columns=None):
+    """
+       Load a frame, reading only the requested columns from disk when it
+       is stored in a columnar format
+
+       :param path: The frame's path without an extension
+       :param columns: The columns to load, all of them if None.  Columns
+                       the frame does not have are skipped.
+       :raises IOError: if the frame does not exist
+    """
+
+    filename = frame_file(path)
+    if filename is None:
+        raise IOError("No frame stored at {0}".format(path))
+
+    if filename.endswith('.feather'):
+        if columns is not None:
+            available = feather_columns(filename)
+            columns = [c for c in columns if c in available]
+        return feather.read_table(filename, columns=columns).to_pandas()
+
+    df = pd.read_pickle(filename)
+    if columns is not None:
+        df = df[[c for c in columns if c in df.columns]]
+
+    return df
+
+
+def frame_columns(path):
+    """
+       The column names of a stored frame, without loading its data when it
+       is stored in a columnar format
+    """
+
+    filename = frame_file(path)
+    if filename is None:
+        raise IOError("No frame stored at {0}".format(path))
+
+    if filename.endswith('.feather'):
+        return feather_columns(filename)
+
+    return list(pd.read_pickle(filename).columns)
+
+
+def feather_columns(filename):
+    """
+       The column names in a Feather file's metadata
+    """
+
+    if pyarrow_version() < (0, 17):
+        reader = feather.FeatherReader(filename)
+        return [reader.get_column_name(ii)
+                for ii in range(reader.num_columns)]
+
+    # 0.17 and later write Feather V2, which is the Arrow IPC file format
+    reader = pyarrow.ipc.open_file(pyarrow.memory_map(filename))
+    return list(reader.schema.names)
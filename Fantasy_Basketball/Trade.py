@@ -0,0 +1,286 @@
+#  Copyright (C) 2014 Devin Kelly
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import itertools
+import numpy as np
+import pandas as pd
+
+from Valuation import default_categories
+from Valuation import value_column
+
+__author__ = "Devin Kelly"
+
+# the logistic curve with this slope is within 0.01 of the normal cdf
+logistic_slope = 1.702
+
+
+def trade_columns(categories=default_categories):
+    """
+       The team_data columns the trade finder needs
+    """
+
+    return ['Player', 'Fantasy Team', 'value'] + \
+        [value_column(c) for c in categories]
+
+
+class TradeFinder(object):
+
+    def __init__(self, df, categories=default_categories):
+        """
+           Every fantasy team's category totals, the sum of its players'
+           category z-scores.  A team's score is the number of categories
+           it expects to win against the rest of the league, a category is
+           won against another team with the chance that a normal with the
+           spread of the league's totals puts it ahead.
+
+           :param df: team_data, with Player, Fantasy Team, value and the
+                      value_<category> columns
+           :param categories: The scoring categories
+        """
+
+        self.categories = categories
+        z = df[[value_column(c) for c in categories]].values.astype(float)
+        z = np.nan_to_num(z)
+        value = np.nan_to_num(df['value'].values.astype(float))
+        names = df['Player'].values
+
+        teams = df['Fantasy Team']
+        rostered = (teams.notnull() & (teams != 'FA')).values
+        codes, uniques = pd.factorize(teams[rostered])
+        self.teams = list(uniques)
+
+        self.z = z[rostered]
+        self.names = names[rostered]
+        self.rosters = [np.flatnonzero(codes == ii)
+                        for ii in range(len(self.teams))]
+
+        self.totals = np.zeros((len(self.teams), len(categories)))
+        np.add.at(self.totals, codes, self.z)
+        scale = self.totals.std(axis=0)
+        self.scale = np.where(scale > 0, scale, 1.0)
+
+        # the team that gets two players for one cuts its worst player, the
+        # two worst are kept in case the worst is the one it gives up
+        value = value[rostered]
+        self.worst = []
+        for roster in self.rosters:
+            ranked = roster[np.argsort(value[roster], kind='mergesort')]
+            self.worst.append(ranked[0:2])
+
+        # the team that gives two for one picks up the best free agent
+        free = np.flatnonzero(~rostered & ~np.isnan(df['value'].values))
+        self.pickup = np.zeros(len(categories))
+        self.pickup_name = ''
+        pickup_value = None
+        if len(free) > 0:
+            best = free[np.argmax(df['value'].values[free])]
+            self.pickup = z[best]
+            self.pickup_name = names[best]
+            pickup_value = df['value'].values[best]
+
+        # any team can drop its worst player for that free agent without a
+        # trade, a 2-for-1 is scored against the totals after that move so
+        # it is not credited with the pickup
+        self.baseline = self.totals.copy()
+        for ii, worst in enumerate(self.worst):
+            if pickup_value is not None and len(worst) > 0 and \
+               value[worst[0]] < pickup_value:
+                self.baseline[ii] += self.pickup - self.z[worst[0]]
+
+    def score(self, team, totals, partner, partner_totals, league):
+        """
+           A team's expected categories won after a trade
+
+           :param team: The team's row
+           :param totals: float array of its new totals, trades x categories
+           :param partner: The row of the team it trades with
+           :param partner_totals: float array of the partner's new totals
+           :param league: float array of every team's totals the trade is
+                          measured from, teams x categories, the rest of
+                          the league is compared on the same basis
+           :returns: float array, one score per trade
+        """
+
+        others = [ii for ii in range(len(self.teams))
+                  if ii != team and ii != partner]
+        diff = (totals[:, np.newaxis, :] -
+                league[others][np.newaxis, :, :]) / self.scale
+        score = win_chance(diff).sum(axis=(1, 2))
+
+        return score + win_chance((totals - partner_totals) /
+                                  self.scale).sum(axis=1)
+
+    def one_for_one(self, a, b):
+        """
+           Every swap of one player between two teams, a gives the first
+           player of each pair
+
+           :returns: (int array of players, trades x 2; float array of a's
+                     change, float array of b's change)
+        """
+
+        pairs = np.array(list(itertools.product(self.rosters[a],
+                                                self.rosters[b])),
+                         dtype=int).reshape(-1, 2)
+        delta = self.z[pairs[:, 1]] - self.z[pairs[:, 0]]
+
+        return pairs, delta, -delta
+
+    def two_for_one(self, a, b):
+        """
+           Every trade of two players from a for one player from b.  a
+           fills the open spot with the best free agent and b cuts its
+           worst player to make room.  The changes are from each team's
+           baseline, its totals after its best drop and add.
+
+           :returns: (int array of players, trades x 4, a's two, b's one and
+                     the player b cuts; float array of a's change, float
+                     array of b's change)
+        """
+
+        given = np.array(list(itertools.combinations(self.rosters[a], 2)),
+                         dtype=int).reshape(-1, 2)
+        got = self.rosters[b]
+        if len(given) == 0 or len(got) < 2:
+            return (np.zeros((0, 4), dtype=int),
+                    np.zeros((0, len(self.categories))),
+                    np.zeros((0, len(self.categories))))
+
+        gg = np.repeat(np.arange(len(given)), len(got))
+        jj = np.tile(got, len(given))
+        worst = self.worst[b]
+        cut = np.where(jj == worst[0], worst[1], worst[0])
+
+        two = self.z[given[gg, 0]] + self.z[given[gg, 1]]
+        delta_a = self.z[jj] - two + self.pickup - \
+            (self.baseline[a] - self.totals[a])
+        delta_b = two - self.z[jj] - self.z[cut] - \
+            (self.baseline[b] - self.totals[b])
+        players = np.column_stack([given[gg], jj, cut])
+
+        return players, delta_a, delta_b
+
+    def evaluate(self, a, b, players, delta_a, delta_b, league,
+                 min_gain=0.0):
+        """
+           Score candidate trades and keep the ones that help both teams.
+           A trade where one team's totals go down in every category and
+           the other's go up in every category cannot help the first team
+           and is dropped unscored.  With several categories few trades are
+           that lopsided, nearly every candidate is scored.
+
+           :param league: Every team's totals the changes are from, the
+                          totals or the baselines
+           :returns: (int array of the rows kept, float array of a's gain,
+                     float array of b's gain)
+        """
+
+        a_worse = (delta_a <= 0).all(axis=1) & (delta_b >= 0).all(axis=1)
+        b_worse = (delta_b <= 0).all(axis=1) & (delta_a >= 0).all(axis=1)
+        rows = np.flatnonzero(~a_worse & ~b_worse)
+        if len(rows) == 0:
+            return rows, np.zeros(0), np.zeros(0)
+
+        totals_a = league[a] + delta_a[rows]
+        totals_b = league[b] + delta_b[rows]
+        before_a = self.score(a, league[[a]], b, league[[b]], league)
+        before_b = self.score(b, league[[b]], a, league[[a]], league)
+        gain_a = self.score(a, totals_a, b, totals_b, league) - before_a
+        gain_b = self.score(b, totals_b, a, totals_a, league) - before_b
+
+        keep = (gain_a > min_gain) & (gain_b > min_gain)
+        return rows[keep], gain_a[keep], gain_b[keep]
+
+    def trades(self, min_gain=0.0, team=None):
+        """
+           Every 1-for-1 and 2-for-1 trade between every pair of teams
+           that helps both sides, best first
+
+           :param min_gain: The expected categories each side must gain
+           :param team: Only the trades of this team
+           :returns: DataFrame with the team, the players it gives and gets,
+                     the partner, each side's gain and the change in the
+                     team's category totals, from its baseline for a
+                     2-for-1
+        """
+
+        if team is not None and team not in self.teams:
+            raise ValueError("No players for {0}".format(team))
+
+        frames = []
+        nteams = len(self.teams)
+        for a, b in itertools.permutations(range(nteams), 2):
+            names = (self.teams[a], self.teams[b])
+            if team is not None and team not in names:
+                continue
+
+            # a 2-for-1 is measured from a league where every team has
+            # made its drop and add
+            candidates = [self.two_for_one(a, b) + (self.baseline,)]
+            if a < b:
+                candidates.append(self.one_for_one(a, b) + (self.totals,))
+
+            for players, delta_a, delta_b, league in candidates:
+                rows, gain_a, gain_b = self.evaluate(a, b, players, delta_a,
+                                                     delta_b, league,
+                                                     min_gain)
+                if len(rows) == 0:
+                    continue
+                frames.append(self.frame(a, b, players[rows],
+                                         delta_a[rows], gain_a, gain_b))
+
+        columns = ['team', 'gives', 'partner', 'gets', 'cuts', 'adds',
+                   'gain', 'partner_gain'] + list(self.categories)
+        if not frames:
+            return pd.DataFrame(columns=columns)
+
+        df = pd.concat(frames, ignore_index=True)
+        df['worst_gain'] = np.minimum(df['gain'], df['partner_gain'])
+        df = df.sort(['worst_gain', 'gain'], ascending=False)
+        df.index = range(len(df))
+
+        return df[columns]
+
+    def frame(self, a, b, players, delta, gain_a, gain_b):
+        n = len(players)
+        two = players.shape[1] == 4
+        gives = self.names[players[:, 0]]
+        if two:
+            gives = [x + ' + ' + y for x, y in
+                     zip(gives, self.names[players[:, 1]])]
+            gets = self.names[players[:, 2]]
+            cuts = self.names[players[:, 3]]
+            adds = [self.pickup_name] * n
+        else:
+            gets = self.names[players[:, 1]]
+            cuts = [''] * n
+            adds = [''] * n
+
+        df = pd.DataFrame({'team': [self.teams[a]] * n,
+                           'gives': gives,
+                           'partner': [self.teams[b]] * n,
+                           'gets': gets,
+                           'cuts': cuts,
+                           'adds': adds,
+                           'gain': np.round(gain_a, 3),
+                           'partner_gain': np.round(gain_b, 3)})
+        for jj, name in enumerate(self.categories):
+            df[name] = np.round(delta[:, jj], 2)
+
+        return df
+
+
+def win_chance(diff):
+    return 1.0 / (1.0 + np.exp(-logistic_slope * diff))
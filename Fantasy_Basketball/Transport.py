@@ -0,0 +1,148 @@
+#  Copyright (C) 2014 Devin Kelly
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import time
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+__author__ = "Devin Kelly"
+
+retry_statuses = frozenset([429, 500, 502, 503, 504])
+
+
+class Transport(object):
+
+    def __init__(self, pool_size=4, retries=4, backoff=1.0,
+                 timeout=(10.0, 60.0), verbose=True, limiter=None):
+        """
+           A pooled keep-alive HTTP session that retries failed requests
+
+           :param pool_size: The most connections kept open to one host
+           :param retries: The number of retries after the first attempt
+           :param backoff: Seconds to wait before the first retry, doubled
+                           after every retry
+           :param timeout: (connect, read) timeout in seconds
+           :param verbose: Print a line for every request
+           :param limiter: A RateLimiter every retry waits on, so retries
+                           stay within the host's rate limit
+        """
+
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.verbose = verbose
+        self.limiter = limiter
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size,
+                              pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self.stats = []
+        self.lock = threading.Lock()
+
+    def retry_wait(self, attempt, r=None):
+        """
+           Seconds to wait before the next attempt, a Retry-After header
+           on the response takes precedence over the backoff
+        """
+
+        if r is not None:
+            try:
+                return float(r.headers.get('Retry-After'))
+            except (TypeError, ValueError):
+                pass
+
+        return self.backoff * (2 ** attempt)
+
+    def get(self, url, headers=None, stream=False):
+        """
+           GET a url, retrying on connection errors, 429 and 5xx responses
+
+           :param url: The url to fetch
+           :param headers: Extra request headers
+           :param stream: Leave the body unread, the caller must record the
+                          bytes read with record()
+           :returns: requests.Response, with the time the request was
+                     started in r.start
+           :raises requests.RequestException: when every attempt fails
+        """
+
+        for attempt in range(self.retries + 1):
+            # the first attempt took its token before it got here
+            if attempt > 0 and self.limiter is not None:
+                self.limiter.acquire(url)
+            start = time.time()
+            try:
+                r = self.session.get(url, headers=headers, stream=stream,
+                                     timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.retries:
+                    raise
+                time.sleep(self.retry_wait(attempt))
+                continue
+
+            if r.status_code in retry_statuses and attempt < self.retries:
+                wait = self.retry_wait(attempt, r)
+                print 'Got {0} from {1}, retrying in {2:.1f}s'.format(
+                    r.status_code, url, wait)
+                r.close()
+                time.sleep(wait)
+                continue
+
+            if not stream:
+                self.record(url, r.status_code, len(r.content),
+                            time.time() - start)
+            r.start = start
+            return r
+
+    def record(self, url, status, nbytes, latency):
+        """
+           Keep the size and latency of a finished request
+        """
+
+        end = time.time()
+        with self.lock:
+            self.stats.append({'url': url, 'status': status,
+                               'bytes': nbytes, 'latency': latency,
+                               'start': end - latency, 'end': end})
+
+        if self.verbose:
+            print 'GET {0} {1} {2} bytes {3:.2f}s'.format(url, status,
+                                                          nbytes, latency)
+
+    def report(self):
+        """
+           Print the number of requests, bytes and latency so far
+        """
+
+        with self.lock:
+            stats = list(self.stats)
+
+        if not stats:
+            return
+
+        nbytes = sum(s['bytes'] for s in stats)
+        latencies = sorted(s['latency'] for s in stats)
+        total = sum(latencies)
+        # requests overlap, throughput is over the wall time they span
+        elapsed = max(s['end'] for s in stats) - \
+            min(s['start'] for s in stats)
+        print '{0} requests, {1} bytes, '.format(len(stats), nbytes) +\
+              'mean latency {0:.2f}s, '.format(total / len(stats)) +\
+              'max latency {0:.2f}s, '.format(latencies[-1]) +\
+              '{0:.1f} KB/s'.format(nbytes / 1024.0 / max(elapsed, 1e-6))
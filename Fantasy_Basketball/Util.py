@@ -15,6 +15,7 @@
 
 import os
 import errno
+import tempfile
 
 
 def mkdir_p(path):
@@ -25,3 +26,53 @@ def mkdir_p(path):
             pass
         else:
             raise
+
+
+def atomic_write(chunks, filename, min_size=0, markers=()):
+    """
+       Stream chunks into a temporary file next to filename, check it, then
+       rename it into place so a partial file is never visible
+
+       :param chunks: iterable of byte strings
+       :param filename: The final file name
+       :param min_size: The smallest number of bytes that is a valid file
+       :param markers: byte strings that must all appear in the file
+       :returns: The number of bytes written
+       :raises IOError: if the file is too small or a marker is missing
+    """
+
+    dirname = os.path.dirname(os.path.abspath(filename))
+    fd, tmp = tempfile.mkstemp(dir=dirname,
+                               prefix='.' + os.path.basename(filename),
+                               suffix='.part')
+
+    missing = set(markers)
+    overlap = max([len(m) for m in markers] + [1]) - 1
+    tail = ''
+    nbytes = 0
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for chunk in chunks:
+                if not chunk:
+                    continue
+                f.write(chunk)
+                nbytes += len(chunk)
+                if missing:
+                    window = tail + chunk
+                    missing = set(m for m in missing if m not in window)
+                    tail = window[-overlap:] if overlap else ''
+
+        if nbytes < min_size:
+            raise IOError("{0} is too small, got {1} bytes".format(filename,
+                                                                   nbytes))
+        if missing:
+            raise IOError("{0} is missing {1}".format(filename,
+                                                      ', '.join(missing)))
+
+        os.rename(tmp, filename)
+    except BaseException:
+        if os.path.isfile(tmp):
+            os.remove(tmp)
+        raise
+
+    return nbytes
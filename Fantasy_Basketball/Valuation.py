@@ -0,0 +1,144 @@
+#  Copyright (C) 2014 Devin Kelly
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import numpy as np
+import pandas as pd
+
+__author__ = "Devin Kelly"
+
+
+class Category(object):
+
+    def __init__(self, name, column, sign=1, attempts=None):
+        """
+           A scoring category
+
+           :param name: The category's name on ESPN, e.g. 3PM
+           :param column: The stat's column in our frames, e.g. 3P
+           :param sign: -1 for categories where less is better, e.g. TO
+           :param attempts: For a percentage, the column of attempts it is
+                            weighted by when valuing by volume
+        """
+
+        self.name = name
+        self.column = column
+        self.sign = sign
+        self.attempts = attempts
+
+
+categories = dict((c.name, c) for c in [
+    Category('FG%', 'FG%', attempts='FGA'),
+    Category('FT%', 'FT%', attempts='FTA'),
+    Category('3PM', '3P'),
+    Category('REB', 'TRB'),
+    Category('OREB', 'ORB'),
+    Category('DREB', 'DRB'),
+    Category('AST', 'AST'),
+    Category('STL', 'STL'),
+    Category('BLK', 'BLK'),
+    Category('PTS', 'PTS'),
+    Category('TO', 'TOV', sign=-1),
+    Category('PF', 'PF', sign=-1)])
+
+# the 8 category league
+default_categories = ['FG%', 'FT%', '3PM', 'REB', 'AST', 'STL', 'BLK', 'PTS']
+
+
+def value_column(name):
+    return 'value_' + name
+
+
+def parse_categories(text):
+    """
+       Category names from a comma separated string, e.g. 'FG%,FT%,TO'
+
+       :raises ValueError: for a category that is not known
+    """
+
+    names = [n.strip().upper() for n in text.split(',') if n.strip()]
+    for n in names:
+        if n not in categories:
+            raise ValueError("Unknown category {0}, use one of {1}".format(
+                n, ', '.join(sorted(categories))))
+
+    return names
+
+
+def category_matrix(df, names, volume=False):
+    """
+       The stats of every category in one matrix, a row per player
+
+       :param names: The category names
+       :param volume: Value percentages by their impact, the difference
+                      from the year's percentage times attempts, so a 50%
+                      shooter on 20 shots counts for more than on 2
+       :returns: float array, players x categories
+    """
+
+    years = df['year'].values
+    matrix = np.empty((len(df), len(names)))
+    for jj, name in enumerate(names):
+        c = categories[name]
+        col = df[c.column].values.astype(float)
+        if volume and c.attempts is not None:
+            attempts = np.nan_to_num(df[c.attempts].values.astype(float))
+            made = np.nan_to_num(col) * attempts
+            codes, _ = pd.factorize(years)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                pct = np.bincount(codes, weights=made) / \
+                    np.bincount(codes, weights=attempts)
+            col = (col - pct[codes]) * attempts
+        matrix[:, jj] = c.sign * col
+
+    return matrix
+
+
+def zscores(matrix, years):
+    """
+       Z-score every column of a matrix within each year
+
+       :param matrix: float array, players x categories
+       :param years: The year of each row
+       :returns: float array the shape of matrix
+    """
+
+    codes, uniques = pd.factorize(years)
+    ngroups = len(uniques)
+    valid = ~np.isnan(matrix)
+    values = np.where(valid, matrix, 0.0)
+
+    counts = np.zeros((ngroups, matrix.shape[1]))
+    sums = np.zeros((ngroups, matrix.shape[1]))
+    np.add.at(counts, codes, valid)
+    np.add.at(sums, codes, values)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = sums / counts
+        dev = np.where(valid, matrix - mean[codes], 0.0)
+        squares = np.zeros((ngroups, matrix.shape[1]))
+        np.add.at(squares, codes, dev * dev)
+        std = np.sqrt(squares / (counts - 1))
+
+        return (matrix - mean[codes]) / std[codes]
+
+
+def category_zscores(df, names=default_categories, volume=False):
+    """
+       The per year z-score of every player in every category
+
+       :returns: float array, players x categories
+    """
+
+    return zscores(category_matrix(df, names, volume), df['year'].values)
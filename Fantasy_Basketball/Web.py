@@ -16,14 +16,21 @@
 import copy
 import os
 import re
-import pandas as pd
 import fnmatch
 import numpy as np
 import pkg_resources
 from shutil import copytree
 from Util import mkdir_p
+from Dataset import Dataset
+from Trade import TradeFinder
+from Trade import trade_columns
+from Valuation import default_categories
+from Valuation import value_column
 from jinja2 import Environment, FileSystemLoader
 
+# every pair of teams can have thousands, the page shows the best
+trades_per_page = 200
+
 
 class Web(object):
     """
@@ -94,25 +101,16 @@ class Web(object):
         """
         self.years = []
         matches = []
-        for root, _, filenames in os.walk(self.processed_dir):
-            for filename in fnmatch.filter(filenames, '*.pkl'):
-                year = re.sub(r'^' + self.processed_dir, '', root)
-                year = re.sub(r'^/', '', year)
-                year = re.sub(r'/$', '', year)
-                year = int(year)
+        for data_type in ['team_data', 'fantasy_team_data']:
+            dataset = Dataset(self.data_dir, data_type)
+            for year in dataset.years():
                 self.years.append(year)
 
-                # If these dataframes get to be too big maybe just store
-                # the path instead of all the data
-                df = pd.read_pickle(os.path.join(root, filename))
-                if 'team_data.pkl' == filename:
-                    data_type = 'team_data'
-                elif 'fantasy_team_data.pkl' == filename:
-                    data_type = 'fantasy_team_data'
-                else:
-                    continue
-
-                match = {'year': year, 'df': df, 'data_type': data_type}
+                # nothing is loaded here, each page queries the columns it
+                # renders
+                query = dataset.query().years(year)
+                match = {'year': year, 'query': query, 'dataset': dataset,
+                         'data_type': data_type}
                 matches.append(match)
 
         self.years = list(set(self.years))
@@ -141,12 +139,12 @@ class Web(object):
             if 'fantasy_team_data' != data_item['data_type']:
                 continue
 
-            df = data_item['df']
             year = str(data_item['year'])
 
             cols = [u'Fantasy Team', u'Age', u'G', u'GS', u'FG%', u'3P',
                     u'FT%', u'TRB', u'AST', u'STL', u'BLK', u'PTS',
                     u'Salary', u'MP', u'PER', u'WS', u'value', u'price']
+            df = data_item['query'].columns(*cols).load()
 
             p = {'title': 'Fantasy Team Data',
                  'year': year,
@@ -166,10 +164,10 @@ class Web(object):
             if 'team_data' != data_item['data_type']:
                 continue
 
-            df = data_item['df']
             year = str(data_item['year'])
 
-            if 'Fantasy Team' in df.keys():
+            dataset = data_item['dataset']
+            if 'Fantasy Team' in dataset.columns(data_item['year']):
                 cols = ['Player', 'Pos',
                         'GS', 'MP', 'FG%', 'FT%', '3P', 'TRB', 'AST', 'STL',
                         'BLK', 'PTS', 'Salary', 'value', 'price',
@@ -178,6 +176,7 @@ class Web(object):
                 cols = ['Player', 'Pos',
                         'GS', 'MP', 'FG%', 'FT%', '3P', 'TRB', 'AST', 'STL',
                         'BLK', 'PTS', 'Salary', 'value', 'price']
+            df = data_item['query'].columns(*cols).load()
 
             p = {'title': 'Value Data',
                  'year': year,
@@ -190,6 +189,39 @@ class Web(object):
 
         return
 
+    def add_page_trades(self):
+        """
+           The trades that help both sides, for the seasons with fantasy
+           teams
+        """
+
+        for data_item in self.data:
+            if 'team_data' != data_item['data_type']:
+                continue
+
+            columns = data_item['dataset'].columns(data_item['year'])
+            categories = [c for c in default_categories
+                          if value_column(c) in columns]
+            if 'Fantasy Team' not in columns or not categories:
+                continue
+
+            cols = trade_columns(categories)
+            df = data_item['query'].columns(*cols).load()
+            df = TradeFinder(df, categories).trades()[0:trades_per_page]
+
+            cols = ['team', 'gives', 'partner', 'gets', 'cuts', 'adds',
+                    'gain', 'partner_gain'] + categories
+            p = {'title': 'Trades',
+                 'year': str(data_item['year']),
+                 'obj': df,
+                 'table_id': 'trades',
+                 'href': 'trades.html',
+                 'cols': cols,
+                 'template': self.posTemplate}
+            self.pages.append(p)
+
+        return
+
     def add_page_position_value(self):
         """
 
@@ -199,11 +231,15 @@ class Web(object):
                          'TRB': 2, 'AST': 2, 'STL': 2, 'BLK': 2, 'PTS': 2,
                          'Salary': 3, 'value': 2, 'price': 2}
 
+        cols = ['Pos', 'GS', 'MP', 'FG%', 'FT%', '3P', 'TRB', 'AST',
+                'STL', 'BLK', 'PTS', 'Salary', 'value', 'price']
+
         for data_item in self.data:
             if 'team_data' != data_item['data_type']:
                 continue
             try:
-                df = data_item['df'].groupby('Pos')
+                df = data_item['query'].columns(*cols).load()
+                df = df.groupby('Pos')
             except KeyError:
                 print data_item['data_type']
 
@@ -214,9 +250,6 @@ class Web(object):
             for ii in cols_to_round:
                 df[ii] = np.round(df[ii], cols_to_round[ii])
 
-            cols = ['Pos', 'GS', 'MP', 'FG%', 'FT%', '3P', 'TRB', 'AST',
-                    'STL', 'BLK', 'PTS', 'Salary', 'value', 'price']
-
             year = str(data_item['year'])
             p = {'title': 'Value by Position',
                  'year': year,
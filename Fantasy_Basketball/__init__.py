@@ -16,21 +16,61 @@
 
 import os
 from Download import download_data
+from Download import backfill
 from Process import get_player_stats
 from Process import get_fantasy_teams
 from Plot import Plotter
 from Util import mkdir_p
 from Web import Web
 from ESPN_League import ESPN_League
+from Fetcher import default_workers
+from Fetcher import parse_rate_limits
+from HTTPCache import set_frozen
+from Archive import archive_raw_files
+from Dataset import Dataset
+from Database import Database
+from Valuation import default_categories
+from Valuation import parse_categories
+from Punt import PuntTable
+from Punt import punt_path
+from Auction import auction_distribution
+from Matchup import TeamRates
+from Matchup import simulate_season
+from Matchup import stat_columns
+from Trade import TradeFinder
+from Trade import trade_columns
+from Roster import RosterSolver
+from Roster import default_requirements
+from Roster import parse_requirements
 
 # Use asserts to silence PEP8... kludgy
 assert download_data
+assert backfill
 assert get_player_stats
 assert get_fantasy_teams
 assert Plotter
 assert mkdir_p
 assert Web
 assert ESPN_League
+assert default_workers
+assert parse_rate_limits
+assert set_frozen
+assert archive_raw_files
+assert Dataset
+assert Database
+assert default_categories
+assert parse_categories
+assert PuntTable
+assert punt_path
+assert auction_distribution
+assert TeamRates
+assert simulate_season
+assert stat_columns
+assert TradeFinder
+assert trade_columns
+assert RosterSolver
+assert default_requirements
+assert parse_requirements
 
 
 default_dir = os.path.expanduser("~/.fantasy_basketball")
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+#  Copyright (C) 2014 Devin Kelly
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+   Compare the lxml table extractor against the BeautifulSoup + read_html
+   path it replaced, over one season of downloaded team pages::
+
+      $ python benchmarks/extract_benchmark.py --year 2015
+"""
+
+__author__ = "Devin Kelly"
+
+import os
+import time
+import click
+import pandas as pd
+from bs4 import BeautifulSoup
+
+from Fantasy_Basketball import default_dir
+from Fantasy_Basketball.Archive import read_raw
+from Fantasy_Basketball.Extract import parse
+from Fantasy_Basketball.Extract import extract_table
+from Fantasy_Basketball.Extract import columns_to_dataframe
+from Fantasy_Basketball.TeamData import teams
+
+table_ids = ['roster', 'per_game', 'salaries', 'advanced']
+
+
+def soup_tables(data):
+    """
+       The old path, a soup tree, rows serialized back to html, then
+       parsed again by read_html
+    """
+
+    soup = BeautifulSoup(data)
+    tables = {}
+    for table_id in table_ids:
+        table = soup.find('table', {'id': table_id})
+        rows = table.find('tbody').find_all('tr', {'class': ''})
+        rows = [str(r.encode('utf-8')) for r in rows
+                if r.get('class', ['']) == ['']]
+        html = '<table>' + ''.join(rows) + '</table>'
+        tables[table_id] = pd.io.html.read_html(html)[0]
+
+    return tables
+
+
+def lxml_tables(data):
+    doc = parse(data)
+    tables = {}
+    for table_id in table_ids:
+        _, columns = extract_table(doc, table_id)
+        tables[table_id] = columns_to_dataframe(columns)
+
+    return tables
+
+
+def best_time(func, pages, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.time()
+        for data in pages:
+            func(data)
+        times.append(time.time() - start)
+
+    return min(times)
+
+
+@click.command()
+@click.option('--data_dir', default=default_dir,
+              help='Fantasy Basketball Data Directory')
+@click.option('--year', default=2015, help="The season to parse")
+@click.option('--repeat', default=3, help="Runs of each path, best is kept")
+def main(data_dir, year, repeat):
+    team_dir = os.path.join(data_dir, 'raw_data', 'teams', str(year))
+    pages = []
+    for t in teams[int(year)]:
+        filename = os.path.join(team_dir, "{0}.html".format(t))
+        try:
+            pages.append(read_raw(filename))
+        except IOError:
+            pass
+
+    if not pages:
+        print "No team pages in {0}, try downloading data".format(team_dir)
+        return
+
+    soup = best_time(soup_tables, pages, repeat)
+    fast = best_time(lxml_tables, pages, repeat)
+
+    print '{0} pages, {1} tables each'.format(len(pages), len(table_ids))
+    print 'BeautifulSoup + read_html: {0:.3f}s'.format(soup)
+    print 'lxml extractor:            {0:.3f}s'.format(fast)
+    print 'speedup:                   {0:.1f}x'.format(soup / fast)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+#  Copyright (C) 2014 Devin Kelly
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+   Replay nights of stat changes through the incremental valuation and
+   check it against a full recompute after each one::
+
+      $ python benchmarks/incremental_benchmark.py --nights 30 --changed 40
+"""
+
+__author__ = "Devin Kelly"
+
+import time
+import click
+import numpy as np
+import pandas as pd
+
+from Fantasy_Basketball.Valuation import category_zscores
+from Fantasy_Basketball.Valuation import default_categories
+from Fantasy_Basketball.Dataframe_Augmenter import auction_prices
+from Fantasy_Basketball.Incremental import IncrementalValuation
+
+stats = ['3P', 'TRB', 'AST', 'STL', 'BLK', 'PTS', 'TOV', 'FGA', 'FTA']
+
+
+def season_frame(seasons, players, rs):
+    frames = []
+    for y in range(2000, 2000 + seasons):
+        df = pd.DataFrame(dict((c, rs.rand(players) * 10) for c in stats))
+        df['FG%'] = rs.rand(players) * 0.3 + 0.3
+        df['FT%'] = rs.rand(players) * 0.4 + 0.5
+        df['player_id'] = np.arange(players)
+        df['year'] = y
+        frames.append(df)
+
+    return pd.concat(frames, ignore_index=True)
+
+
+def full_recompute(df, volume):
+    z = category_zscores(df, default_categories, volume)
+    values = z.sum(axis=1)
+    prices = auction_prices(values, df['year'].values, 6 * 13, 6 * 200.0)
+
+    return values, prices
+
+
+@click.command()
+@click.option('--seasons', default=20, help="Seasons in the frame")
+@click.option('--players', default=450, help="Players in each season")
+@click.option('--nights', default=30, help="Nights of changes to replay")
+@click.option('--changed', default=40, help="Players changed each night")
+@click.option('--volume', is_flag=True, default=False,
+              help="Weight FG% and FT% by attempts")
+def main(seasons, players, nights, changed, volume):
+    rs = np.random.RandomState(0)
+    df = season_frame(seasons, players, rs)
+    last = df['year'].max()
+    iv = IncrementalValuation(df, default_categories, volume)
+
+    full = 0.0
+    incremental = 0.0
+    worst = 0.0
+    for _ in range(nights):
+        rows = df.index[df['year'] == last][rs.choice(players, changed,
+                                                      replace=False)]
+        for c in ['PTS', 'TRB', 'AST', 'FG%', 'FGA']:
+            df.loc[rows, c] = df.loc[rows, c] * (1 + 0.2 * rs.randn(changed))
+
+        start = time.time()
+        iv.update(df.loc[rows])
+        got = iv.frame()
+        incremental += time.time() - start
+
+        start = time.time()
+        values, prices = full_recompute(df, volume)
+        full += time.time() - start
+
+        got = got.set_index(['year', 'player_id'])
+        got = got.loc[zip(df['year'], df['player_id'])]
+        worst = max(worst,
+                    np.abs(got['value'].values - values).max(),
+                    np.abs(got['price'].values - prices).max())
+
+    print '{0} nights of {1} changed players'.format(nights, changed)
+    print 'full recompute: {0:.3f}s'.format(full)
+    print 'incremental:    {0:.3f}s'.format(incremental)
+    print 'largest difference: {0:.2e}'.format(worst)
+
+
+if __name__ == "__main__":
+    main()
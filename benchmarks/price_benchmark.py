@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+#  Copyright (C) 2014 Devin Kelly
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+   Compare the vectorized auction pricing against the per player loop it
+   replaced, on a synthetic multi-season frame::
+
+      $ python benchmarks/price_benchmark.py --seasons 20
+"""
+
+__author__ = "Devin Kelly"
+
+import time
+import click
+import numpy as np
+import pandas as pd
+
+from Fantasy_Basketball.Dataframe_Augmenter import augment_price
+
+
+def loop_price(df, nplayers=6, money_per_player=200, players_per_team=13):
+    """
+       The old augment_price, a mask over the pool for every drafted player
+    """
+
+    total_picks = nplayers * players_per_team
+    money_supply = float(nplayers * money_per_player)
+
+    df['price'] = 0.0
+    years = list(set(df['year']))
+    for y in years:
+        top_players = df[df.year == y]
+        top_players = top_players.sort('value', ascending=False)[0:total_picks]
+        total_value = top_players['value'].sum()
+
+        for ii in top_players.Player:
+            player_value = top_players[top_players.Player == ii].value
+            player_value = 2.0 * player_value  # double the std. dev
+            player_price = money_supply * (player_value / total_value)
+            df.price[(df.year == y) & (df.Player == ii)] = player_price
+
+    df['price'] = np.round(df['price'], 3)
+    return df
+
+
+def season_frame(seasons, players):
+    rs = np.random.RandomState(0)
+    frames = []
+    for y in range(2000, 2000 + seasons):
+        frames.append(pd.DataFrame({
+            'Player': ['player {0}'.format(ii) for ii in range(players)],
+            'year': y,
+            'value': np.round(rs.normal(0, 4, players), 3)}))
+
+    return pd.concat(frames, ignore_index=True)
+
+
+def best_time(func, df, repeat):
+    times = []
+    for _ in range(repeat):
+        frame = df.copy()
+        start = time.time()
+        frame = func(frame)
+        times.append(time.time() - start)
+
+    return min(times), frame
+
+
+@click.command()
+@click.option('--seasons', default=20, help="Seasons in the frame")
+@click.option('--players', default=450, help="Players in each season")
+@click.option('--repeat', default=3, help="Runs of each version, best is kept")
+def main(seasons, players, repeat):
+    df = season_frame(seasons, players)
+
+    slow, expected = best_time(loop_price, df, repeat)
+    fast, got = best_time(augment_price, df, repeat)
+
+    same = np.allclose(expected['price'].values, got['price'].values)
+
+    print '{0} seasons of {1} players'.format(seasons, players)
+    print 'per player loop: {0:.3f}s'.format(slow)
+    print 'vectorized:      {0:.3f}s'.format(fast)
+    print 'speedup:         {0:.1f}x'.format(slow / fast)
+    print 'prices match:    {0}'.format(same)
+
+
+if __name__ == "__main__":
+    main()
@@ -23,12 +23,34 @@ import SimpleHTTPServer
 import SocketServer
 
 from Fantasy_Basketball import download_data
+from Fantasy_Basketball import backfill as backfill_data
 from Fantasy_Basketball import get_player_stats
 from Fantasy_Basketball import default_dir
 from Fantasy_Basketball import Plotter
 from Fantasy_Basketball import Web
 from Fantasy_Basketball import ESPN_League
 from Fantasy_Basketball import get_fantasy_teams
+from Fantasy_Basketball import default_workers
+from Fantasy_Basketball import parse_rate_limits
+from Fantasy_Basketball import set_frozen
+from Fantasy_Basketball import mkdir_p
+from Fantasy_Basketball import archive_raw_files
+from Fantasy_Basketball import Database
+from Fantasy_Basketball import default_categories
+from Fantasy_Basketball import parse_categories
+from Fantasy_Basketball import PuntTable
+from Fantasy_Basketball import punt_path
+from Fantasy_Basketball import Dataset
+from Fantasy_Basketball import auction_distribution
+from Fantasy_Basketball import TeamRates
+from Fantasy_Basketball import simulate_season
+from Fantasy_Basketball import stat_columns
+from Fantasy_Basketball import TradeFinder
+from Fantasy_Basketball import trade_columns
+from Fantasy_Basketball import RosterSolver
+from Fantasy_Basketball import default_requirements
+from Fantasy_Basketball import parse_requirements
+from Fantasy_Basketball.Store import read_frame
 
 
 @click.group()
@@ -50,9 +72,76 @@ def cli():
               help="The year to use downloading stats")
 @click.option('--league_id', default=None,
               help="The ESPN League ID to use downloading stats")
-def download(data_dir, teams, draft, league, year, league_id):
+@click.option('--workers', default=default_workers,
+              help="The most requests to have in flight at once")
+@click.option('--rate', multiple=True,
+              help="Requests per minute for a host, e.g. " +
+                   "www.basketball-reference.com=20, may be repeated")
+def download(data_dir, teams, draft, league, year, league_id, workers, rate):
     click.echo('Downloading to {0}'.format(data_dir))
-    download_data(data_dir, teams, draft, league, year, league_id)
+    rate_limits = parse_rate_limits(rate)
+    download_data(data_dir, teams, draft, league, year, league_id,
+                  workers=workers, rate_limits=rate_limits)
+
+
+@cli.command()
+@click.option('--data_dir',
+              default=default_dir,
+              help='Download Fantasy Basketball Data')
+@click.option('--from', 'from_year', required=True, type=int,
+              help="The first season to download")
+@click.option('--to', 'to_year', required=True, type=int,
+              help="The last season to download")
+@click.option('--teams', is_flag=True, default=False,
+              help="Download NBA Team Data Only")
+@click.option('--draft', is_flag=True, default=False,
+              help="Download Draft Data Only")
+@click.option('--workers', default=default_workers,
+              help="The most requests to have in flight at once")
+@click.option('--rate', multiple=True,
+              help="Requests per minute for a host, e.g. " +
+                   "www.basketball-reference.com=20, may be repeated")
+def backfill(data_dir, from_year, to_year, teams, draft, workers, rate):
+    click.echo('Backfilling {0}-{1} to {2}'.format(from_year, to_year,
+                                                   data_dir))
+    if not teams and not draft:
+        teams = draft = True
+    rate_limits = parse_rate_limits(rate)
+    summary = backfill_data(data_dir, from_year, to_year, teams, draft,
+                            workers=workers, rate_limits=rate_limits)
+    for status in sorted(summary):
+        click.echo('{0}: {1}'.format(status, summary[status]))
+
+
+@cli.command()
+@click.option('--data_dir',
+              default=default_dir,
+              help='Fantasy Basketball Data Directory')
+@click.option('--prune', is_flag=True, default=False,
+              help="Remove the raw HTML files once they are archived")
+def archive(data_dir, prune):
+    raw_dir = os.path.join(data_dir, 'raw_data')
+    count = archive_raw_files(raw_dir, prune)
+    click.echo('Archived {0} files in {1}'.format(count, raw_dir))
+
+
+@cli.command()
+@click.option('--data_dir',
+              default=default_dir,
+              help='Fantasy Basketball Data Directory')
+@click.option('--year', default=time.strftime('%Y', time.localtime()),
+              help="The season to pin")
+@click.option('--unfreeze', is_flag=True, default=False,
+              help="Unpin the season so it is downloaded again")
+def freeze(data_dir, year, unfreeze):
+    raw_dir = os.path.join(data_dir, 'raw_data')
+    mkdir_p(raw_dir)
+    set_frozen(raw_dir, year, not unfreeze)
+    if unfreeze:
+        click.echo('Unfroze {0}'.format(year))
+    else:
+        click.echo('Froze {0}, its pages will not be downloaded again'.format(
+            year))
 
 
 @cli.command()
@@ -65,17 +154,224 @@ def download(data_dir, teams, draft, league, year, league_id):
               help="Process Fantasy League Data Only")
 @click.option('--year', default=time.strftime('%Y', time.localtime()),
               help="The year to use downloading stats")
-def process(data_dir, teams, league, year):
+@click.option('--jobs', default=1,
+              help="The number of processes to parse team pages with")
+@click.option('--cache/--no-cache', default=True,
+              help="Only parse the raw pages that changed since the last run")
+@click.option('--league_size', default=6,
+              help="The number of teams in the fantasy league")
+@click.option('--budget', default=200,
+              help="Each fantasy team's auction budget")
+@click.option('--roster_size', default=13,
+              help="The number of players on a fantasy team")
+@click.option('--categories', default=','.join(default_categories),
+              help="The league's scoring categories, comma separated")
+@click.option('--volume', is_flag=True, default=False,
+              help="Weight FG% and FT% by attempts when valuing players")
+@click.option('--incremental', is_flag=True, default=False,
+              help="Only revalue the players whose stats changed")
+def process(data_dir, teams, league, year, jobs, cache, league_size, budget,
+            roster_size, categories, volume, incremental):
     click.echo('Processing to {0}'.format(data_dir))
+    try:
+        categories = parse_categories(categories)
+    except ValueError as e:
+        click.echo(str(e))
+        return
+
     if league:
         ESPN_League(data_dir, year, league)
 
     if teams:
-        get_player_stats(data_dir, year)
+        get_player_stats(data_dir, year, jobs, cache, league_size, budget,
+                         roster_size, categories, volume, incremental)
 
     get_fantasy_teams(data_dir, year)
 
 
+@cli.command()
+@click.option('--data_dir',
+              default=default_dir,
+              help='Fantasy Basketball Data Directory')
+@click.argument('sql')
+def query(data_dir, sql):
+    with Database(data_dir) as db:
+        df = db.query(sql)
+    click.echo(df.to_string(index=False))
+
+
+@cli.command()
+@click.option('--data_dir',
+              default=default_dir,
+              help='Fantasy Basketball Data Directory')
+@click.option('--year', default=time.strftime('%Y', time.localtime()),
+              help="The season to value")
+@click.option('--punt', multiple=True,
+              help="A category to punt, may be given more than once")
+@click.option('--top', default=25, help="The number of players to list")
+def punt(data_dir, year, punt, top):
+    try:
+        table = PuntTable(punt_path(data_dir, year))
+        values = table.values([p.upper() for p in punt])
+    except IOError:
+        click.echo('No punt values for {0}, try processing data'.format(year))
+        return
+    except ValueError:
+        click.echo('Punt one of {0}'.format(', '.join(table.categories)))
+        return
+
+    query = Dataset(data_dir).query().years(year)
+    df = query.columns('player_id', 'Player', 'Pos', 'Fantasy Team').load()
+    # map needs one value per player
+    values = values.groupby(level=0).first()
+    df['punt value'] = df['player_id'].map(values)
+    df = df.sort('punt value', ascending=False)[0:top]
+    del df['player_id']
+    click.echo(df.to_string(index=False))
+
+
+@cli.command()
+@click.option('--data_dir',
+              default=default_dir,
+              help='Fantasy Basketball Data Directory')
+@click.option('--year', default=time.strftime('%Y', time.localtime()),
+              help="The season to simulate the auction for")
+@click.option('--trials', default=1000, help="The number of auctions to run")
+@click.option('--jobs', default=1,
+              help="The number of processes to run the auctions in")
+@click.option('--league_size', default=6,
+              help="The number of teams in the fantasy league")
+@click.option('--budget', default=200,
+              help="Each fantasy team's auction budget")
+@click.option('--roster_size', default=13,
+              help="The number of players on a fantasy team")
+@click.option('--top', default=30, help="The number of players to list")
+def simulate(data_dir, year, trials, jobs, league_size, budget, roster_size,
+             top):
+    query = Dataset(data_dir).query().years(year)
+    df = query.columns('Player', 'value', 'price').load()
+    if df.empty:
+        click.echo('No player data for {0}, try processing data'.format(year))
+        return
+
+    players, teams = auction_distribution(df, trials, jobs, league_size,
+                                          budget, roster_size)
+    click.echo(players[0:top].to_string(index=False))
+    click.echo('')
+    click.echo('Team value by finish')
+    click.echo(teams.to_string(index=False))
+
+
+@cli.command()
+@click.option('--data_dir',
+              default=default_dir,
+              help='Fantasy Basketball Data Directory')
+@click.option('--year', default=time.strftime('%Y', time.localtime()),
+              help="The season to simulate")
+@click.option('--trials', default=10000, help="The number of seasons to run")
+@click.option('--categories', default=','.join(default_categories),
+              help="The league's scoring categories, comma separated")
+def matchups(data_dir, year, trials, categories):
+    processed_dir = os.path.join(data_dir, 'processed_data', str(year))
+    try:
+        categories = parse_categories(categories)
+        schedule = read_frame(os.path.join(processed_dir, 'league_schedule'))
+    except (ValueError, IOError) as e:
+        click.echo(str(e))
+        return
+
+    if schedule.empty:
+        click.echo('No schedule for {0}, try processing league data'.format(
+            year))
+        return
+
+    query = Dataset(data_dir).query().years(year)
+    columns = ['Fantasy Team', 'G'] + stat_columns(categories)
+    df = query.columns(*columns).load()
+
+    try:
+        rates = TeamRates(df, categories)
+        left, standings = simulate_season(schedule, rates, trials)
+    except (KeyError, ValueError) as e:
+        click.echo('Cannot simulate {0}: {1}'.format(year, e))
+        return
+
+    click.echo(left.to_string(index=False))
+    click.echo('')
+    click.echo(standings.to_string(index=False))
+
+
+@cli.command()
+@click.option('--data_dir',
+              default=default_dir,
+              help='Fantasy Basketball Data Directory')
+@click.option('--year', default=time.strftime('%Y', time.localtime()),
+              help="The season to trade in")
+@click.option('--team', default=None, help="Only this fantasy team's trades")
+@click.option('--top', default=25, help="The number of trades to show")
+@click.option('--min_gain', default=0.0,
+              help="Expected categories each side must gain")
+@click.option('--categories', default=','.join(default_categories),
+              help="The league's scoring categories, comma separated")
+def trades(data_dir, year, team, top, min_gain, categories):
+    try:
+        categories = parse_categories(categories)
+        query = Dataset(data_dir).query().years(year)
+        df = query.columns(*trade_columns(categories)).load()
+        found = TradeFinder(df, categories).trades(min_gain, team)
+    except (KeyError, ValueError, IOError) as e:
+        click.echo('Cannot find trades for {0}: {1}'.format(year, e))
+        return
+
+    if found.empty:
+        click.echo('No trades help both sides')
+        return
+
+    click.echo(found[0:top].to_string(index=False))
+
+
+@cli.command()
+@click.option('--data_dir',
+              default=default_dir,
+              help='Fantasy Basketball Data Directory')
+@click.option('--year', default=time.strftime('%Y', time.localtime()),
+              help="The season to draft")
+@click.option('--budget', default=200, help="The money to spend")
+@click.option('--roster_size', default=13,
+              help="The number of players on a roster")
+@click.option('--positions', default=default_requirements,
+              help="The positions a roster must have, e.g. PG:1,C:2")
+@click.option('--keep', multiple=True,
+              help="A player on the roster, as Name or Name:price, may be "
+                   "given more than once")
+@click.option('--taken', multiple=True,
+              help="A player another team has, may be given more than once")
+def roster(data_dir, year, budget, roster_size, positions, keep, taken):
+    columns = ['Player', 'player_id', 'Pos', 'value', 'price']
+    try:
+        requirements = parse_requirements(positions)
+        df = Dataset(data_dir).query().years(year).columns(*columns).load()
+        solver = RosterSolver(df, budget, roster_size, requirements)
+
+        kept = {}
+        for item in keep:
+            name, _, price = item.rpartition(':')
+            if not name:
+                name, price = price, None
+            player_id = solver.player_ids([name])[0]
+            kept[player_id] = float(price) if price is not None else None
+
+        best = solver.solve(kept, solver.player_ids(taken))
+    except (KeyError, ValueError, IOError) as e:
+        click.echo('Cannot solve for {0}: {1}'.format(year, e))
+        return
+
+    del best['player_id']
+    click.echo(best.to_string(index=False))
+    click.echo('${0} for {1:.3f} value'.format(best['cost'].sum(),
+                                               best['value'].sum()))
+
+
 @cli.command()
 @click.option('--data_dir',
               default=default_dir,
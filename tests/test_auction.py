@@ -0,0 +1,51 @@
+#  Copyright (C) 2014 Devin Kelly
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import unittest
+import numpy as np
+
+from Fantasy_Basketball.Auction import simulate_auctions
+
+__author__ = "Devin Kelly"
+
+
+class TestSimulateAuctions(unittest.TestCase):
+
+    def test_ties_go_to_any_team(self):
+        # a team must keep $1 for each open spot, so with $2 for two spots
+        # every bid is $1.  The star is nominated first almost always.
+        values = np.array([1000.0] + [1.0] * 7)
+        prices = np.array([1000.0] + [0.0] * 7)
+        paid, strength = simulate_auctions(values, prices, 2000, nplayers=4,
+                                           money_per_player=2,
+                                           players_per_team=2)
+        self.assertTrue((paid == 1.0).all())
+
+        wins = np.bincount(np.argmax(strength, axis=1), minlength=4)
+        self.assertTrue((wins > 350).all())
+
+    def test_budget_and_roster(self):
+        rs = np.random.RandomState(3)
+        values = rs.normal(0, 4, 120)
+        prices = np.maximum(values * 10, 0)
+        paid, _ = simulate_auctions(values, prices, 50)
+        sold = ~np.isnan(paid)
+        self.assertTrue((sold.sum(axis=1) == 6 * 13).all())
+        self.assertTrue((np.nansum(paid, axis=1) <= 6 * 200).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
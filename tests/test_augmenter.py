@@ -0,0 +1,93 @@
+#  Copyright (C) 2014 Devin Kelly
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import unittest
+import numpy as np
+import pandas as pd
+
+from Fantasy_Basketball.Dataframe_Augmenter import auction_prices
+from Fantasy_Basketball.Dataframe_Augmenter import augment_price
+
+__author__ = "Devin Kelly"
+
+
+def loop_prices(values, years, total_picks, money_supply):
+    """
+       The per player loop auction_prices replaced
+    """
+
+    prices = np.zeros(len(values))
+    for y in set(years):
+        rows = [ii for ii in range(len(values))
+                if years[ii] == y and not np.isnan(values[ii])]
+        rows = sorted(rows, key=lambda ii: -values[ii])[0:total_picks]
+        total_value = sum(values[ii] for ii in rows)
+        for ii in rows:
+            prices[ii] = 2.0 * money_supply * (values[ii] / total_value)
+
+    return prices
+
+
+def seasons(n, players, seed=0):
+    rs = np.random.RandomState(seed)
+    years = np.repeat(np.arange(2000, 2000 + n), players)
+    values = rs.normal(0, 4, n * players)
+    order = rs.permutation(len(years))
+    return values[order], years[order]
+
+
+class TestAuctionPrices(unittest.TestCase):
+
+    def assertSamePrices(self, values, years, total_picks=78,
+                         money_supply=1200.0):
+        expected = loop_prices(values, years, total_picks, money_supply)
+        got = auction_prices(values, years, total_picks, money_supply)
+        self.assertTrue(np.allclose(expected, got))
+
+    def test_matches_loop(self):
+        values, years = seasons(5, 300)
+        self.assertSamePrices(values, years)
+
+    def test_fewer_players_than_picks(self):
+        values, years = seasons(3, 40, seed=1)
+        self.assertSamePrices(values, years)
+
+    def test_missing_values(self):
+        values, years = seasons(4, 200, seed=2)
+        values[::7] = np.nan
+        self.assertSamePrices(values, years)
+        got = auction_prices(values, years, 78, 1200.0)
+        self.assertTrue((got[::7] == 0).all())
+
+    def test_each_year_spends_its_budget(self):
+        values, years = seasons(3, 300, seed=3)
+        values = np.abs(values)
+        prices = auction_prices(values, years, 78, 1200.0)
+        for y in set(years):
+            self.assertAlmostEqual(prices[years == y].sum(), 2400.0)
+            self.assertEqual((prices[years == y] > 0).sum(), 78)
+
+    def test_augment_price(self):
+        values, years = seasons(2, 100, seed=4)
+        df = pd.DataFrame({'value': values, 'year': years})
+        df = augment_price(df, nplayers=4, money_per_player=100,
+                           players_per_team=10)
+        expected = np.round(loop_prices(values, years, 40, 400.0), 3)
+        self.assertTrue(np.allclose(df['price'].values, expected))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+#  Copyright (C) 2014 Devin Kelly
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import unittest
+import numpy as np
+import pandas as pd
+
+from Fantasy_Basketball.Valuation import category_zscores
+from Fantasy_Basketball.Valuation import default_categories
+from Fantasy_Basketball.Dataframe_Augmenter import auction_prices
+from Fantasy_Basketball.Incremental import IncrementalValuation
+
+__author__ = "Devin Kelly"
+
+stats = ['3P', 'TRB', 'AST', 'STL', 'BLK', 'PTS', 'FGA', 'FTA']
+
+
+def season_frame(seasons=3, players=120, seed=0):
+    rs = np.random.RandomState(seed)
+    frames = []
+    for y in range(2000, 2000 + seasons):
+        df = pd.DataFrame(dict((c, rs.rand(players) * 10) for c in stats))
+        df['FG%'] = rs.rand(players) * 0.3 + 0.3
+        df['FT%'] = rs.rand(players) * 0.4 + 0.5
+        # missing percentages, some with attempts
+        df.loc[rs.choice(players, 6, replace=False), 'FT%'] = np.nan
+        df.loc[rs.choice(players, 3, replace=False), 'FGA'] = np.nan
+        df['player_id'] = np.arange(players)
+        df['year'] = y
+        frames.append(df)
+
+    return pd.concat(frames, ignore_index=True)
+
+
+def full_recompute(df, volume):
+    z = category_zscores(df, default_categories, volume)
+    values = z.sum(axis=1)
+    prices = auction_prices(values, df['year'].values, 6 * 13, 6 * 200.0)
+
+    return values, prices
+
+
+class TestIncrementalValuation(unittest.TestCase):
+
+    def assertMatches(self, iv, df, volume):
+        values, prices = full_recompute(df, volume)
+        got = iv.frame().set_index(['year', 'player_id'])
+        got = got.loc[list(zip(df['year'], df['player_id']))]
+        self.assertEqual(len(got), len(df))
+        self.assertTrue(np.allclose(got['value'].values, values,
+                                    equal_nan=True))
+        self.assertTrue(np.allclose(got['price'].values, prices))
+
+    def replay(self, volume):
+        rs = np.random.RandomState(1)
+        df = season_frame()
+        iv = IncrementalValuation(df, default_categories, volume)
+        self.assertMatches(iv, df, volume)
+
+        last = df['year'].max()
+        for _ in range(10):
+            rows = df.index[df['year'] == last][rs.choice(120, 15,
+                                                          replace=False)]
+            for c in ['PTS', 'TRB', 'FG%', 'FGA', 'FTA']:
+                df.loc[rows, c] = df.loc[rows, c] * \
+                    (1 + 0.2 * rs.randn(len(rows)))
+            df.loc[rows[0:2], 'FT%'] = np.nan
+            iv.update(df.loc[rows])
+            self.assertMatches(iv, df, volume)
+
+    def test_updates(self):
+        self.replay(False)
+
+    def test_updates_volume(self):
+        self.replay(True)
+
+    def test_missing_percentage_keeps_attempts(self):
+        df = season_frame(seasons=1)
+        df.loc[0:9, 'FT%'] = np.nan
+        df.loc[0:9, 'FTA'] = 50.0
+        iv = IncrementalValuation(df, default_categories, True)
+        self.assertMatches(iv, df, True)
+
+    def test_sync(self):
+        df = season_frame()
+        iv = IncrementalValuation(df, default_categories, True)
+
+        new = df.copy()
+        new.loc[5, 'PTS'] = 40.0
+        new = new.drop([7, 8])
+        extra = new.iloc[0:1].copy()
+        extra['player_id'] = 1000
+        new = pd.concat([new, extra], ignore_index=True)
+
+        self.assertEqual(iv.sync(new), 4)
+        self.assertMatches(iv, new, True)
+        self.assertEqual(iv.sync(new), 0)
+
+        # a removed player can come back
+        self.assertEqual(iv.sync(df), 4)
+        self.assertMatches(iv, df, True)
+
+    def test_stable(self):
+        # a large offset swamps a sum of squares, not the centered moments
+        df = season_frame(seasons=1)
+        df['PTS'] += 1e9
+        iv = IncrementalValuation(df, ['PTS'])
+        rows = df.index[0:10]
+        df.loc[rows, 'PTS'] += 3.0
+        iv.update(df.loc[rows])
+
+        z = category_zscores(df, ['PTS'])[:, 0]
+        got = iv.frame()['value_PTS'].values
+        self.assertTrue(np.allclose(got, z, atol=1e-6))
+
+    def test_augment(self):
+        df = season_frame(seasons=1)
+        iv = IncrementalValuation(df, default_categories, False)
+        got = iv.augment(df)
+        values, prices = full_recompute(df, False)
+        self.assertEqual(list(got['player_id']), list(df['player_id']))
+        self.assertTrue(np.allclose(got['value'], np.round(values, 3),
+                                    equal_nan=True))
+
+
+if __name__ == '__main__':
+    unittest.main()
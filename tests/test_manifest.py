@@ -0,0 +1,79 @@
+#  Copyright (C) 2014 Devin Kelly
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import os
+import shutil
+import hashlib
+import tempfile
+import unittest
+
+from Fantasy_Basketball.Archive import archive_raw_files
+from Fantasy_Basketball.Manifest import Manifest
+
+__author__ = "Devin Kelly"
+
+page_text = b'<html><body>Boston Celtics</body></html>'
+
+
+class TestManifest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.raw_dir = os.path.join(self.tmp_dir, 'raw_data')
+        team_dir = os.path.join(self.raw_dir, 'teams', '2015')
+        os.makedirs(team_dir)
+        self.page = {'kind': 'team', 'team': 'BOS', 'year': 2015,
+                     'url': 'http://example.com/BOS/2015.html',
+                     'filename': os.path.join(team_dir, 'BOS.html')}
+        with open(self.page['filename'], 'wb') as fd:
+            fd.write(page_text)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def assertDone(self, manifest):
+        entry = manifest.entries['team/BOS/2015']
+        self.assertEqual(entry['status'], 'done')
+        self.assertEqual(entry['size'], len(page_text))
+        self.assertEqual(entry['sha1'], hashlib.sha1(page_text).hexdigest())
+        self.assertTrue(manifest.is_done(self.page))
+
+    def test_fetched(self):
+        manifest = Manifest(self.raw_dir)
+        manifest.record(self.page, 200)
+        self.assertDone(manifest)
+
+    def test_not_modified_after_prune(self):
+        archive_raw_files(self.raw_dir, prune=True)
+        self.assertFalse(os.path.isfile(self.page['filename']))
+
+        manifest = Manifest(self.raw_dir)
+        manifest.record(self.page, 304)
+        self.assertDone(manifest)
+        self.assertEqual(manifest.pending([self.page]), [])
+
+    def test_failed(self):
+        os.remove(self.page['filename'])
+        manifest = Manifest(self.raw_dir)
+        manifest.record(self.page, 304)
+        self.assertEqual(manifest.entries['team/BOS/2015']['status'],
+                         'failed')
+        manifest.record(self.page, None)
+        self.assertEqual(manifest.pending([self.page]), [self.page])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+#  Copyright (C) 2014 Devin Kelly
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+
+from Fantasy_Basketball.Players import PlayerRegistry
+from Fantasy_Basketball.Matcher import NameMatcher
+
+__author__ = "Devin Kelly"
+
+
+class TestNameMatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.registry = PlayerRegistry(self.data_dir)
+        self.matcher = NameMatcher(self.registry)
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def season(self, *names):
+        return set(self.registry.id_for(n) for n in names)
+
+    def assertNotMatched(self, name, known):
+        self.registry = PlayerRegistry(self.data_dir)
+        self.matcher = NameMatcher(self.registry)
+        pool = self.season(known)
+        ids, scores = self.matcher.match_ids([name], pool)
+        self.assertEqual(ids, [None])
+        self.assertEqual(scores, [None])
+        self.assertEqual(self.registry.lookup(known), list(pool)[0])
+        self.assertIsNone(self.registry.lookup(name))
+        self.assertIn(name, self.matcher.unmatched)
+
+    def test_exact(self):
+        pool = self.season('Nene Hilario')
+        ids, scores = self.matcher.match_ids([u'Nen\xea Hilario'], pool)
+        self.assertEqual(ids, list(pool))
+        self.assertEqual(scores, [1.0])
+
+    def test_first_name_spelling(self):
+        pool = self.season('Louis Amundson')
+        ids, scores = self.matcher.match_ids(['Lou Amundson'], pool)
+        self.assertEqual(ids, list(pool))
+        self.assertGreater(scores[0], 0.75)
+        self.assertEqual(self.registry.lookup('Lou Amundson'), ids[0])
+
+    def test_numerals(self):
+        self.assertNotMatched('Gary Payton II', 'Gary Payton')
+        self.assertNotMatched('Glenn Robinson III', 'Glenn Robinson')
+
+    def test_last_name_differs(self):
+        self.assertNotMatched('Marcus Thornton', 'Marcus Thompson')
+        self.assertNotMatched('Marcus Thompson', 'Marcus Thornton')
+
+    def test_low_score(self):
+        self.assertNotMatched('Marcus Morris', 'Markieff Morris')
+        self.assertNotMatched('Markieff Morris', 'Marcus Morris')
+
+    def test_outside_pool(self):
+        self.season('Louis Amundson')
+        ids, scores = self.matcher.match_ids(['Lou Amundson'], set())
+        self.assertEqual(ids, [None])
+        self.assertEqual(scores, [None])
+
+    def test_known_outside_pool(self):
+        # a player from another season keeps his id
+        player_id = self.registry.id_for('Louis Amundson')
+        ids, scores = self.matcher.match_ids(['Louis Amundson'], set())
+        self.assertEqual(ids, [player_id])
+        self.assertEqual(scores, [None])
+        self.assertEqual(self.matcher.unmatched, [])
+
+    def test_exact_match_is_not_taken(self):
+        pool = self.season('Louis Amundson')
+        ids, scores = self.matcher.match_ids(['Louis Amundson',
+                                              'Lou Amundson'], pool)
+        self.assertEqual(ids, [list(pool)[0], None])
+        self.assertEqual(scores, [1.0, None])
+
+    def test_saved_match_is_rechecked(self):
+        pool = self.season('Gary Payton')
+        player_id = list(pool)[0]
+        self.registry.alias('Gary Payton II', player_id)
+        self.matcher.matches[u'gary payton ii'] = {
+            'player_id': player_id, 'matched': u'gary payton',
+            'score': 0.889}
+
+        ids, scores = self.matcher.match_ids(['Gary Payton II'], pool)
+        self.assertEqual(ids, [None])
+        self.assertEqual(scores, [None])
+        self.assertNotIn(u'gary payton ii', self.matcher.matches)
+        self.assertIsNone(self.registry.lookup('Gary Payton II'))
+
+    def test_unmatched_are_not_registered(self):
+        pool = self.season('Louis Amundson')
+        known = dict(self.registry.names)
+        df = self.matcher.assign(pd.DataFrame({'Player': ['Louis Amundson',
+                                                          'Zzyzx Qwerty']}),
+                                 pool)
+        self.assertEqual(df['player_id'].values[0], list(pool)[0])
+        self.assertTrue(np.isnan(df['player_id'].values[1]))
+        self.assertEqual(self.registry.names, known)
+        self.assertEqual(self.matcher.unmatched, ['Zzyzx Qwerty'])
+
+    def test_save(self):
+        pool = self.season('Louis Amundson')
+        self.matcher.match_ids(['Lou Amundson'], pool)
+        self.matcher.save()
+
+        matcher = NameMatcher(PlayerRegistry(self.data_dir))
+        self.assertIn(u'lou amundson', matcher.matches)
+        self.assertTrue(os.path.isfile(matcher.filename))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+#  Copyright (C) 2014 Devin Kelly
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import unittest
+import numpy as np
+import pandas as pd
+
+from Fantasy_Basketball.Matchup import TeamRates
+from Fantasy_Basketball.Matchup import simulate_season
+
+__author__ = "Devin Kelly"
+
+
+def schedule(rows):
+    return pd.DataFrame(rows, columns=['week', 'away', 'home', 'away_cats',
+                                       'home_cats', 'tied_cats', 'played'])
+
+
+def rates(teams):
+    df = pd.DataFrame({'Fantasy Team': teams,
+                       'G': [10] * len(teams),
+                       'PTS': [20.0] * len(teams)})
+    return TeamRates(df, ['PTS'])
+
+
+class TestSimulateSeason(unittest.TestCase):
+
+    def test_tied_records_share_first(self):
+        # the season is over and every team went 1-1
+        played = schedule([(1, 'A', 'B', 1, 0, 0, True),
+                           (2, 'B', 'C', 1, 0, 0, True),
+                           (3, 'C', 'A', 1, 0, 0, True)])
+        _, standings = simulate_season(played, rates(['A', 'B', 'C']),
+                                       trials=3000)
+        self.assertEqual(list(standings['W']), [1, 1, 1])
+        self.assertTrue(np.allclose(standings['p_first'], 1.0 / 3,
+                                    atol=0.05))
+        self.assertTrue(np.allclose(standings['finish'], 2.0, atol=0.1))
+
+    def test_better_record_finishes_first(self):
+        played = schedule([(1, 'A', 'B', 1, 0, 0, True),
+                           (2, 'A', 'C', 1, 0, 0, True),
+                           (3, 'B', 'C', 0, 0, 1, True)])
+        _, standings = simulate_season(played, rates(['A', 'B', 'C']),
+                                       trials=200)
+        self.assertEqual(list(standings['team'])[0], 'A')
+        self.assertEqual(list(standings['p_first'])[0], 1.0)
+
+    def test_matchup_chances(self):
+        left = schedule([(1, 'A', 'B', 0, 0, 0, False)])
+        matchups, _ = simulate_season(left, rates(['A', 'B']), trials=4000)
+        self.assertAlmostEqual(matchups['p_away'].values[0],
+                               matchups['p_home'].values[0], delta=0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+#  Copyright (C) 2014 Devin Kelly
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+
+from Fantasy_Basketball.Punt import punt_mask
+from Fantasy_Basketball.Punt import punt_values
+from Fantasy_Basketball.Punt import write_punt_values
+from Fantasy_Basketball.Punt import PuntTable
+
+__author__ = "Devin Kelly"
+
+categories = ['FG%', 'FT%', 'PTS']
+
+
+class TestPuntValues(unittest.TestCase):
+
+    def setUp(self):
+        self.z = np.array([[1.0, -2.0, 0.5],
+                           [0.5, np.nan, 1.0]])
+        self.values = punt_values(self.z)
+
+    def test_every_mask(self):
+        for mask in range(2 ** len(categories)):
+            kept = [jj for jj in range(len(categories))
+                    if not mask & (1 << jj)]
+            self.assertAlmostEqual(self.values[0, mask],
+                                   self.z[0, kept].sum())
+
+    def test_missing_category(self):
+        ft = punt_mask(categories, ['FT%'])
+        self.assertTrue(np.isnan(self.values[1, 0]))
+        self.assertAlmostEqual(self.values[1, ft], 1.5)
+        self.assertAlmostEqual(self.values[1, punt_mask(categories,
+                                                        ['FT%', 'PTS'])],
+                               0.5)
+        self.assertTrue(np.isnan(self.values[1, punt_mask(categories,
+                                                          ['PTS'])]))
+
+    def test_punt_mask(self):
+        self.assertEqual(punt_mask(categories, []), 0)
+        self.assertEqual(punt_mask(categories, ['FG%', 'PTS']), 5)
+        self.assertRaises(ValueError, punt_mask, categories, ['TO'])
+
+
+class TestPuntTable(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'punt_values')
+        self.z = np.array([[1.0, -2.0, 0.5],
+                           [0.5, np.nan, 1.0],
+                           [0.0, 1.0, -1.0]])
+        self.df = pd.DataFrame({'player_id': [7, 3, 5]})
+        for jj, c in enumerate(categories):
+            self.df['value_' + c] = self.z[:, jj]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_a_row_per_mask(self):
+        write_punt_values(self.path, self.df, categories)
+        array = np.load(self.path + '.npy')
+        self.assertEqual(array.shape, (2 ** len(categories), 3))
+        self.assertTrue(array.flags['C_CONTIGUOUS'])
+
+        table = PuntTable(self.path)
+        values = table.values(['FT%'])
+        self.assertEqual(list(values.index), [7, 3, 5])
+        self.assertTrue(np.allclose(values.values, [1.5, 1.5, -1.0]))
+        self.assertTrue(np.allclose(table.player(5),
+                                    punt_values(self.z)[2]))
+        self.assertRaises(KeyError, table.player, 1)
+
+    def test_players_by_masks(self):
+        # the layout written before, a row per player
+        np.save(self.path + '.npy',
+                punt_values(self.z).astype(np.float32))
+        with open(self.path + '.json', 'w') as fd:
+            json.dump({'categories': categories,
+                       'player_id': [7, 3, 5]}, fd)
+
+        table = PuntTable(self.path)
+        self.assertTrue(np.allclose(table.values(['FT%']).values,
+                                    [1.5, 1.5, -1.0]))
+        self.assertTrue(np.allclose(table.player(7),
+                                    punt_values(self.z)[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+#  Copyright (C) 2014 Devin Kelly
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import itertools
+import unittest
+import numpy as np
+import pandas as pd
+
+from Fantasy_Basketball.Roster import RosterSolver
+from Fantasy_Basketball.Roster import parse_requirements
+
+__author__ = "Devin Kelly"
+
+pos_choices = ['PG', 'SG', 'SF', 'PF', 'C', 'PG-SG', 'SF-PF', 'PF-C',
+               'SG-SF']
+
+
+def players(n, rs):
+    return pd.DataFrame({'Player': ['p{0}'.format(ii) for ii in range(n)],
+                         'player_id': np.arange(n) + 100,
+                         'Pos': rs.choice(pos_choices, n),
+                         'value': rs.normal(0, 3, n),
+                         'price': rs.uniform(0, 30, n)})
+
+
+def fills(solver, rows, requirements):
+    """
+       Whether some of the players can fill every required position
+    """
+
+    slots = [p for p, n in requirements for _ in range(n)]
+    for chosen in itertools.permutations(rows, len(slots)):
+        if all(slot in solver.pos[ii].split('-')
+               for slot, ii in zip(slots, chosen)):
+            return True
+
+    return False
+
+
+def brute_force(solver, budget, roster_size, requirements, keep, taken):
+    """
+       The value of the best roster over every set of players
+    """
+
+    best = None
+    for rows in itertools.combinations(range(len(solver.ids)), roster_size):
+        ids = [solver.ids[ii] for ii in rows]
+        if any(p not in ids for p in keep) or any(p in taken for p in ids):
+            continue
+        cost = sum(keep[p] if p in keep else solver.costs[ii]
+                   for p, ii in zip(ids, rows))
+        if cost > budget or not fills(solver, rows, requirements):
+            continue
+        value = sum(solver.values[ii] for ii in rows)
+        if best is None or value > best:
+            best = value
+
+    return best
+
+
+class TestRosterSolver(unittest.TestCase):
+
+    def test_matches_brute_force(self):
+        for seed in range(40):
+            rs = np.random.RandomState(seed)
+            df = players(rs.randint(8, 12), rs)
+            roster_size = rs.randint(5, 7)
+            budget = rs.randint(20, 90)
+            if seed % 2:
+                requirements = parse_requirements('PG:1,SG:1,SF:1,PF:1,C:1')
+            else:
+                requirements = parse_requirements('PG:2,C:1')
+            keep = {100: 5} if seed % 3 == 0 else {}
+            taken = [101] if seed % 5 == 0 else []
+
+            solver = RosterSolver(df, budget, roster_size, requirements)
+            expected = brute_force(solver, budget, roster_size,
+                                   requirements, keep, taken)
+            if expected is None:
+                self.assertRaises(ValueError, solver.solve, keep, taken)
+                continue
+
+            roster = solver.solve(keep, taken)
+            self.assertEqual(len(roster), roster_size)
+            self.assertLessEqual(roster['cost'].sum(), budget)
+            self.assertAlmostEqual(roster['value'].sum(), expected,
+                                   places=2)
+            for p in keep:
+                self.assertIn(p, list(roster['player_id']))
+            for p in taken:
+                self.assertNotIn(p, list(roster['player_id']))
+
+    def test_player_ids(self):
+        rs = np.random.RandomState(0)
+        solver = RosterSolver(players(5, rs), 50, 3, [])
+        self.assertEqual(solver.player_ids(['P1', 'p3']), [101, 103])
+        self.assertRaises(ValueError, solver.player_ids, ['nobody'])
+
+    def test_too_many_requirements(self):
+        rs = np.random.RandomState(0)
+        self.assertRaises(ValueError, RosterSolver, players(5, rs), 50, 2,
+                          parse_requirements('PG:2,C:1'))
+
+    def test_parse_requirements(self):
+        self.assertEqual(parse_requirements('pg:2, C'),
+                         [('PG', 2), ('C', 1)])
+        self.assertRaises(ValueError, parse_requirements, 'QB:1')
+        self.assertRaises(ValueError, parse_requirements, 'PG:x')
+        self.assertRaises(ValueError, parse_requirements, 'PG:-1')
+
+
+if __name__ == '__main__':
+    unittest.main()
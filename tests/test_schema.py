@@ -0,0 +1,86 @@
+#  Copyright (C) 2014 Devin Kelly
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+import numpy as np
+import pandas as pd
+
+from Fantasy_Basketball.Schema import roster
+from Fantasy_Basketball.Schema import espn_standings
+
+__author__ = "Devin Kelly"
+
+roster_2007 = ['No.', 'Player', 'Pos', 'Ht', 'Wt', 'Birth Date', 'Exp',
+               'College']
+roster_2015 = ['No.', 'Player', 'Pos', 'Ht', 'Wt', 'Birth Date', '',
+               'Exp', 'College']
+
+
+def frame(header, rows=2):
+    data = dict((ii, [u'x'] * rows) for ii in range(len(header)))
+    df = pd.DataFrame(data, columns=range(len(header)))
+    df.columns = header
+    return df
+
+
+class TestLayoutFor(unittest.TestCase):
+
+    def test_header_match(self):
+        layout, df = roster.layout_for(frame(roster_2007))
+        self.assertEqual(layout.version, '2007')
+        self.assertEqual(df.shape[1], len(roster_2007))
+
+    def test_spacer_with_values(self):
+        layout, df = roster.layout_for(frame(roster_2015))
+        self.assertEqual(layout.version, '2015')
+        self.assertEqual(list(layout.standardize(df).columns),
+                         ['Player', 'Pos', 'Ht', 'Wt', 'Birth Date',
+                          'Experience', 'College'])
+
+    def test_empty_spacer_is_dropped(self):
+        df = frame(roster_2015)
+        df.iloc[:, 6] = np.nan
+        layout, df = roster.layout_for(df)
+        self.assertEqual(df.shape[1], len(roster_2007))
+        self.assertEqual(list(layout.standardize(df).columns),
+                         ['Player', 'Pos', 'Ht', 'Wt', 'Birth Date',
+                          'Experience', 'College'])
+
+    def test_reordered_header_raises(self):
+        header = list(roster_2007)
+        header[2], header[3] = header[3], header[2]
+        self.assertRaises(ValueError, roster.layout_for, frame(header))
+
+    def test_renamed_header_raises(self):
+        header = list(roster_2007)
+        header[6] = 'Yrs'
+        self.assertRaises(ValueError, roster.layout_for, frame(header))
+
+    def test_no_header_matches_width(self):
+        df = pd.DataFrame(dict((ii, [u'1']) for ii in range(14)))
+        layout, _ = espn_standings.layout_for(df)
+        self.assertEqual(layout.version, '2013')
+
+        df = pd.DataFrame(dict((ii, [u'1']) for ii in range(15)))
+        layout, _ = espn_standings.layout_for(df)
+        self.assertEqual(layout.version, '2014')
+
+    def test_no_header_unknown_width_raises(self):
+        df = pd.DataFrame(dict((ii, [u'1']) for ii in range(5)))
+        self.assertRaises(ValueError, espn_standings.layout_for, df)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+#  Copyright (C) 2014 Devin Kelly
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import unittest
+import numpy as np
+import pandas as pd
+
+from Fantasy_Basketball.Stints import combine_stints
+from Fantasy_Basketball.Stints import per_game_weights
+from Fantasy_Basketball.Stints import per_game_sums
+
+__author__ = "Devin Kelly"
+
+
+def stints():
+    # player 7 was traded, player 3 never attempted a three
+    return pd.DataFrame({'player_id': [7, 3, 7, 5],
+                         'Player': ['A', 'B', 'A', 'C'],
+                         'Tm': ['BOS', 'NYK', 'LAL', 'MIA'],
+                         'Age': [25, 30, 25, 22],
+                         'G': [10, 40, 30, 0],
+                         'GS': [5, 40, 0, 0],
+                         'PTS': [20.0, 10.0, 8.0, np.nan],
+                         '3PA': [4.0, 0.0, 2.0, np.nan],
+                         '3P%': [0.5, np.nan, 0.25, np.nan]},
+                        columns=['player_id', 'Player', 'Tm', 'Age', 'G',
+                                 'GS', 'PTS', '3PA', '3P%'])
+
+
+class TestCombineStints(unittest.TestCase):
+
+    def setUp(self):
+        self.df = combine_stints(stints(), per_game_weights, per_game_sums)
+        self.rows = dict((p, ii) for ii, p in
+                         enumerate(self.df['player_id']))
+
+    def value(self, player_id, column):
+        return self.df[column].values[self.rows[player_id]]
+
+    def test_one_row_per_player_in_order(self):
+        self.assertEqual(list(self.df['player_id']), [7, 3, 5])
+        self.assertEqual(list(self.df['Player']), ['A', 'B', 'C'])
+
+    def test_team(self):
+        self.assertEqual(list(self.df['Tm']), ['TOT', 'NYK', 'MIA'])
+
+    def test_sums(self):
+        self.assertEqual(self.value(7, 'G'), 40)
+        self.assertEqual(self.value(7, 'GS'), 5)
+        self.assertEqual(self.df['G'].dtype.kind, 'i')
+
+    def test_averaged_over_games(self):
+        self.assertAlmostEqual(self.value(7, 'PTS'), (200.0 + 240.0) / 40)
+        self.assertAlmostEqual(self.value(3, 'PTS'), 10.0)
+
+    def test_percentage_over_attempts(self):
+        made = 10 * 4 * 0.5 + 30 * 2 * 0.25
+        self.assertAlmostEqual(self.value(7, '3P%'), made / (40 + 60))
+
+    def test_no_attempts_or_values(self):
+        self.assertTrue(np.isnan(self.value(3, '3P%')))
+        self.assertTrue(np.isnan(self.value(5, 'PTS')))
+
+    def test_plain_mean_counts_values(self):
+        # no games in either stint, the mean is over the stint with a value
+        df = pd.DataFrame({'player_id': [1, 1],
+                           'Tm': ['BOS', 'NYK'],
+                           'G': [0, 0],
+                           'PTS': [np.nan, 6.0]})
+        df = combine_stints(df, per_game_weights, per_game_sums)
+        self.assertAlmostEqual(df['PTS'].values[0], 6.0)
+
+    def test_first_stint_kept(self):
+        df = pd.DataFrame({'player_id': [2, 1, 2, 1, 2],
+                           'Tm': ['A', 'B', 'C', 'D', 'E'],
+                           'Age': [20, 21, 22, 23, 24]})
+        df = combine_stints(df, {})
+        self.assertEqual(list(df['Age']), [20, 21])
+
+    def test_empty(self):
+        df = stints()[0:0]
+        self.assertTrue(combine_stints(df, per_game_weights).empty)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+#  Copyright (C) 2014 Devin Kelly
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import unittest
+import numpy as np
+import pandas as pd
+
+from Fantasy_Basketball.Trade import TradeFinder
+
+__author__ = "Devin Kelly"
+
+
+def league(players):
+    """
+       A one category league from (player, team, z-score)
+    """
+
+    names, teams, z = zip(*players)
+    return pd.DataFrame({'Player': names, 'Fantasy Team': teams,
+                         'value': z, 'value_PTS': z})
+
+
+class TestTradeFinder(unittest.TestCase):
+
+    def setUp(self):
+        self.df = league([('a1', 'A', 1.0), ('a2', 'A', 0.0),
+                          ('a3', 'A', 0.0), ('b1', 'B', 1.0),
+                          ('b2', 'B', 0.0), ('b3', 'B', -2.0),
+                          ('c1', 'C', 0.5), ('c2', 'C', 0.5),
+                          ('c3', 'C', 0.5), ('fa', 'FA', 2.0)])
+        self.finder = TradeFinder(self.df, ['PTS'])
+
+    def test_baseline(self):
+        # every team would drop its worst player for the free agent
+        self.assertEqual(self.finder.pickup_name, 'fa')
+        self.assertTrue(np.allclose(self.finder.totals[:, 0],
+                                    [1.0, -1.0, 1.5]))
+        self.assertTrue(np.allclose(self.finder.baseline[:, 0],
+                                    [3.0, 3.0, 3.0]))
+
+    def test_pickup_is_not_a_gain(self):
+        # A giving a2 + a3 for b2 only gains the free agent, which it
+        # gets without trading, and B would rather add him than cut b3
+        a = self.finder.teams.index('A')
+        b = self.finder.teams.index('B')
+        players, delta_a, delta_b = self.finder.two_for_one(a, b)
+        names = [tuple(self.finder.names[p]) for p in players]
+        row = names.index(('a2', 'a3', 'b2', 'b3'))
+        self.assertAlmostEqual(delta_a[row, 0], 0.0)
+        self.assertLess(delta_b[row, 0], 0.0)
+
+        found = self.finder.trades()
+        self.assertFalse(((found['gives'] == 'a2 + a3') &
+                          (found['gets'] == 'b2')).any())
+
+    def test_others_compared_from_baseline(self):
+        # a 2-for-1's gains depend on where the rest of the league is after
+        # its drop and add, not on its current totals
+        f = self.finder
+        a = f.teams.index('A')
+        b = f.teams.index('B')
+        c = f.teams.index('C')
+        players, delta_a, delta_b = f.two_for_one(a, b)
+        before = f.evaluate(a, b, players, delta_a, delta_b, f.baseline,
+                            min_gain=-100)
+
+        f.totals[c] += 10.0
+        after = f.evaluate(a, b, players, delta_a, delta_b, f.baseline,
+                           min_gain=-100)
+        self.assertTrue(np.allclose(before[1], after[1]))
+        self.assertTrue(np.allclose(before[2], after[2]))
+
+        f.baseline[c] += 10.0
+        moved = f.evaluate(a, b, players, delta_a, delta_b, f.baseline,
+                           min_gain=-100)
+        self.assertFalse(np.allclose(before[1], moved[1]))
+
+    def test_unknown_team(self):
+        self.assertRaises(ValueError, self.finder.trades, team='Z')
+
+
+if __name__ == '__main__':
+    unittest.main()
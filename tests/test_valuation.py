@@ -0,0 +1,90 @@
+#  Copyright (C) 2014 Devin Kelly
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import unittest
+import numpy as np
+import pandas as pd
+
+from Fantasy_Basketball.Valuation import zscores
+from Fantasy_Basketball.Valuation import category_matrix
+from Fantasy_Basketball.Valuation import category_zscores
+from Fantasy_Basketball.Valuation import parse_categories
+
+__author__ = "Devin Kelly"
+
+
+def players(n=60, seed=0):
+    rs = np.random.RandomState(seed)
+    df = pd.DataFrame({'year': rs.choice([2013, 2014, 2015], n),
+                       'PTS': rs.gamma(4, 3, n),
+                       'TOV': rs.gamma(2, 1, n),
+                       'FGA': rs.gamma(3, 4, n),
+                       'FG%': rs.uniform(0.35, 0.6, n)})
+    # the later seasons score more, a z-score over every year would rank
+    # the 2015 players first
+    df['PTS'] += 10 * (df['year'] - 2013)
+    return df
+
+
+class TestZscores(unittest.TestCase):
+
+    def test_matches_groupby(self):
+        df = players()
+        df.loc[[3, 17], 'PTS'] = np.nan
+        z = zscores(df[['PTS', 'TOV']].values, df['year'].values)
+
+        grouped = df.groupby('year')[['PTS', 'TOV']]
+        expected = (df[['PTS', 'TOV']] - grouped.transform('mean')) / \
+            grouped.transform('std')
+        self.assertTrue(np.allclose(z, expected.values, equal_nan=True))
+        self.assertTrue(np.isnan(z[[3, 17], 0]).all())
+
+    def test_within_each_year(self):
+        df = players()
+        z = zscores(df[['PTS']].values, df['year'].values)[:, 0]
+        for y in set(df['year']):
+            rows = (df['year'] == y).values
+            self.assertAlmostEqual(z[rows].mean(), 0.0)
+            self.assertAlmostEqual(z[rows].std(ddof=1), 1.0)
+
+    def test_other_years_do_not_matter(self):
+        df = players()
+        before = category_zscores(df, ['PTS'])
+        df.loc[df['year'] == 2015, 'PTS'] *= 3
+        after = category_zscores(df, ['PTS'])
+        rows = (df['year'] != 2015).values
+        self.assertTrue(np.allclose(before[rows], after[rows]))
+
+    def test_turnovers_count_against(self):
+        df = players()
+        z = category_zscores(df, ['TO'])[:, 0]
+        worst = df['TOV'].values == df['TOV'].max()
+        self.assertTrue((z[worst] < 0).all())
+
+    def test_volume(self):
+        df = players()
+        matrix = category_matrix(df, ['FG%'], volume=True)[:, 0]
+        for y in set(df['year']):
+            rows = (df['year'] == y).values
+            self.assertAlmostEqual(matrix[rows].sum(), 0.0)
+
+    def test_parse_categories(self):
+        self.assertEqual(parse_categories('fg%, to'), ['FG%', 'TO'])
+        self.assertRaises(ValueError, parse_categories, 'FG%,XYZ')
+
+
+if __name__ == '__main__':
+    unittest.main()